@@ -10,9 +10,10 @@ from controllers.auth_controller import register, login, logout
 from controllers.cv_controller import upload_cv_dashboard, delete_cv, preview_cv
 from controllers.analysis_controller import analyze, download_optimized_cv, download_cover_letter, get_formatted_cv, download_formatted_cv
 from controllers.job_controller import job_search, job_description
-from controllers.chat_controller import chat
+from controllers.chat_controller import chat, chat_stream
 from controllers.index_controller import index
 from controllers.resume_controller import resume_builder, get_cv_data, generate_resume, download_resume, ai_edit_section
+from controllers.rag_cli import rag_index_cli
 
 def create_app(config_object=Config):
     app = Flask(__name__)
@@ -63,6 +64,7 @@ def create_app(config_object=Config):
     
     # Chat route
     app.route('/chat', methods=['GET', 'POST'])(chat)
+    app.route('/chat/stream', methods=['POST'])(chat_stream)
     
     # Resume builder routes
     app.route('/resume_builder')(resume_builder)
@@ -71,6 +73,9 @@ def create_app(config_object=Config):
     app.route('/download_resume/<int:cv_id>/<template_id>')(download_resume)
     app.route('/ai_edit_section', methods=['POST'])(ai_edit_section)
     
+    # CLI commands
+    app.cli.add_command(rag_index_cli)
+    
     return app
 
 # Create the app instance
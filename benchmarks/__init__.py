@@ -0,0 +1 @@
+# Benchmarks initialization
\ No newline at end of file
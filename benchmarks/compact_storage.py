@@ -0,0 +1,104 @@
+"""
+Benchmark: memory per 100k CVs for float32, float16 and int8 vector storage.
+
+Builds Flat and HNSW indexes (through IndexPolicy, as RAGService does) with each
+RAG_VECTOR_STORAGE setting over synthetic 384-d embeddings and reports index bytes
+per 100k vectors and recall@k against the exact float32 baseline, then the recall of
+small per-user partitions under RAG_VECTOR_STORAGE=int8, which are built empty (with no
+vectors to train int8 ranges on) and keep float16 until they grow. It then fills a
+DocumentStore with CV-sized texts and compares the text bytes held in process
+memory before and after saving, when the texts are served from the mmap'd blob.
+
+Usage:
+    python -m benchmarks.compact_storage [num_vectors]
+"""
+import sys
+import tempfile
+import time
+import faiss
+import numpy as np
+from benchmarks.index_recall import K, synthetic_embeddings, index_bytes, evaluate, build
+from utils.doc_store import DocumentStore
+from utils.partitioned_index import IndexPolicy, INDEX_FLAT, INDEX_HNSW, vector_storage
+
+QUERIES = 200
+SMALL_PARTITIONS = (20, 200, 999)  # vectors in a typical user's partition (20 CVs of ~10 passages is 200)
+CV_CHARS = 6000  # a typical extracted CV
+
+
+def mb_per_100k(nbytes, n):
+    return nbytes / n * 100_000 / 2 ** 20
+
+
+def bench_vectors(n):
+    rng = np.random.default_rng(0)
+    vectors, basis = synthetic_embeddings(n, rng)
+    queries, _ = synthetic_embeddings(QUERIES, rng, basis=basis)
+    ids = np.arange(n, dtype=np.int64)
+
+    baseline, _ = build(IndexPolicy(), INDEX_FLAT, vectors, ids)
+    _, ground_truth = baseline.search(queries, K)
+
+    print(f"{n} vectors, {QUERIES} queries, recall@{K} vs exact float32\n")
+    print(f"{'index':<16} | {'MB/100k':>8} | {'recall':>6} | {'ms/query':>8} | {'build (s)':>9}")
+    for kind in (INDEX_FLAT, INDEX_HNSW):
+        for storage in ("float32", "float16", "int8"):
+            index, build_s = build(IndexPolicy(vector_storage=storage), kind, vectors, ids)
+            recall, ms = evaluate(index, queries, ground_truth)
+            size = mb_per_100k(index_bytes(index), n)
+            print(f"{f'{kind} {storage}':<16} | {size:>8.1f} | {recall:>6.3f} | {ms:>8.3f} | {build_s:>9.1f}")
+
+
+def bench_small_partitions():
+    rng = np.random.default_rng(2)
+    print(f"\nsmall partitions with RAG_VECTOR_STORAGE=int8, {QUERIES} queries, recall@{K} vs exact float32")
+    print(f"{'vectors':>7} | {'storage':>7} | {'recall':>6}")
+    for n in SMALL_PARTITIONS:
+        vectors, basis = synthetic_embeddings(n, rng)
+        queries, _ = synthetic_embeddings(QUERIES, rng, basis=basis)
+        ids = np.arange(n, dtype=np.int64)
+        baseline, _ = build(IndexPolicy(), INDEX_FLAT, vectors, ids)
+        _, ground_truth = baseline.search(queries, K)
+        # As PartitionedIndex creates a new owner's partition: built empty, then added to
+        index = IndexPolicy(vector_storage="int8").build(INDEX_FLAT, vectors.shape[1])
+        index.add_with_ids(vectors, ids)
+        recall, _ = evaluate(index, queries, ground_truth)
+        print(f"{n:>7} | {vector_storage(index):>7} | {recall:>6.3f}")
+
+
+def bench_texts(n):
+    rng = np.random.default_rng(1)
+    words = np.array(["python", "sql", "led", "team", "built", "data", "pipeline", "years",
+                      "experience", "managed", "aws", "stakeholders", "delivered", "project"])
+    store = DocumentStore()
+    for start in range(0, n, 1000):
+        count = min(1000, n - start)
+        texts = [" ".join(rng.choice(words, CV_CHARS // 8)) for _ in range(count)]
+        store.add_many([str(i) for i in range(start, start + count)], texts)
+
+    before = store.resident_text_bytes
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        store.save(directory)
+        save_s = time.perf_counter() - start
+        after = store.resident_text_bytes
+        start = time.perf_counter()
+        store.lookup(rng.integers(0, n, 1000))
+        lookup_ms = (time.perf_counter() - start) * 1000
+
+    print(f"\n{n} CV texts of ~{CV_CHARS} chars")
+    print(f"resident text before save: {mb_per_100k(before, n):>8.1f} MB/100k")
+    print(f"resident text after save:  {mb_per_100k(after, n):>8.1f} MB/100k "
+          f"(save {save_s:.1f}s, 1000 mmap'd lookups {lookup_ms:.1f}ms)")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    faiss.omp_set_num_threads(1)
+    bench_vectors(n)
+    bench_small_partitions()
+    bench_texts(min(n, 20_000))
+
+
+if __name__ == "__main__":
+    main()
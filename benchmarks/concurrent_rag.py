@@ -0,0 +1,153 @@
+"""
+Stress test: concurrent searches against RAGService while writers add and delete.
+
+Reader threads search for the unique marker of a document some writer has already
+committed and check that it is found. They also check that documents deleted before
+the search started never come back. Writer threads add documents in several users'
+partitions and delete some of them again. Small COPY_ON_WRITE_MAX / DELTA_MAX values
+make partitions go through delta writes and background merges while readers run.
+
+The script reports read and write throughput, miss rate, and any violations or
+exceptions, then checks that the index, store and BM25 counts agree. It exits non-zero
+on any violation. It first measures read-only throughput with 1 and N reader threads.
+Downloads all-MiniLM-L6-v2 on first run.
+
+Usage:
+    python -m benchmarks.concurrent_rag [readers] [writers] [seconds]
+"""
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from config.config import Config
+from services.rag_service import RAGService
+from utils.partitioned_index import PartitionedIndex
+
+USERS = 4
+WORDS = ["python", "sql", "aws", "team", "pipeline", "delivered", "managed", "built", "analytics", "cloud"]
+
+
+class Ledger:
+    """Committed and deleted documents, shared between writers and readers"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.committed = {}  # doc_id -> (user, marker)
+        self.deleted = {}  # doc_id -> time the delete returned
+        self.violations = []
+        self.errors = []
+        self.reads = 0
+        self.misses = 0
+        self.writes = 0
+
+
+def document(marker, rng):
+    filler = " ".join(rng.choice(WORDS) for _ in range(40))
+    return f"{marker} experience\n{filler}"
+
+
+def writer(rag, ledger, stop, seed):
+    rng = random.Random(seed)
+    i = 0
+    while not stop.is_set():
+        try:
+            user = rng.randrange(USERS)
+            marker = f"marker{seed}x{i}"
+            doc_id = rag.add_document(document(marker, rng), doc_id=f"w{seed}-{i}", user_id=user)
+            with ledger.lock:
+                ledger.committed[doc_id] = (user, marker)
+                ledger.writes += 1
+            i += 1
+            if rng.random() < 0.3:
+                with ledger.lock:
+                    victim = rng.choice(list(ledger.committed)) if ledger.committed else None
+                    if victim is not None:
+                        del ledger.committed[victim]
+                if victim is not None:
+                    rag.delete_document(victim, persist=False)
+                    with ledger.lock:
+                        ledger.deleted[victim] = time.perf_counter()
+                        ledger.writes += 1
+        except Exception as e:
+            ledger.errors.append(repr(e))
+
+
+def reader(rag, ledger, stop, seed):
+    rng = random.Random(seed)
+    while not stop.is_set():
+        try:
+            with ledger.lock:
+                if not ledger.committed:
+                    continue
+                doc_id, (user, marker) = rng.choice(list(ledger.committed.items()))
+            started = time.perf_counter()
+            results = rag.search(f"{marker} experience", top_k=3, user_id=user)
+            ids = {result["id"] for result in results}
+            with ledger.lock:
+                ghosts = [found for found in ids if ledger.deleted.get(found, started) < started]
+                ledger.reads += 1
+                if doc_id not in ids and doc_id in ledger.committed:
+                    ledger.misses += 1
+                if ghosts:
+                    ledger.violations.append(f"deleted {ghosts} returned for {marker}")
+        except Exception as e:
+            ledger.errors.append(repr(e))
+
+
+def run_threads(targets, seconds, first_seed=0):
+    stop = threading.Event()
+    threads = [threading.Thread(target=fn, args=(*args, stop, seed))
+               for seed, (fn, args) in enumerate(targets, start=first_seed)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+
+def read_only(rag, ledger, readers, seconds):
+    ledger.reads = 0
+    run_threads([(reader, (rag, ledger))] * readers, seconds, first_seed=1000)
+    return ledger.reads / seconds
+
+
+def main():
+    readers = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    writers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    seconds = float(sys.argv[3]) if len(sys.argv) > 3 else 10
+    PartitionedIndex.COPY_ON_WRITE_MAX = 200
+    PartitionedIndex.DELTA_MAX = 64
+
+    with tempfile.TemporaryDirectory() as directory:
+        Config.RAG_EMBEDDING_CACHE_DIR = os.path.join(directory, "embedding_cache")
+        rag = RAGService(index_dir=os.path.join(directory, "rag_index"))
+        ledger = Ledger()
+
+        # Seed the index, then measure read-only scaling
+        run_threads([(writer, (rag, ledger))] * writers, seconds / 2)
+        single = read_only(rag, ledger, 1, seconds / 2)
+        parallel = read_only(rag, ledger, readers, seconds / 2)
+        print(f"read-only: 1 reader {single:.0f} searches/s, {readers} readers {parallel:.0f} searches/s")
+
+        ledger.reads = ledger.misses = ledger.writes = 0
+        run_threads([(writer, (rag, ledger))] * writers + [(reader, (rag, ledger))] * readers, seconds,
+                    first_seed=writers)
+        rag.index.wait_for_migrations()
+        print(f"mixed: {readers} readers {ledger.reads / seconds:.0f} searches/s, "
+              f"{writers} writers {ledger.writes / seconds:.0f} writes/s, "
+              f"miss rate {ledger.misses / max(ledger.reads, 1):.4f}")
+
+        counts = (rag.index.ntotal, rag.store.live_rows, len(rag.keyword_index))
+        print(f"index vectors / store passages / BM25 passages: {counts}")
+        print(f"violations: {len(ledger.violations)}, errors: {len(ledger.errors)}")
+        for problem in (ledger.violations + ledger.errors)[:10]:
+            print(f"  {problem}")
+        if ledger.violations or ledger.errors or len(set(counts)) != 1:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
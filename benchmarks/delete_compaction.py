@@ -0,0 +1,137 @@
+"""
+Benchmark: deleting documents one by one, remove_ids vs tombstones + compaction.
+
+Deletes a third of a partition one vector at a time. The old RAGService path called
+remove_ids on a flat IndexIDMap for each one, which is O(n) per call. PartitionedIndex
+only adds tombstones and leaves the rebuild to the background compactor. Reports the
+mean delete cost and the search latency with tombstones pending. It also prints each
+compaction: vectors reclaimed, bytes and time.
+
+Then it times RAGService.delete_document end to end on stores of 2k and 20k CVs,
+seeded with synthetic embeddings. The earlier path removed the document and rewrote
+the snapshot with a full save(). The current path appends the delete to the version's
+delete log instead. A second RAGService then loads the directory, to check that the
+logged deletes are replayed. Like concurrent_rag, it loads all-MiniLM-L6-v2 (the
+deletes themselves do not encode).
+
+Usage:
+    python -m benchmarks.delete_compaction [num_vectors] [deletes]
+"""
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+import faiss
+import numpy as np
+from benchmarks.index_recall import DIM, synthetic_embeddings
+from utils.partitioned_index import IndexPolicy, PartitionedIndex
+
+QUERIES = 100
+CV_WORDS = ("python sql aws docker kubernetes led built shipped pipeline platform team analytics "
+            "reduced latency customers growth delivered managed designed data").split()
+
+
+def search_ms(search, queries):
+    start = time.perf_counter()
+    for query in queries:
+        search(query)
+    return (time.perf_counter() - start) / len(queries) * 1000
+
+
+def seeded_service(directory, documents, rng):
+    """A RAGService over ``documents`` synthetic CVs of four users, saved once"""
+    from config.config import Config
+    from services.rag_service import RAGService
+
+    Config.RAG_EMBEDDING_CACHE_DIR = os.path.join(directory, "embedding_cache")
+    rag = RAGService(index_dir=os.path.join(directory, "rag_index"))
+    current = rag._current
+    embeddings, _ = synthetic_embeddings(documents, rng)
+    owners = np.arange(documents) % 4
+    with rag._write_lock:
+        for owner in range(4):
+            rows = np.flatnonzero(owners == owner)
+            texts = [" ".join(rng.choice(CV_WORDS, 300)) for _ in rows]
+            rag._add_embeddings(current, [str(row) for row in rows], texts, embeddings[rows], owner=owner)
+    current.index.wait_for_migrations()
+    rag.save()
+    return rag
+
+
+def time_service_deletes(documents, deletes, rng):
+    from services.rag_service import RAGService
+
+    victims = [str(row) for row in rng.permutation(documents)[:2 * deletes]]
+    # The service's per-call log lines are kept out of the output
+    with tempfile.TemporaryDirectory() as directory, contextlib.redirect_stdout(io.StringIO()):
+        rag = seeded_service(directory, documents, rng)
+
+        start = time.perf_counter()
+        for doc_id in victims[:deletes]:
+            with rag._write_lock:  # the earlier delete_document: remove, then a full save()
+                rag._remove_document(rag._current, doc_id)
+                rag.save()
+        save_ms = (time.perf_counter() - start) / deletes * 1000
+
+        start = time.perf_counter()
+        for doc_id in victims[deletes:]:
+            rag.delete_document(doc_id)
+        logged_ms = (time.perf_counter() - start) / deletes * 1000
+
+        rag.index.wait_for_migrations()
+        reloaded = RAGService(index_dir=rag.index_root)
+        assert len(reloaded.store) == documents - 2 * deletes, "logged deletes were not replayed"
+        assert not any(doc_id in reloaded.store for doc_id in victims), "a deleted document came back"
+        reloaded.index.wait_for_migrations()
+    print(f"{documents:>9} | {save_ms:>17.3f} | {logged_ms:>16.3f} | {save_ms / logged_ms:>6.0f}x")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    deletes = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    faiss.omp_set_num_threads(1)
+    rng = np.random.default_rng(0)
+    vectors, basis = synthetic_embeddings(n, rng)
+    queries, _ = synthetic_embeddings(QUERIES, rng, basis=basis)
+    ids = np.arange(n, dtype=np.int64)
+    victims = rng.permutation(n)[:n // 3]
+
+    legacy = faiss.IndexIDMap(faiss.IndexFlatL2(DIM))
+    legacy.add_with_ids(vectors, ids)
+    start = time.perf_counter()
+    for victim in victims:
+        legacy.remove_ids(np.array([victim], dtype=np.int64))
+    legacy_s = time.perf_counter() - start
+
+    partitioned = PartitionedIndex(DIM, policy=IndexPolicy(index_type="flat", compact_dead_ratio=0.2))
+    partitioned.add(vectors, ids, owner=1)
+    partitioned.wait_for_migrations()
+    start = time.perf_counter()
+    for victim in victims:
+        partitioned.remove(np.array([victim], dtype=np.int64), owner=1)
+    tombstone_s = time.perf_counter() - start
+    pending_ms = search_ms(lambda q: partitioned.search(q, 10, owner=1), queries)
+    partitioned.wait_for_migrations()
+    compacted_ms = search_ms(lambda q: partitioned.search(q, 10, owner=1), queries)
+
+    print(f"{n} vectors, {len(victims)} single-document deletes\n")
+    print(f"remove_ids per delete:      {legacy_s / len(victims) * 1000:8.3f} ms  (total {legacy_s:.1f}s)")
+    print(f"tombstone per delete:       {tombstone_s / len(victims) * 1000:8.3f} ms  (total {tombstone_s:.1f}s)")
+    print(f"search, tombstones pending: {pending_ms:8.3f} ms")
+    print(f"search, after compaction:   {compacted_ms:8.3f} ms")
+    stats = partitioned.compaction_stats()
+    print(f"\n{stats['compactions']} compactions reclaimed {stats['reclaimed_vectors']} vectors "
+          f"({stats['reclaimed_bytes'] / 2 ** 20:.1f} MB) in {stats['seconds']:.2f}s")
+    for report in partitioned.compactions:
+        print(f"  {report}")
+
+    print(f"\nRAGService.delete_document, {deletes} deletes after {deletes} with a full save each\n")
+    print(f"{'documents':>9} | {'full save ms/del':>17} | {'delete log ms/del':>16} | {'faster':>7}")
+    for documents in (2_000, 20_000):
+        time_service_deletes(documents, deletes, rng)
+
+
+if __name__ == "__main__":
+    main()
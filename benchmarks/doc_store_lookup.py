@@ -0,0 +1,72 @@
+"""
+Benchmark: mapping FAISS hits back to documents.
+
+Compares the old nested-loop scan over a list of (doc_id, text, faiss_id) tuples
+with the array-backed DocumentStore, for corpora from 1k to 1M documents. Only the
+post-search mapping and delete steps are timed; the FAISS search itself is not.
+
+Usage:
+    python -m benchmarks.doc_store_lookup
+"""
+import time
+import numpy as np
+from utils.doc_store import DocumentStore
+
+SIZES = [1_000, 10_000, 100_000, 1_000_000]
+TOP_K = 3
+QUERIES = 20
+
+
+def _time(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def run(size, rng):
+    doc_ids = [f"doc-{i}" for i in range(size)]
+    texts = [f"CV text number {i}" for i in range(size)]
+
+    # Old layout: faiss ids are unrelated random ints
+    legacy_ids = rng.choice(2**31, size=size, replace=False)
+    documents = list(zip(doc_ids, texts, legacy_ids.tolist()))
+    legacy_hits = legacy_ids[rng.integers(0, size, TOP_K)]
+
+    def legacy_lookup():
+        results = []
+        for idx in legacy_hits:
+            for doc_id, doc_text, faiss_id in documents:
+                if faiss_id == idx:
+                    results.append({"id": doc_id, "text": doc_text})
+                    break
+        return results
+
+    store = DocumentStore()
+    store.add_many(doc_ids, texts)
+    hits = rng.integers(0, size, TOP_K)
+
+    legacy_ms = _time(legacy_lookup, max(1, QUERIES // (size // 1_000)))
+    store_ms = _time(lambda: store.lookup(hits), QUERIES * 50)
+
+    victim = doc_ids[size // 2]
+    start = time.perf_counter()
+    documents = [doc for doc in documents if doc[0] != victim]
+    legacy_delete_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    store.remove(victim)
+    store_delete_ms = (time.perf_counter() - start) * 1000
+
+    return legacy_ms, store_ms, legacy_delete_ms, store_delete_ms
+
+
+def main():
+    rng = np.random.default_rng(42)
+    print(f"{'docs':>10} | {'lookup old (ms)':>16} | {'lookup new (ms)':>16} | {'delete old (ms)':>16} | {'delete new (ms)':>16}")
+    for size in SIZES:
+        legacy_ms, store_ms, legacy_delete_ms, store_delete_ms = run(size, rng)
+        print(f"{size:>10} | {legacy_ms:>16.3f} | {store_ms:>16.4f} | {legacy_delete_ms:>16.3f} | {store_delete_ms:>16.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Benchmark: per-call encode vs the micro-batching EmbeddingBatcher.
+
+Simulates concurrent uploads/chats: many threads each encode single short texts,
+first by calling SentenceTransformer.encode directly (the old RAGService path),
+then through EmbeddingBatcher. Reports wall time, texts/s and the batcher's own
+counters. Downloads all-MiniLM-L6-v2 on first run.
+
+Usage:
+    python -m benchmarks.embedding_batcher [threads] [texts_per_thread]
+"""
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from sentence_transformers import SentenceTransformer
+from utils.embedding_batcher import EmbeddingBatcher
+
+QUESTIONS = [
+    "Who has experience with Kubernetes and Terraform?",
+    "Summarise my leadership experience",
+    "Which projects used Python and machine learning?",
+    "What certifications do I hold?",
+    "How many years of data engineering experience do I have?",
+]
+
+
+def run(encode_one, threads, per_thread):
+    def worker(offset):
+        for i in range(per_thread):
+            encode_one(f"{QUESTIONS[(offset + i) % len(QUESTIONS)]} #{offset}-{i}")
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(worker, range(threads)))
+    return time.perf_counter() - start
+
+
+def main():
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    per_thread = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    total = threads * per_thread
+    model = SentenceTransformer('all-MiniLM-L6-v2')
+    model.encode(["warm up"])
+
+    direct_s = run(lambda text: model.encode([text])[0], threads, per_thread)
+    print(f"direct encode:   {total} texts in {direct_s:.2f}s ({total / direct_s:.0f} texts/s)")
+
+    for max_wait_ms in (2, 5, 10):
+        batcher = EmbeddingBatcher(model, max_batch_size=32, max_wait_ms=max_wait_ms)
+        batched_s = run(batcher.encode_one, threads, per_thread)
+        stats = batcher.stats()
+        print(f"batched (wait={max_wait_ms}ms): {total} texts in {batched_s:.2f}s ({total / batched_s:.0f} texts/s), "
+              f"avg batch {stats['avg_batch_size']:.1f}, {stats['texts_per_encode_second']:.0f} texts per encode-second")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Benchmark: retrieval quality and latency of dense, BM25 and fused (hybrid) search.
+
+Indexes a synthetic labelled corpus of CVs through RAGService (chunking, encoding
+and BM25 exactly as in production, in a temporary index directory) and runs
+exact-term questions ("Who knows Kubernetes?") whose relevant CVs are those that
+list the skill. Reports hit rate@k, precision@k and MRR over distinct CVs, plus
+mean per-query latency of each retriever. Downloads all-MiniLM-L6-v2 on first run.
+
+Usage:
+    python -m benchmarks.hybrid_retrieval [num_cvs] [num_queries]
+"""
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+from config.config import Config
+from services.rag_service import RAGService
+
+SKILLS = ["Kubernetes", "Terraform", "PostgreSQL", "React", "Kafka", "Airflow", "Spark", "Django",
+          "TensorFlow", "PyTorch", "Golang", "Rust", "Scala", "Snowflake", "Tableau", "Figma",
+          "Salesforce", "SAP", "Jenkins", "Ansible", "GraphQL", "Redis", "Elasticsearch", "Hadoop"]
+ROLES = ["Software Engineer", "Data Engineer", "Product Manager", "DevOps Engineer", "Data Scientist"]
+FILLER = ["Collaborated with cross-functional teams to deliver projects on time.",
+          "Improved reliability and performance of customer facing services.",
+          "Mentored junior colleagues and ran weekly knowledge sharing sessions.",
+          "Worked closely with stakeholders to gather and refine requirements.",
+          "Led the migration of legacy systems to a modern cloud platform."]
+TEMPLATES = ["Who knows {}?", "Which candidates have {} experience?", "{} skills"]
+TOP_K = 5
+
+
+def synthetic_cv(i, rng):
+    skills = rng.choice(SKILLS, 3, replace=False).tolist()
+    lines = [f"Candidate {i}", f"candidate{i}@example.com", "", "SUMMARY",
+             f"{rng.choice(ROLES)} with {rng.integers(2, 15)} years of experience.", "", "EXPERIENCE"]
+    lines += [str(rng.choice(FILLER)) for _ in range(rng.integers(20, 40))]
+    lines += ["", "SKILLS", ", ".join(skills)]
+    return "\n".join(lines), set(skills)
+
+
+def evaluate(search, queries, relevant):
+    hits, precision, reciprocal, latencies = [], [], [], []
+    for question, skill in queries:
+        start = time.perf_counter()
+        doc_ids = search(question)
+        latencies.append(time.perf_counter() - start)
+        flags = [doc_id in relevant[skill] for doc_id in doc_ids[:TOP_K]]
+        hits.append(any(flags))
+        precision.append(sum(flags) / TOP_K)
+        reciprocal.append(next((1 / (rank + 1) for rank, flag in enumerate(flags) if flag), 0.0))
+    return np.mean(hits), np.mean(precision), np.mean(reciprocal), np.mean(latencies) * 1000
+
+
+def main():
+    num_cvs = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    num_queries = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    rng = np.random.default_rng(0)
+
+    with tempfile.TemporaryDirectory() as directory:
+        Config.RAG_EMBEDDING_CACHE_DIR = os.path.join(directory, "embedding_cache")
+        rag = RAGService(index_dir=os.path.join(directory, "rag_index"))
+        relevant = {skill: set() for skill in SKILLS}
+        start = time.perf_counter()
+        for i in range(num_cvs):
+            text, skills = synthetic_cv(i, rng)
+            rag.add_document(text, doc_id=str(i), user_id=1)
+            for skill in skills:
+                relevant[skill].add(str(i))
+        print(f"indexed {num_cvs} CVs ({rag.store.live_rows} passages) in {time.perf_counter() - start:.1f}s\n")
+
+        queries = []
+        for _ in range(num_queries):
+            skill = str(rng.choice(SKILLS))
+            queries.append((str(rng.choice(TEMPLATES)).format(skill), skill))
+
+        def dense(question):
+            rag.hybrid = False
+            return [doc["id"] for doc in rag.search(question, top_k=TOP_K, user_id=1, unique_documents=True)]
+
+        def keyword(question):
+            _, rows = rag.keyword_index.search(question, TOP_K * RAGService.PASSAGE_OVERFETCH,
+                                               rag.store.alive, owners=rag.store.owners, owner=1)
+            return [doc["id"] for doc in rag.store.lookup(rows, unique_documents=True)]
+
+        def hybrid(question):
+            rag.hybrid = True
+            return [doc["id"] for doc in rag.search(question, top_k=TOP_K, user_id=1, unique_documents=True)]
+
+        print(f"{num_queries} queries, metrics over the top {TOP_K} CVs\n")
+        print(f"{'retriever':<10} | {'hit@k':>6} | {'prec@k':>6} | {'MRR':>6} | {'ms/query':>8}")
+        for name, search in (("dense", dense), ("bm25", keyword), ("hybrid", hybrid)):
+            search(queries[0][0])  # warm up
+            hit, precision, mrr, ms = evaluate(search, queries, relevant)
+            print(f"{name:<10} | {hit:>6.3f} | {precision:>6.3f} | {mrr:>6.3f} | {ms:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
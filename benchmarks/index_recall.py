@@ -0,0 +1,99 @@
+"""
+Benchmark: recall vs latency for the RAG index types.
+
+Builds Flat, HNSW and IVF-PQ indexes (through IndexPolicy, exactly as RAGService
+does) over synthetic 384-d embeddings and reports recall@k against exact search,
+mean query latency, build time and index size per vector for a sweep of the
+search-time parameters. Use it to pick RAG_HNSW_MIN_VECTORS / RAG_IVFPQ_MIN_VECTORS
+and the IndexPolicy parameters.
+
+Usage:
+    python -m benchmarks.index_recall [num_vectors]
+"""
+import sys
+import time
+import faiss
+import numpy as np
+from utils.partitioned_index import IndexPolicy, INDEX_FLAT, INDEX_HNSW, INDEX_IVFPQ
+
+DIM = 384
+QUERIES = 200
+K = 10
+
+
+def synthetic_embeddings(n, rng, basis=None, intrinsic_dim=32):
+    """
+    Unit-norm vectors with low intrinsic dimension plus a little noise.
+
+    Sentence embeddings occupy a low-dimensional manifold of the 384-d space;
+    i.i.d. Gaussian vectors would make every index look far worse than it is.
+    """
+    if basis is None:
+        basis = rng.standard_normal((intrinsic_dim, DIM)).astype(np.float32)
+    latent = rng.standard_normal((n, basis.shape[0])).astype(np.float32)
+    vectors = latent @ basis + 0.5 * rng.standard_normal((n, DIM)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors, basis
+
+
+def index_bytes(index):
+    return faiss.serialize_index(index).nbytes
+
+
+def evaluate(index, queries, ground_truth):
+    start = time.perf_counter()
+    _, I = index.search(queries, K)
+    latency_ms = (time.perf_counter() - start) / len(queries) * 1000
+    recall = np.mean([len(set(I[i]) & set(ground_truth[i])) / K for i in range(len(queries))])
+    return recall, latency_ms
+
+
+def build(policy, kind, vectors, ids):
+    start = time.perf_counter()
+    index = policy.build(kind, DIM, train_vectors=vectors)
+    index.add_with_ids(vectors, ids)
+    return index, time.perf_counter() - start
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    faiss.omp_set_num_threads(1)  # per-query latency, as seen by one request thread
+    rng = np.random.default_rng(0)
+    vectors, basis = synthetic_embeddings(n, rng)
+    queries, _ = synthetic_embeddings(QUERIES, rng, basis=basis)
+    ids = np.arange(n, dtype=np.int64)
+
+    policy = IndexPolicy()
+    flat, flat_build = build(policy, INDEX_FLAT, vectors, ids)
+    _, ground_truth = flat.search(queries, K)
+    flat_recall, flat_ms = evaluate(flat, queries, ground_truth)
+
+    print(f"{n} vectors, {QUERIES} queries, recall@{K}\n")
+    print(f"{'index':<34} | {'recall':>6} | {'ms/query':>8} | {'build (s)':>9} | {'bytes/vec':>9}")
+    print(f"{'flat':<34} | {flat_recall:>6.3f} | {flat_ms:>8.3f} | {flat_build:>9.1f} | {index_bytes(flat) / n:>9.0f}")
+
+    for m in (16, 32):
+        policy = IndexPolicy(hnsw_m=m)
+        hnsw, build_s = build(policy, INDEX_HNSW, vectors, ids)
+        size = index_bytes(hnsw) / n
+        for ef in (16, 32, 64, 128, 256):
+            faiss.downcast_index(hnsw.index).hnsw.efSearch = ef
+            recall, ms = evaluate(hnsw, queries, ground_truth)
+            print(f"{f'hnsw M={m} efSearch={ef}':<34} | {recall:>6.3f} | {ms:>8.3f} | {build_s:>9.1f} | {size:>9.0f}")
+
+    for pq_m in (24, 48):
+        policy = IndexPolicy(pq_m=pq_m)
+        if not policy.can_build(INDEX_IVFPQ, n):
+            print(f"ivfpq: {n} vectors are too few to train the codebooks")
+            break
+        ivfpq, build_s = build(policy, INDEX_IVFPQ, vectors, ids)
+        size = index_bytes(ivfpq) / n
+        for nprobe in (4, 8, 16, 32, 64):
+            ivfpq.nprobe = nprobe
+            recall, ms = evaluate(ivfpq, queries, ground_truth)
+            label = f"ivfpq nlist={ivfpq.nlist} m={pq_m} nprobe={nprobe}"
+            print(f"{label:<34} | {recall:>6.3f} | {ms:>8.3f} | {build_s:>9.1f} | {size:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
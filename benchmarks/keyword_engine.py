@@ -0,0 +1,97 @@
+"""
+Microbenchmark: per-skill substring counting vs the word-level Aho-Corasick keyword engine.
+
+Builds synthetic CVs of growing length from a skill vocabulary and filler words, with
+section headings and skills that contain each other ("java" / "javascript"). It then
+counts every skill of growing skill lists two ways. The old way is
+``text.lower().count(skill)`` per skill. The new way is KeywordAutomaton over a
+TextDocument. Its cold time builds the document (tokenize and section headings) and the
+automaton inside the timed run, as the first analysis of a CV does; the two setup
+costs are also shown on their own. Its warm time reuses both, as the later nodes of the
+same run do. Also reports how many substring counts came from inside longer words,
+which the whole-word engine does not count.
+
+Usage:
+    python -m benchmarks.keyword_engine [repeats]
+"""
+import random
+import sys
+import time
+
+from utils.text_analysis import KeywordAutomaton, TextDocument
+
+BASE_SKILLS = ["python", "java", "javascript", "sql", "nosql", "go", "react", "react native", "c", "c++", "r",
+               "machine learning", "learning", "aws", "docker", "kubernetes", "communication", "leadership"]
+FILLER = ("built led designed improved shipped team product users platform pipeline service data "
+          "quality reliability growth customers scale latency cost reduced increased delivered").split()
+HEADINGS = ["Summary", "Work Experience", "Education", "Skills", "Projects", "Certifications"]
+
+
+def make_skills(count, rng):
+    skills = list(BASE_SKILLS)
+    while len(skills) < count:
+        skills.append(f"{rng.choice(['cloud', 'data', 'web', 'ml', 'api'])}{len(skills)} "
+                      f"{rng.choice(['engineering', 'design', 'ops', 'analytics'])}")
+    return skills[:count]
+
+
+def make_cv(words, skills, rng):
+    lines, line = [], []
+    per_section = max(1, words // len(HEADINGS))
+    for i in range(words):
+        if i % per_section == 0:
+            lines.append(" ".join(line))
+            lines.append(HEADINGS[(i // per_section) % len(HEADINGS)])
+            line = []
+        line.append(rng.choice(skills) if rng.random() < 0.15 else rng.choice(FILLER))
+        if len(line) == 12:
+            lines.append(" ".join(line) + ".")
+            line = []
+    lines.append(" ".join(line))
+    return "\n".join(lines)
+
+
+def best_of(repeats, fn):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    rng = random.Random(7)
+    print(f"{'cv words':>8} | {'skills':>6} | {'substring ms':>12} | {'document ms':>11} | {'automaton ms':>12} | "
+          f"{'AC cold ms':>10} | {'AC warm ms':>10} | {'cold/old':>8} | {'warm/old':>8} | {'inflated':>8}")
+    for words in (1000, 10000, 50000):
+        for skill_count in (50, 500, 2000):
+            skills = make_skills(skill_count, rng)
+            cv_text = make_cv(words, skills, rng)
+
+            def substring():
+                return {skill: cv_text.lower().count(skill.lower()) for skill in skills}
+
+            def cold():
+                return {skill: hits.count for skill, hits in KeywordAutomaton(skills).scan(TextDocument(cv_text)).items()}
+
+            automaton, doc = KeywordAutomaton(skills), TextDocument(cv_text)
+
+            def warm():
+                return {skill: hits.count for skill, hits in automaton.scan(doc).items()}
+
+            substring_seconds, substring_counts = best_of(repeats, substring)
+            document_seconds, _ = best_of(repeats, lambda: TextDocument(cv_text))
+            automaton_seconds, _ = best_of(repeats, lambda: KeywordAutomaton(skills))
+            cold_seconds, _ = best_of(repeats, cold)
+            warm_seconds, counts = best_of(repeats, warm)
+            # Substring counts above the whole-word counts are hits inside longer words ("java" in "javascript")
+            inflated = sum(substring_counts[skill] - counts[skill] for skill in skills)
+            print(f"{words:>8} | {skill_count:>6} | {1000 * substring_seconds:>12.2f} | {1000 * document_seconds:>11.2f} | "
+                  f"{1000 * automaton_seconds:>12.2f} | {1000 * cold_seconds:>10.2f} | {1000 * warm_seconds:>10.2f} | "
+                  f"{cold_seconds / substring_seconds:>7.2f}x | {warm_seconds / substring_seconds:>7.2f}x | {inflated:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Benchmark: sequential LLMService.invoke vs LLMService.invoke_many.
+
+Starts a local fake OpenAI server that answers /v1/chat/completions after a fixed
+delay, standing in for the model's generation time. It points LLMService at the
+server and sends the same batch of prompts three ways: one invoke() at a time,
+invoke_many() at several concurrency levels, and asyncio.gather over ainvoke(). The
+response cache is bypassed. Reports prompts/s and the connections the server
+accepted, which shows keep-alive reuse. Every 10th prompt makes the server fail, to
+show per-prompt errors.
+
+Usage:
+    python -m benchmarks.llm_concurrency [num_prompts] [delay_ms]
+"""
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DELAY = 0.1
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep connections alive between requests
+    connections = 0
+
+    def setup(self):
+        super().setup()
+        FakeOpenAIHandler.connections += 1
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        prompt = body["messages"][-1]["content"]
+        time.sleep(DELAY)
+        if prompt.endswith("fail"):
+            payload = json.dumps({"error": {"message": "fake failure", "type": "invalid_request_error"}}).encode()
+            self.send_response(400)
+        else:
+            payload = json.dumps({
+                "id": "chatcmpl-fake",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body["model"],
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": f"echo: {prompt}"}}],
+                "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15},
+            }).encode()
+            self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+def timed(label, fn, n):
+    FakeOpenAIHandler.connections = 0
+    start = time.perf_counter()
+    results = fn()
+    seconds = time.perf_counter() - start
+    print(f"{label:<28} | {n / seconds:>9.1f} | {seconds:>7.2f} | {FakeOpenAIHandler.connections:>11}")
+    return results
+
+
+def main():
+    global DELAY
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    DELAY = (float(sys.argv[2]) if len(sys.argv) > 2 else 100) / 1000
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeOpenAIHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.environ["OPENAI_API_KEY"] = "sk-fake"
+
+    from config.config import Config
+    Config.OPENAI_BASE_URL = f"http://127.0.0.1:{server.server_port}/v1"
+    Config.LLM_HTTP2 = False  # the fake server speaks HTTP/1.1 only
+    Config.LLM_REQUESTS_PER_MINUTE = 0  # measure the connection pool, not the rate limiter
+    from services.llm_service import LLMService
+
+    prompts = [f"prompt {i}" + (" fail" if i % 10 == 9 else "") for i in range(n)]
+    print(f"{n} prompts, {DELAY * 1000:.0f} ms simulated generation time, {n // 10} failing\n")
+    print(f"{'mode':<28} | {'prompts/s':>9} | {'seconds':>7} | {'connections':>11}")
+
+    def sequential():
+        results = []
+        for prompt in prompts:
+            try:
+                results.append(LLMService.invoke(prompt, cache=False))
+            except Exception as e:
+                results.append(e)
+        return results
+
+    timed("invoke, sequential", sequential, n)
+    for concurrency in (4, 16, 64):
+        results = timed(f"invoke_many, concurrency {concurrency}",
+                        lambda: LLMService.invoke_many(prompts, max_concurrency=concurrency, cache=False), n)
+
+    async def gather():
+        return await asyncio.gather(*(LLMService.ainvoke(prompt, cache=False) for prompt in prompts),
+                                    return_exceptions=True)
+
+    timed("ainvoke + asyncio.gather", lambda: asyncio.run(gather()), n)
+
+    in_order = all(result.prompt == prompt for result, prompt in zip(results, prompts))
+    failed = [result for result in results if not result.ok]
+    print(f"\ninvoke_many results in input order: {in_order}; {len(failed)} errors captured, e.g. "
+          f"{type(failed[0].error).__name__ if failed else None}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
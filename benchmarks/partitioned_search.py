@@ -0,0 +1,75 @@
+"""
+Benchmark: per-query search cost as the number of users grows.
+
+Every user owns a fixed number of CVs (the app caps uploads at 5). Compares
+searching one shared flat index and keeping the caller's hits (the old layout),
+an ID-selector filtered search over the shared index, and the per-user
+PartitionedIndex that RAGService now uses. Vectors are synthetic 384-d embeddings.
+
+Usage:
+    python -m benchmarks.partitioned_search
+"""
+import time
+import faiss
+import numpy as np
+from utils.partitioned_index import PartitionedIndex
+
+DIM = 384
+DOCS_PER_USER = 5
+USER_COUNTS = [100, 1_000, 10_000, 50_000]
+TOP_K = 3
+QUERIES = 50
+
+
+def _per_query_ms(fn, queries):
+    start = time.perf_counter()
+    for query in queries:
+        fn(query)
+    return (time.perf_counter() - start) / len(queries) * 1000
+
+
+def run(users, rng):
+    total = users * DOCS_PER_USER
+    vectors = rng.standard_normal((total, DIM)).astype(np.float32)
+    rows = np.arange(total, dtype=np.int64)
+    owners = rows // DOCS_PER_USER
+    queries = rng.standard_normal((QUERIES, DIM)).astype(np.float32)
+    caller = int(rng.integers(0, users))
+    caller_rows = rows[owners == caller]
+
+    shared = faiss.IndexIDMap(faiss.IndexFlatL2(DIM))
+    shared.add_with_ids(vectors, rows)
+
+    def post_filter(query):
+        # Old behaviour: search everyone, then drop other tenants' hits
+        _, I = shared.search(query[None, :], TOP_K * 10)
+        return [i for i in I[0] if owners[i] == caller][:TOP_K]
+
+    params = faiss.SearchParameters(sel=faiss.IDSelectorBatch(caller_rows))
+
+    def selector(query):
+        return shared.search(query[None, :], TOP_K, params=params)
+
+    partitioned = PartitionedIndex(DIM)
+    for owner in range(users):
+        start = owner * DOCS_PER_USER
+        partitioned.add(vectors[start:start + DOCS_PER_USER], rows[start:start + DOCS_PER_USER], owner=owner)
+
+    def per_user(query):
+        return partitioned.search(query, TOP_K, owner=caller)
+
+    return (_per_query_ms(post_filter, queries),
+            _per_query_ms(selector, queries),
+            _per_query_ms(per_user, queries))
+
+
+def main():
+    rng = np.random.default_rng(7)
+    print(f"{'users':>8} | {'vectors':>9} | {'shared+filter (ms)':>18} | {'id selector (ms)':>16} | {'partitioned (ms)':>16}")
+    for users in USER_COUNTS:
+        post_filter_ms, selector_ms, partitioned_ms = run(users, rng)
+        print(f"{users:>8} | {users * DOCS_PER_USER:>9} | {post_filter_ms:>18.3f} | {selector_ms:>16.3f} | {partitioned_ms:>16.4f}")
+
+
+if __name__ == "__main__":
+    main()
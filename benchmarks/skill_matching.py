@@ -0,0 +1,124 @@
+"""
+Benchmark: semantic skill matching with embeddings vs the LLM prompt.
+
+Runs labelled CV/job skill lists through the SkillMatcher. The lists hold synonyms,
+abbreviations, near-miss distractors ("java" / "javascript") and cases with nothing to
+match. Reports pair precision, recall and F1 for each similarity threshold in the sweep,
+for Hungarian and greedy assignment, plus the latency per case with the embedding cache
+cold and warm. The embedding model is Config.RAG_MODEL_NAME, and
+Config.SKILL_MATCH_THRESHOLD is marked in the sweep. When OPENAI_API_KEY is set, the
+original LLM prompt (llm_semantic_matches) runs on the same cases as the baseline, with
+the response cache off.
+
+Usage:
+    python -m benchmarks.skill_matching [thresholds, e.g. 0.5,0.6,0.7]
+"""
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+
+# (remaining CV skills, remaining job skills, expected (cv_skill, job_skill) pairs)
+CASES = [
+    (["js", "reactjs", "node", "photoshop"], ["javascript", "react", "node.js", "kubernetes"],
+     {("js", "javascript"), ("reactjs", "react"), ("node", "node.js")}),
+    (["k8s", "aws ec2", "terraform scripting"], ["kubernetes", "amazon web services", "infrastructure as code", "azure"],
+     {("k8s", "kubernetes"), ("aws ec2", "amazon web services"), ("terraform scripting", "infrastructure as code")}),
+    (["ml", "deep neural networks", "excel"], ["machine learning", "deep learning", "tableau"],
+     {("ml", "machine learning"), ("deep neural networks", "deep learning")}),
+    (["postgres", "mongo", "java"], ["postgresql", "mongodb", "javascript"],
+     {("postgres", "postgresql"), ("mongo", "mongodb")}),
+    (["team leadership", "public speaking", "python"], ["leadership", "presentation skills", "go"],
+     {("team leadership", "leadership"), ("public speaking", "presentation skills")}),
+    (["ci/cd pipelines", "unit testing", "figma"], ["continuous integration", "test automation", "sketch"],
+     {("ci/cd pipelines", "continuous integration"), ("unit testing", "test automation")}),
+    (["nlp", "pytorch"], ["natural language processing", "tensorflow", "computer vision"],
+     {("nlp", "natural language processing")}),
+    (["stakeholder management", "agile", "sql"], ["stakeholder communication", "scrum", "nosql"],
+     {("stakeholder management", "stakeholder communication"), ("agile", "scrum")}),
+    (["c#", ".net core"], ["c++", "asp.net"], {(".net core", "asp.net")}),
+    (["data viz", "statistics"], ["data visualization", "statistical analysis", "accounting"],
+     {("data viz", "data visualization"), ("statistics", "statistical analysis")}),
+    (["gcp", "bigquery", "airflow"], ["google cloud platform", "data warehousing", "workflow orchestration"],
+     {("gcp", "google cloud platform"), ("bigquery", "data warehousing"), ("airflow", "workflow orchestration")}),
+    (["customer service", "cold calling"], ["client relations", "lead generation", "bookkeeping"],
+     {("customer service", "client relations"), ("cold calling", "lead generation")}),
+    # Nothing in these should match: every pair the matcher reports is a false positive
+    (["welding", "forklift operation"], ["python", "react", "product management"], set()),
+    (["java", "spring boot"], ["javascript", "vue.js"], set()),
+    (["copywriting", "seo"], ["embedded c", "fpga design"], set()),
+]
+THRESHOLDS = (0.5, 0.55, 0.6, 0.65, 0.7, 0.75, 0.8, 0.85, 0.9)
+
+
+def score(predicted, expected):
+    true_positives = len(predicted & expected)
+    return true_positives, len(predicted), len(expected)
+
+
+def report(label, run):
+    """Print and return ``(precision, recall, F1)`` of ``run`` over every case"""
+    true_positives = predicted = expected = 0
+    latencies = []
+    for cv_skills, job_skills, gold in CASES:
+        start = time.perf_counter()
+        pairs = run(cv_skills, job_skills)
+        latencies.append(time.perf_counter() - start)
+        tp, p, e = score(pairs, gold)
+        true_positives, predicted, expected = true_positives + tp, predicted + p, expected + e
+    precision = true_positives / predicted if predicted else 0.0
+    recall = true_positives / expected if expected else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    print(f"{label:<30} | {precision:>9.2f} | {recall:>6.2f} | {f1:>5.2f} | {1000 * np.median(latencies):>10.1f}")
+    return precision, recall, f1
+
+
+def main():
+    thresholds = tuple(float(value) for value in sys.argv[1].split(",")) if len(sys.argv) > 1 else THRESHOLDS
+    from config.config import Config
+    Config.LLM_CACHE_ENABLED = False  # time real LLM calls
+    from sentence_transformers import SentenceTransformer
+    from utils.embedding_cache import EmbeddingCache
+    from utils.skill_matcher import SkillMatcher
+
+    model = SentenceTransformer(Config.RAG_MODEL_NAME)
+    cache = EmbeddingCache(tempfile.mkdtemp(prefix="skill_bench_"), Config.RAG_MODEL_NAME,
+                           model.get_sentence_embedding_dimension())
+
+    def embed(texts):
+        return cache.encode(texts, lambda missing: np.asarray(model.encode(missing), dtype=np.float32))
+
+    def matcher_run(threshold, assignment):
+        matcher = SkillMatcher(embed, threshold=threshold, tie_break_band=Config.SKILL_MATCH_TIE_BREAK_BAND,
+                               assignment=assignment)
+        return lambda cv_skills, job_skills: {
+            (pair.cv_skill, pair.job_skill) for pair in matcher.match(cv_skills, job_skills)[0]}
+
+    expected = sum(len(gold) for _, _, gold in CASES)
+    print(f"{len(CASES)} cases, {expected} expected pairs, model {Config.RAG_MODEL_NAME}, "
+          f"configured threshold {Config.SKILL_MATCH_THRESHOLD}\n")
+    print(f"{'method':<30} | {'precision':>9} | {'recall':>6} | {'F1':>5} | {'ms/case p50':>10}")
+    report("embedding, cold cache", matcher_run(Config.SKILL_MATCH_THRESHOLD, Config.SKILL_MATCH_ASSIGNMENT))
+    best = {}
+    for assignment in ("hungarian", "greedy"):
+        for threshold in thresholds:
+            marker = " *" if threshold == Config.SKILL_MATCH_THRESHOLD else ""
+            _, _, f1 = report(f"{assignment} @ {threshold:.2f}{marker}", matcher_run(threshold, assignment))
+            if f1 > best.get(assignment, (None, -1.0))[1]:
+                best[assignment] = (threshold, f1)
+
+    if os.environ.get("OPENAI_API_KEY"):
+        from utils.workflow import llm_semantic_matches
+        report("LLM prompt (baseline)", lambda cv_skills, job_skills: {
+            (pair["cv_skill"], pair["job_skill"]) for pair in llm_semantic_matches(cv_skills, job_skills)})
+    else:
+        print(f"{'LLM prompt (baseline)':<30} | skipped: set OPENAI_API_KEY to compare")
+
+    print("\n* configured threshold (SKILL_MATCH_THRESHOLD)")
+    for assignment, (threshold, f1) in best.items():
+        print(f"best {assignment} F1: {f1:.2f} at threshold {threshold:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Benchmark: the CV matching workflow run as parallel branches vs one node at a time.
+
+LLMService.invoke is replaced by a fake that sleeps a fixed delay per call and returns
+plausible JSON for each prompt, so the timings show only how calls are scheduled. The
+sequential baseline runs the same nodes in the original straight-line order. The
+parallel run uses the compiled graph. The critical path is the longest chain of the
+graph's edges, weighted by each node's time measured in the sequential run. The script
+asserts that the parallel run stays close to it.
+
+Usage:
+    python -m benchmarks.workflow_parallel [runs] [delay_ms]
+"""
+import json
+import sys
+import threading
+import time
+from langchain_core.messages import AIMessage
+
+DELAY = 0.2
+
+CV_TEXT = """Jane Doe - jane@example.com
+Experience: Senior data engineer, built Python and SQL pipelines on AWS, cut costs by 30%.
+Education: BSc Computer Science
+Skills: python, sql, aws, airflow, leadership, communication"""
+
+JOB_DESC = """Data Engineer (fintech). Requirements: python, sql, spark, aws; strong communication
+and teamwork; 3+ years building data pipelines; degree in a quantitative field."""
+
+RESPONSES = [
+    ("identify the industry/sector", {"industry": "Fintech", "domain_keywords": ["payments", "risk"]}),
+    ("Extract skills from the CV", {"technical_skills": ["python", "sql", "aws", "airflow"],
+                                    "soft_skills": ["leadership", "communication"]}),
+    ("Extract requirements", {"technical_skills": ["python", "sql", "spark", "aws"],
+                              "soft_skills": ["communication", "teamwork"],
+                              "experience": ["3+ years"], "education": ["degree"],
+                              "industry_knowledge": ["payments"]}),
+    ("Identify semantic matches", [{"cv_skill": "airflow", "job_skill": "spark"}]),
+    ("ATS (Applicant Tracking System)", {"ats_score": 72}),
+    ("positions the candidate competitively", {"competitive_score": 65}),
+]
+
+
+class FakeLLM:
+    """Stands in for LLMService.invoke: fixed delay, canned content, call counting"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = 0
+
+    def invoke(self, prompt, cache=True, priority=None, validate=None):
+        with self.lock:
+            self.calls += 1
+        time.sleep(DELAY)
+        for marker, payload in RESPONSES:
+            if marker in prompt:
+                return AIMessage(content=json.dumps(payload))
+        return AIMessage(content="# Generated text")
+
+
+SEQUENTIAL_ORDER = ["identify_industry", "extract_cv_skills", "extract_job_requirements", "match_skills",
+                    "ats_analysis", "competitive_analysis", "rule_based_analysis", "optimize_cv",
+                    "generate_cover_letter"]
+
+
+def run_sequential(workflow_module, state, node_seconds):
+    state = dict(state, analysis_results={})
+    for name in SEQUENTIAL_ORDER:
+        start = time.perf_counter()
+        update = getattr(workflow_module, name)(state)
+        node_seconds[name] = time.perf_counter() - start
+        analysis_results = workflow_module.merge_dicts(state["analysis_results"], update.pop("analysis_results", {}))
+        state.update(update, analysis_results=analysis_results)
+    return state
+
+
+def critical_path(graph, node_seconds):
+    """Longest START -> END chain of ``graph`` weighted by node time: ``(seconds, nodes)``"""
+    following = {}
+    for edge in graph.edges:
+        following.setdefault(edge.source, []).append(edge.target)
+    best = {}
+
+    def longest(node):
+        if node not in best:
+            tails = [longest(target) for target in following.get(node, [])]
+            seconds, nodes = max(tails, key=lambda tail: tail[0]) if tails else (0.0, [])
+            best[node] = (seconds + node_seconds.get(node, 0.0), ([node] if node in node_seconds else []) + nodes)
+        return best[node]
+
+    return longest("__start__")
+
+
+def main():
+    global DELAY
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    DELAY = (float(sys.argv[2]) if len(sys.argv) > 2 else 200) / 1000
+
+    from config.config import Config
+    Config.JOB_ANALYSIS_CACHE_ENABLED = False  # time every run's job-description prompts
+    Config.SKILL_MATCH_METHOD = "llm"  # the LLM semantic-match call stays on the critical path
+    from services.llm_service import LLMService
+    fake = FakeLLM()
+    LLMService.invoke = fake.invoke
+    from utils import workflow
+
+    state = {"cv_text": CV_TEXT, "job_desc": JOB_DESC}
+    print(f"{runs} runs, {DELAY * 1000:.0f} ms per LLM call\n")
+    print(f"{'mode':<12} | {'calls/run':>9} | {'seconds/run':>11}")
+    results, timings = {}, {}
+    node_seconds = {}
+    for label, run in (("sequential", lambda: run_sequential(workflow, state, node_seconds)),
+                       ("parallel", lambda: workflow.matching_workflow.invoke(state))):
+        fake.calls = 0
+        start = time.perf_counter()
+        for _ in range(runs):
+            results[label] = run()
+        seconds = (time.perf_counter() - start) / runs
+        timings[label] = seconds
+        print(f"{label:<12} | {fake.calls / runs:>9.0f} | {seconds:>11.2f}")
+
+    keys = ("match_percentage", "weighted_match_percentage", "optimized_cv", "cover_letter")
+    same = all(results["sequential"][key] == results["parallel"][key] for key in keys) and \
+        results["sequential"]["analysis_results"] == results["parallel"]["analysis_results"]
+    path_seconds, path = critical_path(workflow.matching_workflow.get_graph(), node_seconds)
+    print(f"\ncritical path ({len(path)} nodes, measured): {' -> '.join(path)} = {path_seconds:.2f} s")
+    print(f"parallel / critical path: {timings['parallel'] / path_seconds:.2f}; results identical: {same}")
+    assert same, "parallel and sequential runs disagree"
+    # Each superstep adds a little scheduling overhead on top of the slowest call in it
+    assert timings["parallel"] <= path_seconds * 1.15 + 0.05, "parallel run is well above the critical path"
+
+
+if __name__ == "__main__":
+    main()
@@ -11,4 +11,57 @@ class Config:
     UPLOAD_FOLDER = 'uploads'
     SESSION_PERMANENT = True
     SESSION_TYPE = 'filesystem'
-    OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY')
\ No newline at end of file
+    OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY')
+    OPENAI_BASE_URL = os.environ.get('OPENAI_BASE_URL') or None  # e.g. a proxy or a local OpenAI-compatible server
+    RAG_INDEX_DIR = os.environ.get('RAG_INDEX_DIR') or os.path.join('instance', 'rag_index')
+    RAG_MODEL_NAME = os.environ.get('RAG_MODEL_NAME', 'all-MiniLM-L6-v2')  # used for new index versions
+    RAG_VERSION_CHECK_SECONDS = float(os.environ.get('RAG_VERSION_CHECK_SECONDS', 5))
+    RAG_GLOBAL_PARTITION = os.environ.get('RAG_GLOBAL_PARTITION', '').lower() in ('1', 'true', 'yes')
+    RAG_INDEX_TYPE = os.environ.get('RAG_INDEX_TYPE', 'auto')  # auto, flat, hnsw or ivfpq
+    RAG_HNSW_MIN_VECTORS = int(os.environ.get('RAG_HNSW_MIN_VECTORS', 20000))
+    RAG_IVFPQ_MIN_VECTORS = int(os.environ.get('RAG_IVFPQ_MIN_VECTORS', 500000))
+    RAG_VECTOR_STORAGE = os.environ.get('RAG_VECTOR_STORAGE', 'float32')  # float32, float16 or int8
+    RAG_COMPACT_DEAD_RATIO = float(os.environ.get('RAG_COMPACT_DEAD_RATIO', 0.2))
+    RAG_COMPACT_MIN_DEAD = int(os.environ.get('RAG_COMPACT_MIN_DEAD', 64))
+    RAG_CHUNK_MAX_WORDS = int(os.environ.get('RAG_CHUNK_MAX_WORDS', 160))
+    RAG_CHUNK_OVERLAP_WORDS = int(os.environ.get('RAG_CHUNK_OVERLAP_WORDS', 32))
+    RAG_HYBRID_SEARCH = os.environ.get('RAG_HYBRID_SEARCH', 'true').lower() in ('1', 'true', 'yes')
+    RAG_HYBRID_CANDIDATES = int(os.environ.get('RAG_HYBRID_CANDIDATES', 20))  # hits taken from each retriever
+    RAG_RRF_K = int(os.environ.get('RAG_RRF_K', 60))
+    RAG_ENCODE_BATCH_SIZE = int(os.environ.get('RAG_ENCODE_BATCH_SIZE', 32))
+    RAG_ENCODE_MAX_WAIT_MS = float(os.environ.get('RAG_ENCODE_MAX_WAIT_MS', 5))
+    RAG_EMBEDDING_CACHE_DIR = os.environ.get('RAG_EMBEDDING_CACHE_DIR') or os.path.join('instance', 'embedding_cache')
+    RAG_EMBEDDING_CACHE_MB = int(os.environ.get('RAG_EMBEDDING_CACHE_MB', 256))
+    RAG_EMBEDDING_CACHE_MEMORY_ITEMS = int(os.environ.get('RAG_EMBEDDING_CACHE_MEMORY_ITEMS', 4096))
+    RAG_QUERY_EMBEDDING_TTL = float(os.environ.get('RAG_QUERY_EMBEDDING_TTL', 3600))  # seconds
+    RAG_QUERY_CACHE_ITEMS = int(os.environ.get('RAG_QUERY_CACHE_ITEMS', 10000))
+    RAG_ANSWER_CACHE_TTL = float(os.environ.get('RAG_ANSWER_CACHE_TTL', 600))  # seconds; 0 disables answer caching
+    RAG_ANSWER_CACHE_ITEMS = int(os.environ.get('RAG_ANSWER_CACHE_ITEMS', 2000))
+    RAG_CONTEXT_TOKEN_BUDGET = int(os.environ.get('RAG_CONTEXT_TOKEN_BUDGET', 1500))  # estimated tokens of retrieved text per prompt
+    RAG_CONTEXT_CANDIDATES = int(os.environ.get('RAG_CONTEXT_CANDIDATES', 8))  # passages retrieved for the packer to choose from
+    RAG_DAEMON_SOCKET = os.environ.get('RAG_DAEMON_SOCKET', os.path.join('instance', 'rag.sock'))  # empty: never use a daemon
+    RAG_DAEMON_RETRY_SECONDS = float(os.environ.get('RAG_DAEMON_RETRY_SECONDS', 10))
+    LLM_CACHE_ENABLED = os.environ.get('LLM_CACHE_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    LLM_CACHE_DIR = os.environ.get('LLM_CACHE_DIR') or os.path.join('instance', 'llm_cache')
+    LLM_CACHE_TTL = float(os.environ.get('LLM_CACHE_TTL', 7 * 24 * 3600))  # seconds
+    LLM_CACHE_MB = int(os.environ.get('LLM_CACHE_MB', 128))
+    LLM_HTTP2 = os.environ.get('LLM_HTTP2', 'true').lower() in ('1', 'true', 'yes')
+    LLM_MAX_CONNECTIONS = int(os.environ.get('LLM_MAX_CONNECTIONS', 20))
+    LLM_KEEPALIVE_SECONDS = float(os.environ.get('LLM_KEEPALIVE_SECONDS', 60))
+    LLM_TIMEOUT_SECONDS = float(os.environ.get('LLM_TIMEOUT_SECONDS', 60))
+    LLM_MAX_CONCURRENCY = int(os.environ.get('LLM_MAX_CONCURRENCY', 8))  # prompts in flight per invoke_many call
+    LLM_REQUESTS_PER_MINUTE = int(os.environ.get('LLM_REQUESTS_PER_MINUTE', 500))  # 0 disables rate limiting
+    LLM_TOKENS_PER_MINUTE = int(os.environ.get('LLM_TOKENS_PER_MINUTE', 200000))
+    LLM_COMPLETION_TOKENS_ESTIMATE = int(os.environ.get('LLM_COMPLETION_TOKENS_ESTIMATE', 512))  # reserved per call until usage is known
+    LLM_RATE_LIMIT_DB = os.environ.get('LLM_RATE_LIMIT_DB') or None  # SQLite file to share the limits across processes
+    LLM_RETRY_ATTEMPTS = int(os.environ.get('LLM_RETRY_ATTEMPTS', 6))
+    LLM_RETRY_BASE_SECONDS = float(os.environ.get('LLM_RETRY_BASE_SECONDS', 1))
+    LLM_RETRY_MAX_SECONDS = float(os.environ.get('LLM_RETRY_MAX_SECONDS', 60))
+    JOB_ANALYSIS_CACHE_ENABLED = os.environ.get('JOB_ANALYSIS_CACHE_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    JOB_ANALYSIS_CACHE_DB = os.environ.get('JOB_ANALYSIS_CACHE_DB') or os.path.join('instance', 'job_analysis_cache.sqlite')
+    JOB_ANALYSIS_CACHE_TTL = float(os.environ.get('JOB_ANALYSIS_CACHE_TTL', 30 * 24 * 3600))  # seconds
+    SKILL_MATCH_METHOD = os.environ.get('SKILL_MATCH_METHOD', 'embedding')  # embedding or llm
+    SKILL_MATCH_THRESHOLD = float(os.environ.get('SKILL_MATCH_THRESHOLD', 0.7))  # cosine similarity
+    SKILL_MATCH_ASSIGNMENT = os.environ.get('SKILL_MATCH_ASSIGNMENT', 'hungarian')  # hungarian or greedy
+    SKILL_MATCH_LLM_TIE_BREAK = os.environ.get('SKILL_MATCH_LLM_TIE_BREAK', 'false').lower() in ('1', 'true', 'yes')
+    SKILL_MATCH_TIE_BREAK_BAND = float(os.environ.get('SKILL_MATCH_TIE_BREAK_BAND', 0.1))  # similarity below the threshold sent to the tie-breaker
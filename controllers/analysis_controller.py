@@ -27,6 +27,7 @@ def analyze():
         cv_filename = None
         cv_skills = []
         cv_id = None
+        selected_cv = None
 
         if cv_selection == 'new' or not pre_uploaded_cvs:
             if not can_upload_new:
@@ -76,7 +77,8 @@ def analyze():
             user_id=current_user.id,
             cv_filename=cv_filename if save_cv else None,
             cv_skills=cv_skills,
-            save_cv=save_cv
+            save_cv=save_cv,
+            stored_cv=selected_cv
         )
         
         # If a CV was saved or used from existing, store the ID for template use
@@ -1,16 +1,52 @@
-from flask import render_template, request
+import json
+from flask import Response, render_template, request, stream_with_context
+from flask_login import current_user
 from services.rag_service import RAGService
 
+def _chat_message():
+    """The chat message of a form or JSON post; the chat page sends ``message``"""
+    data = request.get_json(silent=True) or request.form
+    return (data.get('message') or data.get('user_input') or '').strip()
+
 def chat():
     """Handle chat functionality using RAG for question answering"""
     response = None
     user_input = None
     
     if request.method == 'POST':
-        user_input = request.form['user_input']
+        user_input = _chat_message()
         
-        # Get RAG service and query
+        # Get RAG service and query the user's own documents
         rag_service = RAGService.get_instance()
-        response = rag_service.query(user_input)
+        user_id = current_user.id if current_user.is_authenticated else None
+        response = rag_service.query(user_input, user_id=user_id)
+    
+    return render_template('chat.html', response=response, user_input=user_input)
+
+def _sse(data, event=None):
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+def chat_stream():
+    """Answer a chat message as Server-Sent Events: ``data`` events carry answer pieces, then ``done``"""
+    message = _chat_message()
+    if not message:
+        return Response(_sse({"error": "Empty message"}, event="error"), status=400, mimetype='text/event-stream')
+    
+    rag_service = RAGService.get_instance()
+    user_id = current_user.id if current_user.is_authenticated else None
+    
+    def generate():
+        try:
+            for piece in rag_service.query_stream(message, user_id=user_id):
+                yield _sse({"token": piece})
+            yield _sse({}, event="done")
+        except Exception as e:
+            print(f"[Chat] Streaming error: {e}")
+            yield _sse({"error": "The assistant could not answer right now."}, event="error")
     
-    return render_template('chat.html', response=response, user_input=user_input)
\ No newline at end of file
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
@@ -0,0 +1,70 @@
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from config.config import Config
+from services.rag_daemon import RAGDaemon
+from services.rag_service import RAGService
+from utils.index_versions import IndexVersions
+
+rag_index_cli = AppGroup('rag-index', help='Manage versioned RAG index snapshots.')
+
+
+@rag_index_cli.command('list')
+def list_versions():
+    """List index versions, oldest first; * marks the active one"""
+    versions = IndexVersions(Config.RAG_INDEX_DIR).list()
+    if not versions:
+        click.echo('No index versions.')
+        return
+    for manifest in versions:
+        click.echo(f"{'*' if manifest['active'] else ' '} {manifest['version']:<24} "
+                   f"{manifest.get('status', '?'):<10} {manifest.get('model', '?'):<24} "
+                   f"dim={manifest.get('dim', '?'):<5} documents={manifest.get('documents', '?'):<7} "
+                   f"passages={manifest.get('passages', '?'):<8} {manifest.get('created_at', '')}")
+
+
+@rag_index_cli.command('build')
+@click.option('--model', default=None, help='Embedding model of the new version (default: the serving model).')
+@click.option('--activate/--no-activate', default=True, help='Make the new version active once it is built.')
+def build_version(model, activate):
+    """Build a new index version from the current documents"""
+    rag_service = RAGService.get_instance()
+    version = rag_service.build_version(model_name=model, activate=activate, wait=True)
+    manifest = IndexVersions(Config.RAG_INDEX_DIR).manifest(version) or {}
+    click.echo(f"{version}: {manifest.get('status')}")
+    if manifest.get('status') != 'ready':
+        raise SystemExit(1)
+
+
+@rag_index_cli.command('activate')
+@click.argument('version')
+def activate_version(version):
+    """Make VERSION active; running servers switch to it within RAG_VERSION_CHECK_SECONDS"""
+    try:
+        IndexVersions(Config.RAG_INDEX_DIR).activate(version)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    click.echo(f'Activated {version}')
+
+
+@rag_index_cli.command('prune')
+@click.option('--keep', default=3, show_default=True, help='Number of newest ready versions to keep.')
+def prune_versions(keep):
+    """Delete old, failed and incomplete versions (never the active one)"""
+    removed = IndexVersions(Config.RAG_INDEX_DIR).prune(keep=keep)
+    click.echo(f"Removed {len(removed)} version(s){': ' + ', '.join(removed) if removed else ''}")
+
+
+@rag_index_cli.command('serve')
+@click.option('--socket', 'socket_path', default=None, help='Unix socket to listen on (default: RAG_DAEMON_SOCKET).')
+def serve(socket_path):
+    """Run the RAG daemon: one model and index in memory, shared by every web worker"""
+    socket_path = socket_path or Config.RAG_DAEMON_SOCKET
+    daemon = RAGDaemon(socket_path, app=current_app._get_current_object())
+    click.echo(f'RAG daemon listening on {socket_path}')
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.server_close()
@@ -138,7 +138,7 @@ def ai_edit_section():
     Goal: {goal}
     """
     
-    response = LLMService.invoke(prompt)
+    response = LLMService.invoke(prompt, cache=False)  # asking again should give a new suggestion
     result = response.content
     
     return jsonify({'updated': result})
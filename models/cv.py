@@ -1,3 +1,4 @@
+import json
 from . import db
 
 class CV(db.Model):
@@ -6,6 +7,8 @@ class CV(db.Model):
     filename = db.Column(db.String(120), nullable=False)
     content = db.Column(db.Text, nullable=False)
     skills = db.Column(db.Text)
+    technical_skills = db.Column(db.Text)  # JSON list; NULL until the CV's skills are categorized
+    soft_skills = db.Column(db.Text)  # JSON list
     summary = db.Column(db.Text)
     hyperlinks = db.Column(db.Text)
     generated_resume = db.Column(db.Text, nullable=True)
@@ -17,4 +20,14 @@ class CV(db.Model):
         """Returns a list of skills from the skills string"""
         if not self.skills:
             return []
-        return [skill.strip() for skill in self.skills.split(',') if skill.strip()]
\ No newline at end of file
+        return [skill.strip() for skill in self.skills.split(',') if skill.strip()]
+
+    def skill_split(self):
+        """Returns (technical_skills, soft_skills) lists, or None if the CV has not been categorized"""
+        if self.technical_skills is None or self.soft_skills is None:
+            return None
+        return json.loads(self.technical_skills), json.loads(self.soft_skills)
+
+    def set_skill_split(self, technical_skills, soft_skills):
+        self.technical_skills = json.dumps(list(technical_skills))
+        self.soft_skills = json.dumps(list(soft_skills))
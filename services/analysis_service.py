@@ -5,7 +5,7 @@ from services.rag_service import RAGService
 
 class AnalysisService:
     @staticmethod
-    def analyze_cv_job_match(cv_text, job_desc, user_id, cv_filename=None, cv_skills=None, save_cv=False):
+    def analyze_cv_job_match(cv_text, job_desc, user_id, cv_filename=None, cv_skills=None, save_cv=False, stored_cv=None):
         """
         Analyze the match between a CV and job description
         
@@ -16,23 +16,32 @@ class AnalysisService:
             cv_filename: The filename of the CV (if need to save)
             cv_skills: Any pre-extracted CV skills
             save_cv: Whether to save the CV to the database
+            stored_cv: The CV row being analyzed, if it is already saved; its stored
+                technical/soft skill split replaces the CV-side LLM call
             
         Returns:
             A dictionary with the analysis results
         """
-        # Initialize RAG
-        rag_service = RAGService.get_instance()
-        rag_service.add_document(cv_text)
-        
         # Run analysis workflow
         state = {"cv_text": cv_text, "job_desc": job_desc}
         
-        # Add pre-parsed CV skills to state if available
-        if cv_skills:
-            print(f"Using pre-parsed skills from database: {cv_skills}")
-            state["pre_parsed_skills"] = cv_skills
+        # Add the CV's stored technical/soft skill split to state if available
+        skill_split = stored_cv.skill_split() if stored_cv is not None else None
+        if skill_split:
+            print(f"Using categorized skills from database: {skill_split}")
+            state["pre_parsed_technical_skills"], state["pre_parsed_soft_skills"] = skill_split
             
         result = matching_workflow.invoke(state)
+
+        # Stored CVs uploaded before skills were categorized keep the split extracted now,
+        # so analyzing them again costs no CV-side LLM calls
+        if stored_cv is not None and skill_split is None and result['cv_skills']:
+            try:
+                stored_cv.set_skill_split(result['cv_technical_skills'], result['cv_soft_skills'])
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                print(f"Error saving CV skill split: {e}")
         
         # Save job description
         try:
@@ -56,12 +65,20 @@ class AnalysisService:
                     content=cv_text, 
                     skills=','.join(cv_skills)
                 )
+                if result['cv_skills']:
+                    new_cv.set_skill_split(result['cv_technical_skills'], result['cv_soft_skills'])
                 db.session.add(new_cv)
                 db.session.commit()
                 cv_id = new_cv.id
             except Exception as e:
                 db.session.rollback()
                 print(f"Error saving CV: {e}")
+
+        # Index the CV under its saved id, so the CV table sync finds it instead of embedding
+        # the same text again (idempotent on CV content, so re-analysing does not grow the index)
+        saved_id = cv_id if cv_id is not None else (stored_cv.id if stored_cv is not None else None)
+        rag_service = RAGService.get_instance()
+        rag_service.add_document(cv_text, doc_id=str(saved_id) if saved_id is not None else None, user_id=user_id)
         
         # Process results for view
         analysis_results = result['analysis_results']
@@ -47,12 +47,14 @@ class CVService:
             summary=cv_data["parsed_data"].get("summary", ""),
             hyperlinks=json.dumps(links)  # Store hyperlinks in the database
         )
+        if cv_data["enhanced_skills"]:
+            new_cv.set_skill_split(cv_data["technical_skills"], cv_data["soft_skills"])
 
         db.session.add(new_cv)
         db.session.commit()
 
         rag_service = RAGService.get_instance()
-        rag_service.add_document(cv_text, doc_id=str(new_cv.id))
+        rag_service.add_document(cv_text, doc_id=str(new_cv.id), user_id=user_id)
 
         return new_cv, "CV uploaded and parsed successfully"
 
@@ -90,15 +92,27 @@ class CVService:
         if extra_links:
             extracted_links += extra_links
 
-        parser = LLMCVParser(cv_text=cv_text, extra_links=extracted_links)
+        # Upload parsing is not awaited by a reader, so it yields to interactive LLM calls
+        parser = LLMCVParser(cv_text=cv_text, extra_links=extracted_links, priority=LLMService.BACKGROUND)
         parsed_data = parser.parse()
 
-        enhanced_skills = parsed_data.get("skills", []) + parsed_data.get("technologies", [])
+        soft_skills = CVService._unique_skills(parsed_data.get("soft_skills", []))
+        technical_skills = [
+            skill for skill in CVService._unique_skills(parsed_data.get("skills", []) + parsed_data.get("technologies", []))
+            if skill not in soft_skills
+        ]
 
         return {
             "parsed_data": parsed_data,
-            "enhanced_skills": list(set([s.lower() for s in enhanced_skills if isinstance(s, str)]))
+            "enhanced_skills": technical_skills + soft_skills,
+            "technical_skills": technical_skills,
+            "soft_skills": soft_skills
         }
+
+    @staticmethod
+    def _unique_skills(skills):
+        """Lower-cased, stripped skills without duplicates, in first-seen order"""
+        return list(dict.fromkeys(s.strip().lower() for s in skills if isinstance(s, str) and s.strip()))
     
     @staticmethod
     def get_cv_by_id(cv_id, user_id):
@@ -254,7 +268,7 @@ class CVService:
                 Return JSON:
                 ["Leadership: Team development and mentoring", "ML Engineering: Production-ready model deployment", ...]
                 """
-                comp_response = LLMService.invoke(core_prompt)
+                comp_response = LLMService.invoke(core_prompt, validate=LLMService.json_response)
                 raw_content = comp_response.content.strip()
                 print("[DEBUG] Competency LLM raw output:", raw_content)
                 if raw_content.startswith('['):
@@ -1,7 +1,12 @@
+import threading
 from models import JobDescription, db
-import json
+from config.config import Config
+from utils.jd_cache import JobAnalysisCache
 
 class JobService:
+    _analysis_cache = None
+    _analysis_cache_lock = threading.Lock()
+
     # Mock job dataset (replace with real API in production)
     MOCK_JOBS = [
         {
@@ -49,50 +54,62 @@ class JobService:
             })
         return results
 
-    @staticmethod
-    def analyze_job_description(job_desc):
-        """
-        Analyze a job description to extract requirements and skills.
-        Uses the LLM service for extraction.
+    @classmethod
+    def get_analysis_cache(cls):
+        """The job-description analysis cache shared by all users, or None when it is disabled"""
+        if not Config.JOB_ANALYSIS_CACHE_ENABLED:
+            return None
+        if cls._analysis_cache is None:
+            with cls._analysis_cache_lock:
+                if cls._analysis_cache is None:
+                    from utils.workflow import JOB_ANALYSIS_SCHEMA_VERSION
+                    cls._analysis_cache = JobAnalysisCache(
+                        Config.JOB_ANALYSIS_CACHE_DB,
+                        JOB_ANALYSIS_SCHEMA_VERSION,
+                        ttl=Config.JOB_ANALYSIS_CACHE_TTL
+                    )
+        return cls._analysis_cache
+
+    @classmethod
+    def cached_job_analysis(cls, job_desc):
+        """The stored analysis of ``job_desc`` (or an identical posting), or None"""
+        cache = cls.get_analysis_cache()
+        if cache is None:
+            return None
+        try:
+            return cache.get(job_desc)
+        except Exception as e:
+            print(f"[JD Cache] Lookup failed: {e}")
+            return None
+
+    @classmethod
+    def store_job_analysis(cls, job_desc, analysis):
+        cache = cls.get_analysis_cache()
+        if cache is None:
+            return
+        try:
+            cache.put(job_desc, analysis)
+        except Exception as e:
+            print(f"[JD Cache] Store failed: {e}")
+
+    @classmethod
+    def analyze_job_description(cls, job_desc):
         """
-        from services.llm_service import LLMService
-        
-        prompt = f"""
-        Extract requirements from the job description.
-        
-        Job Description: {job_desc}
-        
-        Return as JSON:
-        {{
-            "technical_skills": ["skill1", "skill2"],
-            "soft_skills": ["skill1", "skill2"],
-            "experience": ["req1", "req2"],
-            "education": ["req1", "req2"],
-            "industry_knowledge": ["req1", "req2"]
-        }}
+        Analyze a job description to extract the industry, requirements and skills.
+        Runs the matching workflow's job-description prompts, through the shared cache.
         """
-        
+        from utils.workflow import JOB_ANALYSIS_FIELDS, identify_industry, extract_job_requirements
+
+        # The nodes look the posting up in the cache first and store a fresh analysis
+        state = {"job_desc": job_desc}
         try:
-            response = LLMService.invoke(prompt)
-            req_dict = json.loads(response.content)
-            
-            technical_skills = [skill.strip().lower() for skill in req_dict.get("technical_skills", [])]
-            soft_skills = [skill.strip().lower() for skill in req_dict.get("soft_skills", [])]
-            experience_reqs = [req.strip().lower() for req in req_dict.get("experience", [])]
-            education_reqs = [req.strip().lower() for req in req_dict.get("education", [])]
-            industry_knowledge = [req.strip().lower() for req in req_dict.get("industry_knowledge", [])]
-            
-            return {
-                "job_technical_skills": technical_skills,
-                "job_soft_skills": soft_skills,
-                "job_experience_reqs": experience_reqs,
-                "job_education_reqs": education_reqs,
-                "job_industry_knowledge": industry_knowledge,
-                "job_skills": technical_skills + soft_skills + industry_knowledge
-            }
+            state.update(identify_industry(state))
+            state.update(extract_job_requirements(state))
         except Exception as e:
             print(f"Error analyzing job description: {e}")
             return {
+                "industry": "General",
+                "domain_keywords": [],
                 "job_technical_skills": [],
                 "job_soft_skills": [],
                 "job_experience_reqs": [],
@@ -100,6 +117,7 @@ class JobService:
                 "job_industry_knowledge": [],
                 "job_skills": []
             }
+        return {field: state[field] for field in JOB_ANALYSIS_FIELDS}
     
     @staticmethod
     def save_job_description(job_desc, user_id):
@@ -1,12 +1,52 @@
+import asyncio
 import json
+import threading
+import httpx
+import openai
 from langchain_openai import ChatOpenAI
+from tenacity import AsyncRetrying, Retrying, retry_if_exception, stop_after_attempt, wait_random_exponential
 import os
 from dotenv import load_dotenv
+from config.config import Config
+from utils.context_packer import estimate_tokens
+from utils.llm_cache import LLMResponseCache
+from utils.rate_limiter import BACKGROUND, INTERACTIVE, RateLimiter
 
 load_dotenv()
 
+class LLMResult:
+    """Outcome of one prompt of ``LLMService.invoke_many``: its response, or the error it raised"""
+
+    __slots__ = ("prompt", "response", "error")
+
+    def __init__(self, prompt, response=None, error=None):
+        self.prompt = prompt
+        self.response = response
+        self.error = error
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    @property
+    def content(self):
+        return self.response.content if self.response is not None else None
+
+
 class LLMService:
     _instance = None
+    _cache = None
+    _cache_lock = threading.Lock()
+    _loop = None
+    _loop_lock = threading.Lock()
+    _limiter = None
+    _limiter_lock = threading.Lock()
+
+    # Priority lanes for the rate limiter: interactive calls go ahead of queued background work
+    INTERACTIVE = INTERACTIVE
+    BACKGROUND = BACKGROUND
+    RETRYABLE_ERRORS = (openai.RateLimitError, openai.APIConnectionError, openai.APITimeoutError,
+                        openai.InternalServerError)
     
     @classmethod
     def get_instance(cls):
@@ -15,13 +55,53 @@ class LLMService:
             api_key = os.getenv("OPENAI_API_KEY")
             if not api_key:
                 raise ValueError("OPENAI_API_KEY not found in .env file")
-            cls._instance = ChatOpenAI(model="gpt-3.5-turbo", temperature=0.7, api_key=api_key)
+            # One pooled, kept-alive connection set per process for sync calls and one for async calls
+            http_options = cls._http_options()
+            cls._instance = ChatOpenAI(
+                model="gpt-3.5-turbo",
+                temperature=0.7,
+                api_key=api_key,
+                base_url=Config.OPENAI_BASE_URL,
+                max_retries=0,  # retries go through the rate limiter (see _call)
+                stream_usage=True,  # the last streamed chunk reports usage, to settle the rate limiter
+                http_client=httpx.Client(**http_options),
+                http_async_client=httpx.AsyncClient(**http_options)
+            )
         return cls._instance
+
+    @staticmethod
+    def _http_options():
+        http2 = Config.LLM_HTTP2
+        if http2:
+            try:
+                import h2  # noqa: F401 -- httpx needs it for HTTP/2
+            except ImportError:
+                print("[LLM] h2 is not installed; using HTTP/1.1 connections")
+                http2 = False
+        return {
+            "http2": http2,
+            "limits": httpx.Limits(
+                max_connections=Config.LLM_MAX_CONNECTIONS,
+                max_keepalive_connections=Config.LLM_MAX_CONNECTIONS,
+                keepalive_expiry=Config.LLM_KEEPALIVE_SECONDS
+            ),
+            "timeout": httpx.Timeout(Config.LLM_TIMEOUT_SECONDS, connect=5.0),
+        }
+
+    @classmethod
+    def _event_loop(cls):
+        """Event loop (on a daemon thread) that owns the async connection pool and runs every async call"""
+        if cls._loop is None:
+            with cls._loop_lock:
+                if cls._loop is None:
+                    loop = asyncio.new_event_loop()
+                    threading.Thread(target=loop.run_forever, name="llm-event-loop", daemon=True).start()
+                    cls._loop = loop
+        return cls._loop
     
     @classmethod
     def enhance_skills(cls, skills):
         """Use LLM to enhance the skills list with related skills"""
-        llm = cls.get_instance()
         try:
             prompt = f"""
             Given the following CV skills:
@@ -35,7 +115,7 @@ class LLMService:
                 "enhanced_skills": ["skill1", "skill2", ...]
             }}
             """
-            response = llm.invoke(prompt)
+            response = cls.invoke(prompt, priority=cls.BACKGROUND, validate=cls.json_response)
             result = json.loads(response.content)
             return list(set(skills + result.get("enhanced_skills", [])))
         except Exception as e:
@@ -43,7 +123,257 @@ class LLMService:
             return skills
             
     @classmethod
-    def invoke(cls, prompt):
-        """Directly invoke the LLM with a prompt"""
+    def get_cache(cls):
+        """The prompt-response cache shared by all call sites, or None when it is disabled"""
+        if not Config.LLM_CACHE_ENABLED:
+            return None
+        if cls._cache is None:
+            with cls._cache_lock:
+                if cls._cache is None:
+                    cls._cache = LLMResponseCache(
+                        Config.LLM_CACHE_DIR,
+                        ttl=Config.LLM_CACHE_TTL,
+                        max_bytes=Config.LLM_CACHE_MB * 1024 * 1024
+                    )
+        return cls._cache
+
+    @classmethod
+    def get_rate_limiter(cls):
+        """The limiter of outbound LLM calls, or None when LLM_REQUESTS_PER_MINUTE is 0"""
+        if Config.LLM_REQUESTS_PER_MINUTE <= 0:
+            return None
+        if cls._limiter is None:
+            with cls._limiter_lock:
+                if cls._limiter is None:
+                    cls._limiter = RateLimiter(
+                        Config.LLM_REQUESTS_PER_MINUTE,
+                        Config.LLM_TOKENS_PER_MINUTE,
+                        shared_path=Config.LLM_RATE_LIMIT_DB
+                    )
+        return cls._limiter
+
+    @staticmethod
+    def _estimate_tokens(prompt):
+        return estimate_tokens(str(prompt)) + Config.LLM_COMPLETION_TOKENS_ESTIMATE
+
+    @classmethod
+    def _settle(cls, limiter, estimate, response):
+        usage = getattr(response, "usage_metadata", None) or {}
+        if usage.get("total_tokens"):
+            limiter.settle(estimate, usage["total_tokens"])
+
+    @staticmethod
+    def _log_retry(retry_state):
+        error = retry_state.outcome.exception()
+        print(f"[LLM] {type(error).__name__}; retrying in {retry_state.next_action.sleep:.1f}s "
+              f"(attempt {retry_state.attempt_number} of {Config.LLM_RETRY_ATTEMPTS})")
+
+    @classmethod
+    def _retryable(cls, error):
+        # An exhausted quota is a 429 too, but no amount of waiting clears it
+        return isinstance(error, cls.RETRYABLE_ERRORS) and getattr(error, "code", None) != "insufficient_quota"
+
+    @staticmethod
+    def _retry_after(error):
+        """Seconds the server asked us to wait (``retry-after-ms`` / ``retry-after``), or None"""
+        response = getattr(error, "response", None)
+        if response is None:
+            return None
+        for header, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+            try:
+                return float(response.headers[header]) * scale
+            except (KeyError, ValueError):
+                continue
+        return None
+
+    @classmethod
+    def _retry_options(cls):
+        backoff = wait_random_exponential(multiplier=Config.LLM_RETRY_BASE_SECONDS, max=Config.LLM_RETRY_MAX_SECONDS)
+
+        def wait(retry_state):
+            # Never retry sooner than the server's Retry-After
+            retry_after = cls._retry_after(retry_state.outcome.exception())
+            return max(backoff(retry_state), retry_after or 0)
+
+        return {
+            "retry": retry_if_exception(cls._retryable),
+            "wait": wait,
+            "stop": stop_after_attempt(Config.LLM_RETRY_ATTEMPTS),
+            "before_sleep": cls._log_retry,
+            "reraise": True,
+        }
+
+    @classmethod
+    def _call(cls, llm, prompt, priority):
+        """
+        One model call: every attempt waits for the rate limiter, and rate limits or
+        transient errors are retried with jittered exponential backoff
+        """
+        limiter = cls.get_rate_limiter()
+        for attempt in Retrying(**cls._retry_options()):
+            with attempt:
+                if limiter is None:
+                    return llm.invoke(prompt)
+                estimate = cls._estimate_tokens(prompt)
+                limiter.acquire(estimate, priority)
+                response = llm.invoke(prompt)
+                cls._settle(limiter, estimate, response)
+                return response
+
+    @classmethod
+    async def _acall(cls, llm, prompt, priority):
+        limiter = cls.get_rate_limiter()
+        async for attempt in AsyncRetrying(**cls._retry_options()):
+            with attempt:
+                if limiter is None:
+                    return await llm.ainvoke(prompt)
+                estimate = cls._estimate_tokens(prompt)
+                # acquire() blocks, so it waits on a worker thread instead of the event loop
+                await asyncio.get_running_loop().run_in_executor(None, limiter.acquire, estimate, priority)
+                response = await llm.ainvoke(prompt)
+                cls._settle(limiter, estimate, response)
+                return response
+
+    @staticmethod
+    def json_response(response):
+        """``validate`` callback for prompts whose reply must be JSON"""
+        json.loads(response.content)
+        return True
+
+    @classmethod
+    def invoke(cls, prompt, cache=True, priority=INTERACTIVE, validate=None):
+        """
+        Directly invoke the LLM with a prompt.
+
+        An identical prompt to the same model and temperature is answered from the
+        prompt-response cache; ``response_metadata["llm_cache"]`` of the returned
+        message is "hit" or "miss". Pass ``cache=False`` where a fresh generation is wanted.
+        ``validate(response)`` (e.g. ``LLMService.json_response``) decides whether a reply
+        may be cached: a rejected reply (False or an exception) is returned but not stored,
+        so the next call asks the model again. Calls are rate limited and retried;
+        ``priority=LLMService.BACKGROUND`` lets interactive calls go first.
+        """
+        llm = cls.get_instance()
+        key, cached = cls._cache_lookup(llm, prompt, cache, validate)
+        if cached is not None:
+            return cached
+        response = cls._call(llm, prompt, priority)
+        cls._cache_store(key, response, validate)
+        return response
+
+    @classmethod
+    async def _ainvoke(cls, prompt, cache, priority, validate=None):
         llm = cls.get_instance()
-        return llm.invoke(prompt)
\ No newline at end of file
+        key, cached = cls._cache_lookup(llm, prompt, cache, validate)
+        if cached is not None:
+            return cached
+        response = await cls._acall(llm, prompt, priority)
+        cls._cache_store(key, response, validate)
+        return response
+
+    @classmethod
+    async def ainvoke(cls, prompt, cache=True, priority=INTERACTIVE, validate=None):
+        """Async ``invoke``, usable from any event loop; the request runs on the shared async pool"""
+        future = asyncio.run_coroutine_threadsafe(cls._ainvoke(prompt, cache, priority, validate), cls._event_loop())
+        return await asyncio.wrap_future(future)
+
+    @classmethod
+    def invoke_many(cls, prompts, max_concurrency=None, cache=True, priority=INTERACTIVE, validate=None):
+        """
+        Invoke the LLM with many prompts, up to ``max_concurrency`` (default
+        ``LLM_MAX_CONCURRENCY``) in flight at once over the shared connection pool.
+
+        Blocks until all are done and returns one LLMResult per prompt, in input order;
+        a failing prompt records its error instead of failing the others.
+        """
+        prompts = list(prompts)
+        semaphore_size = max_concurrency or Config.LLM_MAX_CONCURRENCY
+
+        async def run():
+            semaphore = asyncio.Semaphore(semaphore_size)
+
+            async def one(prompt):
+                async with semaphore:
+                    try:
+                        return LLMResult(prompt, response=await cls._ainvoke(prompt, cache, priority, validate))
+                    except Exception as e:
+                        return LLMResult(prompt, error=e)
+
+            return await asyncio.gather(*(one(prompt) for prompt in prompts))
+
+        return asyncio.run_coroutine_threadsafe(run(), cls._event_loop()).result()
+
+    @staticmethod
+    def _accepted(validate, response):
+        if validate is None:
+            return True
+        try:
+            return bool(validate(response))
+        except Exception:
+            return False
+
+    @classmethod
+    def _cache_lookup(cls, llm, prompt, cache, validate=None):
+        """Return ``(key, cached response)``; the key is None when the cache is not used for this call"""
+        response_cache = cls.get_cache()
+        if response_cache is None or not cache:
+            if response_cache is not None:
+                response_cache.record_bypass()
+            return None, None
+
+        key = response_cache.key(llm.model_name, llm.temperature, prompt)
+        try:
+            cached = response_cache.get(key)
+        except Exception as e:
+            print(f"[LLM Cache] Lookup failed: {e}")
+            cached = None
+        if cached is not None and not cls._accepted(validate, cached):
+            # Stored before this prompt was validated; drop it and ask the model again
+            response_cache.delete(key)
+            cached = None
+        if cached is not None:
+            cached.response_metadata["llm_cache"] = "hit"
+        return key, cached
+
+    @classmethod
+    def _cache_store(cls, key, response, validate=None):
+        if key is None:
+            return
+        response.response_metadata["llm_cache"] = "miss"
+        if not cls._accepted(validate, response):
+            cls.get_cache().record_rejection()
+            return
+        try:
+            cls.get_cache().put(key, response)
+        except Exception as e:
+            print(f"[LLM Cache] Store failed: {e}")
+
+    @classmethod
+    def cache_stats(cls):
+        response_cache = cls.get_cache()
+        return response_cache.stats() if response_cache is not None else None
+
+    @classmethod
+    def stream(cls, prompt, priority=INTERACTIVE):
+        """
+        Invoke the LLM with a prompt, yielding message chunks as they are generated (not retried).
+
+        Once the stream ends (or is abandoned) the rate-limit reservation is settled with the
+        reported usage, or with the prompt and streamed text counted when none is reported.
+        """
+        llm = cls.get_instance()
+        limiter = cls.get_rate_limiter()
+        if limiter is None:
+            yield from llm.stream(prompt)
+            return
+        estimate = cls._estimate_tokens(prompt)
+        limiter.acquire(estimate, priority)
+        usage, text = None, []
+        try:
+            for chunk in llm.stream(prompt):
+                usage = getattr(chunk, "usage_metadata", None) or usage
+                text.append(str(chunk.content))
+                yield chunk
+        finally:
+            actual = (usage or {}).get("total_tokens") or estimate_tokens(str(prompt)) + estimate_tokens("".join(text))
+            limiter.settle(estimate, actual)
@@ -0,0 +1,229 @@
+import json
+import os
+import socket
+import socketserver
+import struct
+import threading
+import time
+import numpy as np
+from config.config import Config
+from services.rag_service import RAGQueries, RAGService
+
+_HEADER = struct.Struct(">I")  # every message is a 4-byte length followed by that much JSON
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _send(sock, message):
+    payload = json.dumps(message, default=_json_default).encode("utf-8")
+    sock.sendall(_HEADER.pack(len(payload)) + payload)
+
+
+def _recv_exactly(sock, size):
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            raise ConnectionError("RAG daemon connection closed")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def _recv(sock):
+    (size,) = _HEADER.unpack(_recv_exactly(sock, _HEADER.size))
+    return json.loads(_recv_exactly(sock, size).decode("utf-8"))
+
+
+class RAGDaemonError(Exception):
+    """An error raised by RAGService inside the daemon"""
+
+
+class RAGDaemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Local server that owns the embedding model and the RAG index for every web worker.
+
+    Each client connection gets a thread that calls the daemon's in-process RAGService,
+    so requests from all workers share one model, one index in memory and the
+    micro-batching encoder. Only the methods in ``METHODS`` can be called.
+    """
+
+    METHODS = frozenset({"ping", "add_document", "delete_document", "search", "embed", "sync_with_database", "save",
+                         "stats", "cached_answer", "cache_answer", "build_version", "activate_version", "list_versions", "prune_versions"})
+    daemon_threads = True
+
+    def __init__(self, socket_path, app=None):
+        if RAGClient.ping(socket_path):
+            raise RuntimeError(f"A RAG daemon is already listening on {socket_path}")
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)  # left behind by a daemon that did not shut down cleanly
+        os.makedirs(os.path.dirname(os.path.abspath(socket_path)), exist_ok=True)
+        self.app = app
+        self.rag_service = RAGService.local_instance()
+        super().__init__(socket_path, _RequestHandler)
+        os.chmod(socket_path, 0o600)
+
+    def dispatch(self, method, args, kwargs):
+        if method not in self.METHODS:
+            raise RAGDaemonError(f"Unknown RAG daemon method {method}")
+        if method == "ping":
+            return True
+        rag_service = RAGService.local_instance()  # follows index versions activated elsewhere
+        if self.app is None:
+            return getattr(rag_service, method)(*args, **kwargs)
+        with self.app.app_context():
+            return getattr(rag_service, method)(*args, **kwargs)
+
+    def server_close(self):
+        super().server_close()
+        try:
+            os.unlink(self.server_address)
+        except OSError:
+            pass
+
+
+class _RequestHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        while True:
+            try:
+                request = _recv(self.request)
+            except (ConnectionError, OSError):
+                return
+            try:
+                response = {"result": self.server.dispatch(request["method"], request.get("args", []),
+                                                          request.get("kwargs", {}))}
+            except Exception as e:
+                response = {"error": f"{type(e).__name__}: {e}"}
+            _send(self.request, response)
+
+
+class RAGClient(RAGQueries):
+    """
+    RAGService API backed by a RAG daemon over a Unix socket.
+
+    Each thread keeps its own connection open. If the daemon goes away, calls fall back
+    to the in-process RAGService (loading the model in this process) until the daemon
+    answers again; it is retried every ``RAG_DAEMON_RETRY_SECONDS``.
+    """
+
+    _clients = {}
+    _clients_lock = threading.Lock()
+
+    @classmethod
+    def connect(cls, socket_path):
+        """The client for ``socket_path`` if a daemon answers there, else None"""
+        with cls._clients_lock:
+            client = cls._clients.get(socket_path)
+            if client is None:
+                client = cls(socket_path)
+                cls._clients[socket_path] = client
+        return client if client.available() else None
+
+    @staticmethod
+    def ping(socket_path, timeout=1.0):
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.settimeout(timeout)
+                sock.connect(socket_path)
+                _send(sock, {"method": "ping"})
+                return _recv(sock).get("result") is True
+        except (OSError, ValueError):
+            return False
+
+    def __init__(self, socket_path):
+        self.socket_path = socket_path
+        self._local = threading.local()
+        self._down_since = None if self.ping(socket_path) else time.monotonic()
+
+    def available(self):
+        """Whether calls go to the daemon; re-checks a daemon that was down once the retry interval passed"""
+        if self._down_since is None:
+            return True
+        if time.monotonic() - self._down_since < Config.RAG_DAEMON_RETRY_SECONDS:
+            return False
+        if self.ping(self.socket_path):
+            print(f"[RAG] Daemon on {self.socket_path} is back")
+            self._down_since = None
+            return True
+        self._down_since = time.monotonic()
+        return False
+
+    def _connection(self):
+        sock = getattr(self._local, "sock", None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.connect(self.socket_path)
+            self._local.sock = sock
+        return sock
+
+    def _close(self):
+        sock = getattr(self._local, "sock", None)
+        self._local.sock = None
+        if sock is not None:
+            sock.close()
+
+    def _call(self, method, *args, **kwargs):
+        if self.available():
+            for attempt in range(2):  # a kept-alive connection may have been closed by a daemon restart
+                try:
+                    sock = self._connection()
+                    _send(sock, {"method": method, "args": args, "kwargs": kwargs})
+                    response = _recv(sock)
+                    break
+                except OSError as e:
+                    self._close()
+                    if attempt:
+                        print(f"[RAG] Daemon on {self.socket_path} unavailable ({e}); using in-process RAG")
+                        self._down_since = time.monotonic()
+            else:
+                return getattr(RAGService.local_instance(), method)(*args, **kwargs)
+            if "error" in response:
+                raise RAGDaemonError(response["error"])
+            return response["result"]
+        return getattr(RAGService.local_instance(), method)(*args, **kwargs)
+
+    def add_document(self, text, doc_id=None, user_id=None):
+        return self._call("add_document", text, doc_id=doc_id, user_id=user_id)
+
+    def delete_document(self, doc_id, persist=True):
+        return self._call("delete_document", doc_id, persist=persist)
+
+    def search(self, question, top_k=1, user_id=None, scope="user", unique_documents=False):
+        return self._call("search", question, top_k=top_k, user_id=user_id, scope=scope,
+                          unique_documents=unique_documents)
+
+    def embed(self, texts):
+        return np.asarray(self._call("embed", list(texts)), dtype=np.float32)
+
+    def sync_with_database(self):
+        return tuple(self._call("sync_with_database"))
+
+    def save(self):
+        return self._call("save")
+
+    def stats(self):
+        return {**self._call("stats"), "prompts": self.prompt_metrics.stats()}  # prompts are sent from this process
+
+    def cached_answer(self, question, doc_ids):
+        return tuple(self._call("cached_answer", question, doc_ids))
+
+    def cache_answer(self, question, doc_ids, answer, token):
+        return self._call("cache_answer", question, doc_ids, answer, token)
+
+    def build_version(self, model_name=None, activate=True, wait=False):
+        return self._call("build_version", model_name=model_name, activate=activate, wait=wait)
+
+    def activate_version(self, version):
+        return self._call("activate_version", version)
+
+    def list_versions(self):
+        return self._call("list_versions")
+
+    def prune_versions(self, keep=3):
+        return self._call("prune_versions", keep=keep)
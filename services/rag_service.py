@@ -1,97 +1,834 @@
-from sentence_transformers import SentenceTransformer
-import faiss
-import numpy as np
+import json
+import os
+import threading
+import time
 import uuid
+from contextlib import contextmanager
+from flask import has_app_context
+from config.config import Config
 from services.llm_service import LLMService
+from utils.context_packer import ContextPacker, PromptMetrics, estimate_tokens
+from utils.doc_store import DocumentStore, content_hash
+from utils.embedding_batcher import EmbeddingBatcher
+from utils.embedding_cache import EmbeddingCache
+from utils.index_versions import IndexVersions
+from utils.keyword_index import BM25Index, reciprocal_rank_fusion
+from utils.partitioned_index import IndexPolicy, PartitionedIndex, UNOWNED
+from utils.query_cache import QueryCache
+from utils.text_chunker import chunk_text
+
+
+class _Embedder:
+    """A sentence-transformers model with its micro-batching encoder and embedding cache"""
+
+    def __init__(self, model_name):
+        from sentence_transformers import SentenceTransformer  # imported on first use: pulls in torch
+
+        self.model_name = model_name
+        self.model = SentenceTransformer(model_name)
+        self.dim = self.model.get_sentence_embedding_dimension()
+        # Concurrent add/search calls share batched encode() calls
+        self.encoder = EmbeddingBatcher(
+            self.model,
+            max_batch_size=Config.RAG_ENCODE_BATCH_SIZE,
+            max_wait_ms=Config.RAG_ENCODE_MAX_WAIT_MS
+        )
+        self.cache = EmbeddingCache(
+            Config.RAG_EMBEDDING_CACHE_DIR,
+            model_name,
+            self.dim,
+            memory_items=Config.RAG_EMBEDDING_CACHE_MEMORY_ITEMS,
+            max_disk_bytes=Config.RAG_EMBEDDING_CACHE_MB * 1024 * 1024
+        )
+
+    def embed(self, texts):
+        """Embed texts, encoding (in micro-batches) only those missing from the embedding cache"""
+        return self.cache.encode(texts, self.encoder.encode)
+
+
+class _IndexVersion:
+    """One index version: the partitions, document store and BM25 index of its directory"""
+
+    __slots__ = ("version", "directory", "embedder", "index", "store", "keyword_index", "disk_state")
+
+    def __init__(self, version, directory, embedder, index, store, keyword_index, disk_state=(0, 0)):
+        self.version = version
+        self.directory = directory
+        self.embedder = embedder
+        self.index = index
+        self.store = store  # FAISS id == store row
+        self.keyword_index = keyword_index  # BM25 over the same rows, fused with the dense results
+        self.disk_state = disk_state  # RAGService._disk_state when this process last loaded or wrote the files
+
+
+class RAGQueries:
+    """Answering on top of ``search``, shared by RAGService and the RAG daemon client"""
+
+    context_packer = ContextPacker(token_budget=Config.RAG_CONTEXT_TOKEN_BUDGET)
+    prompt_metrics = PromptMetrics()
+
+    def _retrieve_context(self, question, top_k, user_id):
+        """Retrieve candidate passages and pack the best of them under the context token budget"""
+        results = self.search(question, top_k=max(top_k, Config.RAG_CONTEXT_CANDIDATES), user_id=user_id)
+        return self.context_packer.pack(question, results) if results else None
+
+    @staticmethod
+    def _prompt(question, context):
+        return f"""
+        You are a helpful career assistant. Answer the following question based only on the information provided:
+
+        Context:
+        {context.text}
+
+        Question: {question}
+
+        Answer:
+        """
+
+    def _record_prompt(self, context, prompt, response, started):
+        """Record the tokens sent (as reported by the API, else estimated) and the LLM latency"""
+        seconds = time.perf_counter() - started
+        usage = getattr(response, "usage_metadata", None) or {}
+        prompt_tokens = usage.get("input_tokens") or estimate_tokens(prompt)
+        self.prompt_metrics.record(context, prompt_tokens, seconds)
+        print(f"[RAG] Sent {len(context.passages)} passages ({context.tokens} context tokens, "
+              f"{prompt_tokens} prompt tokens) to the LLM in {seconds:.2f}s")
+
+    def query(self, question, top_k=3, user_id=None):
+        """Query the RAG system with a question and get LLM-enhanced answers from the best passages"""
+        context = self._retrieve_context(question, top_k, user_id)
+
+        if context is None:
+            return "I don't have enough information to answer that question."
+
+        # Repeated questions that retrieve the same documents reuse the answer
+        answer, token = self.cached_answer(question, context.doc_ids)
+        if answer is not None:
+            return answer
+
+        prompt = self._prompt(question, context)
+        started = time.perf_counter()
+        response = LLMService.invoke(prompt)
+        self._record_prompt(context, prompt, response, started)
+        self.cache_answer(question, context.doc_ids, response.content, token)
+        return response.content
+
+    def query_stream(self, question, top_k=3, user_id=None):
+        """
+        Streaming variant of ``query``: yields the answer in pieces as the LLM generates it.
+
+        The complete answer is written to the answer cache only if the stream is consumed
+        to the end; a client that disconnects early leaves no partial answer behind.
+        """
+        context = self._retrieve_context(question, top_k, user_id)
+
+        if context is None:
+            yield "I don't have enough information to answer that question."
+            return
+
+        answer, token = self.cached_answer(question, context.doc_ids)
+        if answer is not None:
+            yield answer
+            return
+
+        prompt = self._prompt(question, context)
+        started = time.perf_counter()
+        response = None
+        for chunk in LLMService.stream(prompt):
+            response = chunk if response is None else response + chunk
+            if chunk.content:
+                yield chunk.content
+        if response is None:
+            return
+        self._record_prompt(context, prompt, response, started)
+        self.cache_answer(question, context.doc_ids, response.content, token)
+
+    def query_similar_cvs(self, cv_text, top_k=3, user_id=None, scope="user"):
+        """
+        Find CVs similar to the provided CV text (pass scope="global" to compare across users).
+
+        Returns one entry per CV, holding its best matching passage.
+        """
+        return self.search(cv_text, top_k=top_k, user_id=user_id, scope=scope, unique_documents=True)
+
+
+class RAGService(RAGQueries):
+    """
+    Retrieval over the users' CVs.
+
+    Searches run concurrently without locking: each reads the partition views, store
+    rows and BM25 postings published by the last completed write. Writes (add, delete,
+    sync, save) are serialized by ``_write_lock`` within the process and by the index
+    root's lock across processes, always taken in that order (loads included);
+    encoding happens before they are taken. Every web worker may write to the same
+    version, so a write first reloads the version when another process saved to it
+    or logged a delete since this one last did.
+
+    The index is served from a versioned snapshot (see ``IndexVersions``). A new version
+    can be built in the background, e.g. with another embedding model, and swapped in
+    with a single reference assignment; older versions stay on disk for instant rollback.
+    """
 
-class RAGService:
     _instance = None
+    _instance_lock = threading.Lock()
+
+    PASSAGE_OVERFETCH = 8  # passages fetched per requested document when results are collapsed per document
+    DELETE_LOG = "deletes.log"  # doc ids deleted since the version's last full save, one JSON string per line
+    BUILD_BATCH_DOCUMENTS = 64  # documents re-embedded per batch when building a version
 
     @classmethod
     def get_instance(cls):
-        """Get or create a RAG instance (singleton pattern)"""
+        """
+        The RAG service for this process: a client of the RAG daemon when one is listening
+        on ``RAG_DAEMON_SOCKET``, otherwise the in-process instance.
+        """
+        if Config.RAG_DAEMON_SOCKET:
+            from services.rag_daemon import RAGClient
+
+            client = RAGClient.connect(Config.RAG_DAEMON_SOCKET)
+            if client is not None:
+                return client
+        return cls.local_instance()
+
+    @classmethod
+    def local_instance(cls):
+        """Get or create the in-process instance (singleton pattern); concurrent first calls share one instance"""
         if cls._instance is None:
-            cls._instance = RAGService()
+            with cls._instance_lock:
+                if cls._instance is None:
+                    instance = RAGService()
+                    if has_app_context():
+                        instance.sync_with_database()
+                    cls._instance = instance
+        else:
+            cls._instance.refresh_active_version()
         return cls._instance
 
-    def __init__(self):
-        self.model = SentenceTransformer('all-MiniLM-L6-v2')
-        self.index = faiss.IndexIDMap(faiss.IndexFlatL2(384))  # Changed to IndexIDMap for deletions
-        self.documents = []  # List of (id, text)
-        self.id_to_text = {}
-
-    def add_document(self, text, doc_id=None):
-        """Add a document to the RAG index"""
-        embedding = self.model.encode([text])[0].astype(np.float32)
-        if doc_id is None:
-            doc_id = str(uuid.uuid4())
-        faiss_id = int(uuid.uuid4().int >> 96)  # Create a 32-bit int ID for FAISS
-        self.index.add_with_ids(np.array([embedding]), np.array([faiss_id]))
-        self.documents.append((doc_id, text, faiss_id))
-        self.id_to_text[doc_id] = (text, faiss_id)
-        return doc_id
-
-    def delete_document(self, doc_id):
-        """Delete a document by ID from the RAG index"""
-        try:
-            if doc_id not in self.id_to_text:
-                print(f"[RAG] Document ID {doc_id} not found.")
+    def __init__(self, index_dir=None, global_partition=None):
+        self._write_lock = threading.RLock()
+        self._embedders_lock = threading.Lock()
+        self._embedders = {}  # model name -> _Embedder, shared by the versions using it
+        self.index_root = index_dir or Config.RAG_INDEX_DIR
+        self.versions = IndexVersions(self.index_root)
+        self.global_partition = Config.RAG_GLOBAL_PARTITION if global_partition is None else global_partition
+        self.index_policy = IndexPolicy(
+            index_type=Config.RAG_INDEX_TYPE,
+            hnsw_min_vectors=Config.RAG_HNSW_MIN_VECTORS,
+            ivfpq_min_vectors=Config.RAG_IVFPQ_MIN_VECTORS,
+            vector_storage=Config.RAG_VECTOR_STORAGE,
+            compact_dead_ratio=Config.RAG_COMPACT_DEAD_RATIO,
+            compact_min_dead=Config.RAG_COMPACT_MIN_DEAD
+        )
+        self.hybrid = Config.RAG_HYBRID_SEARCH
+        self.query_cache = QueryCache(
+            embedding_ttl=Config.RAG_QUERY_EMBEDDING_TTL,
+            answer_ttl=Config.RAG_ANSWER_CACHE_TTL,
+            max_embeddings=Config.RAG_QUERY_CACHE_ITEMS,
+            max_answers=Config.RAG_ANSWER_CACHE_ITEMS
+        )
+        self.duplicates_skipped = 0
+        self._current = None
+        self.read_only = False
+        self._build_thread = None
+        self._active_checked_at = time.monotonic()
+        if self.load():
+            return
+        with self._write_lock, self.versions.lock:
+            # Only a root without any index gets a fresh, empty version
+            if self.versions.active() is None:
+                current = self._new_version(Config.RAG_MODEL_NAME)
+                self._save_version(current)
+                self.versions.activate(current.version)
+                self._serve(current)
                 return
+        if not self.load():
+            self._serve_read_only()
+
+    def _serve_read_only(self):
+        """
+        Serve an empty, unsaved placeholder when the active version cannot be loaded, instead
+        of activating an empty version over it. Writes are refused, and the active version
+        is retried every ``RAG_VERSION_CHECK_SECONDS``.
+        """
+        print(f"[RAG] Active index version {self.versions.active()} could not be loaded; serving an empty "
+              f"read-only index until it can be (repair it or roll back with `flask rag-index activate`)")
+        embedder = self._embedder(Config.RAG_MODEL_NAME)
+        self.read_only = True
+        self._serve(_IndexVersion(
+            None, None, embedder, PartitionedIndex(embedder.dim, with_global=self.global_partition,
+                                                   policy=self.index_policy),
+            DocumentStore(), BM25Index()
+        ))
+
+    # The serving version's parts; a search should read ``self._current`` once instead
+    @property
+    def version(self):
+        return self._current.version
+
+    @property
+    def index_dir(self):
+        return self._current.directory
+
+    @property
+    def index(self):
+        return self._current.index
+
+    @property
+    def store(self):
+        return self._current.store
+
+    @property
+    def keyword_index(self):
+        return self._current.keyword_index
+
+    @property
+    def model(self):
+        return self._current.embedder.model
+
+    @property
+    def encoder(self):
+        return self._current.embedder.encoder
+
+    @property
+    def embedding_cache(self):
+        return self._current.embedder.cache
+
+    def _embedder(self, model_name):
+        with self._embedders_lock:
+            embedder = self._embedders.get(model_name)
+            if embedder is None:
+                embedder = _Embedder(model_name)
+                self._embedders[model_name] = embedder
+            return embedder
+
+    def _new_version(self, model_name):
+        """Create an empty version directory, marked as building, for ``model_name``"""
+        embedder = self._embedder(model_name)
+        version = self.versions.create()
+        self.versions.write_manifest(version, status="building", model=model_name, dim=embedder.dim)
+        return _IndexVersion(
+            version, self.versions.path(version), embedder,
+            PartitionedIndex(embedder.dim, with_global=self.global_partition, policy=self.index_policy),
+            DocumentStore(), BM25Index()
+        )
+
+    def _disk_state(self, version):
+        """What another process's write to a version changes: its save generation and delete log size"""
+        manifest = self.versions.manifest(version) or {}
+        try:
+            log_size = os.path.getsize(os.path.join(self.versions.path(version), self.DELETE_LOG))
+        except OSError:
+            log_size = 0
+        return manifest.get("generation", 0), log_size
+
+    @contextmanager
+    def _writing(self):
+        """
+        Hold the write locks of this process and of the index root, and yield the serving
+        version, reloaded first if another process wrote to it since this one last did.
+        """
+        with self._write_lock, self.versions.lock:
+            current = self._current
+            if self.read_only:
+                raise RuntimeError(f"The RAG index is read-only: version {self.versions.active()} could not be loaded")
+            if self._disk_state(current.version) != current.disk_state:
+                reloaded = self._load_version(current.version)
+                if reloaded is None:
+                    raise RuntimeError(f"Index version {current.version} changed on disk and could not be reloaded")
+                self._serve(reloaded)
+                print(f"[RAG] Reloaded index version {current.version} after a write by another process")
+            yield self._current
+
+    def _serve(self, current):
+        """Switch searches and writes over to ``current`` with one reference swap"""
+        with self._write_lock:
+            self.read_only = current.version is None
+            current.index.on_migrated = lambda compacted: self._after_merge(current, compacted)
+            self._current = current
+
+    def load(self, version=None):
+        """
+        Load an index version (the active one by default) and serve it. The partitions
+        are memory-mapped, so this is fast enough to roll back to an old version live.
+
+        A snapshot from before index versioning is adopted as the first version.
+        """
+        if version is None:
+            version = self.versions.active() or self.versions.adopt_legacy(
+                model='all-MiniLM-L6-v2', dim=384  # the model every pre-versioning snapshot was built with
+            )
+            if version is None:
+                return False
+        with self._write_lock:  # no write lands on the old copy between loading and serving
+            loaded = self._load_version(version)
+            if loaded is None:
+                return False
+            self._serve(loaded)
+        print(f"[RAG] Serving index version {version} ({len(loaded.store)} documents, "
+              f"model {loaded.embedder.model_name})")
+        return True
+
+    def _load_version(self, version):
+        # The root lock keeps a load from seeing one process's save half written. Like every
+        # writer, it is taken after ``_write_lock``, which the delete-log replay needs.
+        with self._write_lock, self.versions.lock:
+            return self._load_version_files(version)
+
+    def _load_version_files(self, version):
+        directory = self.versions.path(version)
+        manifest = self.versions.manifest(version)
+        if manifest is None or manifest.get("status") != "ready":
+            print(f"[RAG] Index version {version} is missing or not ready")
+            return None
+        if not (PartitionedIndex.exists(directory) and DocumentStore.exists(directory)):
+            print(f"[RAG] Index version {version} has no snapshot files")
+            return None
+
+        disk_state = self._disk_state(version)
+        try:
+            embedder = self._embedder(manifest["model"])
+            if embedder.dim != manifest["dim"]:
+                print(f"[RAG] Index version {version} has dimension {manifest['dim']}, "
+                      f"but {manifest['model']} produces {embedder.dim}; ignoring it.")
+                return None
+            index = PartitionedIndex.load(directory, embedder.dim, with_global=self.global_partition,
+                                          policy=self.index_policy)
+            store = DocumentStore.load(directory)
+            if index.ntotal != store.live_rows:
+                print(f"[RAG] Snapshot mismatch ({index.ntotal} vectors, {store.live_rows} passages); ignoring it.")
+                return None
+        except Exception as e:
+            print(f"[RAG] Error loading index version {version}: {e}")
+            return None
+        loaded = _IndexVersion(version, directory, embedder, index, store, self._load_keyword_index(directory, store),
+                               disk_state)
+        self._replay_deletes(loaded)
+        return loaded
+
+    def _replay_deletes(self, current):
+        """Apply the deletes logged since the version's last full save. Callers hold ``_write_lock``."""
+        try:
+            with open(os.path.join(current.directory, self.DELETE_LOG), "r", encoding="utf-8") as f:
+                lines = f.read().splitlines()
+        except OSError:
+            return
+        removed = 0
+        for line in lines:
+            try:
+                doc_id = json.loads(line)
+            except ValueError:
+                continue  # a line cut short by a crash mid-append
+            removed += self._remove_document(current, doc_id)
+        print(f"[RAG] Replayed {removed} logged deletes on index version {current.version}")
+
+    def _log_delete(self, current, doc_id):
+        """Persist a delete by appending it to the version's delete log instead of rewriting the store"""
+        with open(os.path.join(current.directory, self.DELETE_LOG), "a", encoding="utf-8") as f:
+            f.write(json.dumps(doc_id) + "\n")
+        current.disk_state = self._disk_state(current.version)
+
+    @staticmethod
+    def _load_keyword_index(directory, store):
+        """Load the persisted BM25 index, rebuilding it from the store when missing or stale"""
+        if BM25Index.exists(directory):
+            try:
+                keyword_index = BM25Index.load(directory)
+                if keyword_index.total_rows == store.total_rows and len(keyword_index) == store.live_rows:
+                    return keyword_index
+            except Exception as e:
+                print(f"[RAG] Error loading keyword index: {e}")
+        print("[RAG] Rebuilding keyword index from the document store")
+        return BM25Index.build(store)
+
+    def save(self):
+        """Persist changed partitions and the document store of the serving version"""
+        with self._writing() as current:
+            self._save_version(current)
+
+    def _save_version(self, current):
+        """Write a version's files atomically and mark it ready in its manifest, bumping its generation"""
+        with self._write_lock, self.versions.lock:
+            try:
+                current.index.save(current.directory)
+                current.store.save(current.directory)
+                current.keyword_index.save(current.directory)
+                self.versions.write_manifest(
+                    current.version,
+                    status="ready",
+                    model=current.embedder.model_name,
+                    dim=current.embedder.dim,
+                    documents=len(current.store),
+                    passages=current.store.live_rows,
+                    index_types=current.index.kinds(),
+                    vector_storage=self.index_policy.vector_storage,
+                    chunk_max_words=Config.RAG_CHUNK_MAX_WORDS,
+                    chunk_overlap_words=Config.RAG_CHUNK_OVERLAP_WORDS,
+                    generation=self._disk_state(current.version)[0] + 1,
+                )
+                # The snapshot now holds every logged delete
+                delete_log = os.path.join(current.directory, self.DELETE_LOG)
+                if os.path.exists(delete_log):
+                    os.remove(delete_log)
+                current.disk_state = self._disk_state(current.version)
+            except Exception as e:
+                print(f"[RAG] Error saving index version {current.version}: {e}")
+
+    def _after_merge(self, current, compacted):
+        """Persist a version after a background partition rebuild; a compaction also compacts its documents"""
+        with self._writing() as serving:
+            if serving is not current:
+                return  # reloaded or replaced meanwhile: these files are no longer this copy's to write
+            if compacted:
+                self._compact_documents(current)
+            self._save_version(current)
+
+    @staticmethod
+    def _compact_documents(current):
+        """
+        Drop the texts of deleted passages from the store blob and their postings from
+        BM25, so they do not outlive their vectors. Callers hold ``_write_lock``.
+        """
+        started = time.perf_counter()
+        reclaimed = current.store.compact_texts()
+        dropped = current.keyword_index.compact(current.store.alive)
+        if reclaimed or dropped:
+            print(f"[RAG] Compacted documents of version {current.version}: reclaimed {reclaimed / 2 ** 20:.1f} MB "
+                  f"of deleted text and {dropped} BM25 postings in {time.perf_counter() - started:.2f}s")
+
+    def refresh_active_version(self):
+        """
+        Follow ACTIVE when another process (e.g. ``flask rag-index activate``) switched it.
+        Checked at most every ``RAG_VERSION_CHECK_SECONDS``.
+        """
+        now = time.monotonic()
+        if now - self._active_checked_at < Config.RAG_VERSION_CHECK_SECONDS:
+            return
+        self._active_checked_at = now
+        active = self.versions.active()
+        if active is None:
+            return
+        if active == self._current.version:
+            # Pick up documents another process saved or deleted in this version
+            if self._disk_state(self._current.version) != self._current.disk_state:
+                try:
+                    with self._writing():
+                        pass
+                except Exception as e:
+                    print(f"[RAG] Error reloading index version {active}: {e}")
+            return
+        if self.load(active) and has_app_context():
+            self.sync_with_database()
 
-            _, faiss_id = self.id_to_text[doc_id]
-            self.index.remove_ids(np.array([faiss_id], dtype=np.int64))
+    def _embed(self, texts):
+        return self._current.embedder.embed(texts)
 
-            # Remove from internal stores
-            self.documents = [doc for doc in self.documents if doc[0] != doc_id]
-            del self.id_to_text[doc_id]
+    @staticmethod
+    def _owner(user_id):
+        return UNOWNED if user_id is None else int(user_id)
 
+    @staticmethod
+    def _chunk(text):
+        return chunk_text(text, max_words=Config.RAG_CHUNK_MAX_WORDS,
+                          overlap_words=Config.RAG_CHUNK_OVERLAP_WORDS) or [text]
+
+    def _add_embeddings(self, current, doc_ids, texts, embeddings, hashes=None, owner=UNOWNED):
+        """
+        Add pre-computed passage embeddings of one owner to a version's index and document store.
+
+        The store is written first, so any row a concurrent search gets from the index
+        or BM25 already resolves to its text. Callers hold ``_write_lock``.
+        """
+        replaced = []
+        for doc_id in dict.fromkeys(doc_ids):
+            rows = current.store.rows_of(doc_id)
+            if rows is not None:
+                replaced.append(doc_id)
+                current.index.remove(rows, owner=current.store.owner(rows[0]))
+                current.keyword_index.remove(rows, [current.store.text(row) for row in rows])
+        rows = current.store.add_many(doc_ids, texts, hashes=hashes, owner=owner)
+        current.index.add(embeddings, rows, owner=owner)
+        current.keyword_index.add(rows.tolist(), texts)
+        if replaced:
+            self.query_cache.invalidate_documents(replaced)
+
+    def _remove_document(self, current, doc_id):
+        """Remove a document from a version; returns False if it is not there. Callers hold ``_write_lock``."""
+        # The store is updated first: searches drop the rows before the index does
+        rows = current.store.remove(doc_id)
+        if rows is None:
+            return False
+        current.index.remove(rows, owner=current.store.owner(rows[0]))
+        current.keyword_index.remove(rows, [current.store.text(row) for row in rows])
+        self.query_cache.invalidate_documents([doc_id])
+        return True
+
+    def _add_chunked(self, documents, owner=UNOWNED, skip_duplicates=False):
+        """
+        Chunk ``(doc_id, text)`` pairs into passages, add them (encoded in one batch) under
+        ``owner`` and save the version. A doc_id of None gets a new uuid.
+
+        With ``skip_duplicates`` a document whose text ``owner`` already has indexed is not
+        added unless it names a different doc_id; the check and the add happen under one hold
+        of the write locks, so concurrent adds of the same text index it once. Returns the
+        doc id of every document (the existing one for a skipped duplicate).
+        """
+        doc_ids = [str(uuid.uuid4()) if doc_id is None else doc_id for doc_id, _ in documents]
+        chunked = [(self._chunk(text), content_hash(text)) for _, text in documents]
+        current = self._current
+        embeddings = current.embedder.embed([chunk for chunks, _ in chunked for chunk in chunks])
+        with self._writing() as serving:
+            if serving.embedder is not current.embedder:
+                # Another version was swapped in while encoding, with another model
+                embeddings = serving.embedder.embed([chunk for chunks, _ in chunked for chunk in chunks])
+            passage_ids, passages, hashes, rows = [], [], [], []
+            offset = 0
+            for i, ((doc_id, _), (chunks, text_hash)) in enumerate(zip(documents, chunked)):
+                first, offset = offset, offset + len(chunks)
+                existing_id = serving.store.find_by_hash(text_hash, owner=owner) if skip_duplicates else None
+                if existing_id is not None and doc_id in (None, existing_id):
+                    doc_ids[i] = existing_id
+                    self.duplicates_skipped += 1
+                    print(f"[RAG] Skipped duplicate document (existing id {existing_id})")
+                    continue
+                passage_ids.extend([doc_ids[i]] * len(chunks))
+                passages.extend(chunks)
+                hashes.extend([text_hash] * len(chunks))
+                rows.extend(range(first, offset))
+            if passages:
+                self._add_embeddings(serving, passage_ids, passages, embeddings[rows], hashes=hashes, owner=owner)
+                self._save_version(serving)
+        return doc_ids
+
+    def add_document(self, text, doc_id=None, user_id=None):
+        """
+        Add a document to the RAG index, in the partition of ``user_id``.
+
+        The text is split into section-sized passages that are embedded (in one batch)
+        and searched individually.
+
+        Adding text whose normalized content the user already has indexed is a no-op that
+        returns the existing doc id without encoding, unless a different explicit doc_id is given.
+        """
+        if self.read_only:
+            print("[RAG] Index is read-only; document not added")
+            return None
+        owner = self._owner(user_id)
+        # Skips encoding a known duplicate; _add_chunked checks again while it adds
+        existing_id = self._current.store.find_by_hash(content_hash(text), owner=owner)
+        if existing_id is not None and doc_id in (None, existing_id):
+            self.duplicates_skipped += 1
+            print(f"[RAG] Skipped duplicate document (existing id {existing_id})")
+            return existing_id
+        return self._add_chunked([(doc_id, text)], owner=owner, skip_duplicates=True)[0]
+
+    def delete_document(self, doc_id, persist=True):
+        """
+        Delete a document by ID from the RAG index.
+
+        With ``persist`` the delete is appended to the version's delete log, which the
+        next full save folds into the snapshot; the store and BM25 files are not rewritten.
+        """
+        try:
+            with self._writing() as current:
+                if not self._remove_document(current, doc_id):
+                    print(f"[RAG] Document ID {doc_id} not found.")
+                    return
+                if persist:
+                    self._log_delete(current, doc_id)
             print(f"[RAG] Successfully deleted doc ID {doc_id}")
         except Exception as e:
             print(f"[RAG] Error deleting document {doc_id}: {e}")
 
-    def search(self, question, top_k=1):
-        """Search for documents relevant to a question"""
-        if not self.documents:
-            return []
-        query_embedding = self.model.encode([question])[0].astype(np.float32)
-        D, I = self.index.search(np.array([query_embedding]), top_k)
-        results = []
-        for idx in I[0]:
-            for doc_id, doc_text, faiss_id in self.documents:
-                if faiss_id == idx:
-                    results.append({
-                        "id": doc_id,
-                        "text": doc_text
-                    })
-                    break
-        return results
-
-    def query(self, question, top_k=3):
-        """Query the RAG system with a question and get LLM-enhanced answers"""
-        results = self.search(question, top_k=top_k)
-
-        if not results:
-            return "I don't have enough information to answer that question."
+    def sync_with_database(self):
+        """
+        Reconcile the loaded snapshot with the CV table.
 
-        # Concatenate retrieved documents
-        context = "\n\n".join([doc["text"] for doc in results])
+        Only CV rows missing from the snapshot are chunked and embedded (in one batch per user), and
+        snapshot entries for CVs that no longer exist are dropped. Documents that are
+        not CV rows (e.g. ad-hoc analysis texts) are left untouched.
+        """
+        from models import CV
 
-        # Create prompt for LLM
-        prompt = f"""
-        You are a helpful career assistant. Answer the following question based only on the information provided:
+        if self.read_only:
+            print("[RAG] Index is read-only; not reconciling with the CV table")
+            return 0, 0
+        try:
+            cv_rows = CV.query.with_entities(CV.id, CV.user_id, CV.content).all()
+        except Exception as e:
+            print(f"[RAG] Could not read CV table for reconciliation: {e}")
+            return 0, 0
 
-        Context:
-        {context}
+        cv_ids = {str(cv_id) for cv_id, _, _ in cv_rows}
+        with self._writing() as current:
+            missing = [(str(cv_id), user_id, content) for cv_id, user_id, content in cv_rows
+                       if str(cv_id) not in current.store and content]
+            orphans = [doc_id for doc_id in list(current.store.doc_ids())
+                       if doc_id.isdigit() and doc_id not in cv_ids]
 
-        Question: {question}
+        for doc_id in orphans:
+            self.delete_document(doc_id)
 
-        Answer:
+        by_owner = {}
+        for doc_id, user_id, content in missing:
+            by_owner.setdefault(self._owner(user_id), []).append((doc_id, content))
+        for owner, documents in by_owner.items():
+            self._add_chunked(documents, owner=owner)
+
+        print(f"[RAG] Reconciled with CV table: {len(missing)} embedded, {len(orphans)} removed")
+        return len(missing), len(orphans)
+
+    def build_version(self, model_name=None, activate=True, wait=False):
         """
+        Build a new index version from the serving version's documents, in a background thread.
 
-        # Get response from LLM
-        response = LLMService.invoke(prompt)
-        return response.content
+        Every document's stored passages are re-embedded with ``model_name`` (default: the
+        serving model) into a fresh directory while searches and writes continue on the
+        serving version. Writes made during the build are then replayed under the write
+        lock, the version is marked ready and, with ``activate``, swapped in atomically.
+        Returns the new version id.
+        """
+        with self._write_lock:
+            if self._build_thread is not None and self._build_thread.is_alive():
+                raise RuntimeError("An index version is already being built")
+            target = self._new_version(model_name or self._current.embedder.model_name)
+            self._build_thread = threading.Thread(target=self._build, args=(target, activate),
+                                                  name=f"rag-build-{target.version}", daemon=True)
+            self._build_thread.start()
+        if wait:
+            self._build_thread.join()
+        return target.version
+
+    @staticmethod
+    def _documents(current, doc_ids):
+        """Snapshot ``(doc_id, owner, hash, passages)`` of documents; callers hold ``_write_lock``"""
+        return [(doc_id, *current.store.document(doc_id)) for doc_id in doc_ids if doc_id in current.store]
+
+    def _copy_documents(self, target, documents):
+        """Re-embed documents' passages with the target's model and add them to it, owner by owner"""
+        by_owner = {}
+        for doc_id, owner, text_hash, passages in documents:
+            by_owner.setdefault(owner, []).append((doc_id, text_hash, passages))
+        for owner, owned in by_owner.items():
+            for start in range(0, len(owned), self.BUILD_BATCH_DOCUMENTS):
+                doc_ids, passages, hashes = [], [], []
+                for doc_id, text_hash, texts in owned[start:start + self.BUILD_BATCH_DOCUMENTS]:
+                    doc_ids.extend([doc_id] * len(texts))
+                    passages.extend(texts)
+                    hashes.extend([text_hash] * len(texts))
+                embeddings = target.embedder.embed(passages)
+                with self._write_lock:
+                    self._add_embeddings(target, doc_ids, passages, embeddings, hashes=hashes, owner=owner)
+
+    def _build(self, target, activate):
+        started = time.perf_counter()
+        try:
+            with self._writing() as source:
+                documents = self._documents(source, list(source.store.doc_ids()))
+            self._copy_documents(target, documents)
+
+            with self._writing() as source:
+                # Catch up with the writes the serving version took during the build, in any process
+                changed = [doc_id for doc_id in source.store.doc_ids()
+                           if target.store.content_hash_of(doc_id) != source.store.content_hash_of(doc_id)]
+                removed = [doc_id for doc_id in list(target.store.doc_ids()) if doc_id not in source.store]
+                for doc_id in removed:
+                    self._remove_document(target, doc_id)
+                self._copy_documents(target, self._documents(source, changed))
+                target.index.wait_for_migrations()
+                self._save_version(target)
+                if activate:
+                    self.versions.activate(target.version)
+                    self._serve(target)
+            print(f"[RAG] Built index version {target.version} ({len(target.store)} documents, "
+                  f"model {target.embedder.model_name}) in {time.perf_counter() - started:.1f}s"
+                  + (", now serving it" if activate else ""))
+        except Exception as e:
+            self.versions.write_manifest(target.version, status="failed", error=str(e))
+            print(f"[RAG] Error building index version {target.version}: {e}")
+
+    def activate_version(self, version):
+        """Serve a ready version (e.g. roll back to an older one) and make it the active version"""
+        if not self.load(version):
+            raise ValueError(f"Index version {version} could not be loaded")
+        self.versions.activate(version)
+
+    def list_versions(self):
+        return self.versions.list()
+
+    def prune_versions(self, keep=3):
+        """Delete old versions, keeping the ``keep`` newest ready ones and the one being served"""
+        return self.versions.prune(keep=keep, protect=(self._current.version,))
+
+    def stats(self):
+        """Counters describing the index contents and write savings"""
+        current = self._current
+        return {
+            "version": current.version,
+            "model": current.embedder.model_name,
+            "documents": len(current.store),
+            "passages": current.store.live_rows,
+            "total_rows": current.store.total_rows,
+            "duplicates_skipped": self.duplicates_skipped,
+            "index_types": current.index.kinds(),
+            "compaction": current.index.compaction_stats(),
+            "dead_text_bytes": current.store.dead_text_bytes,
+            "encoder": current.embedder.encoder.stats(),
+            "embedding_cache": current.embedder.cache.stats(),
+            "query_cache": self.query_cache.stats(),
+            "prompts": self.prompt_metrics.stats(),
+        }
+
+    def cached_answer(self, question, doc_ids):
+        """
+        ``(answer or None, token)`` cached for a question that retrieved ``doc_ids`` from the
+        serving version. Answers are keyed by the version and its on-disk generation, so a
+        reload after another process wrote to the version stops serving older answers.
+        """
+        current = self._current
+        state = (current.version, *current.disk_state)
+        answer, token = self.query_cache.get_answer(question, doc_ids, state)
+        return answer, (state, token)
+
+    def cache_answer(self, question, doc_ids, answer, token):
+        """Cache an answer unless one of ``doc_ids`` changed since ``cached_answer`` returned ``token``"""
+        state, token = token
+        # tuple(): through the RAG daemon the token comes back from JSON as lists
+        return self.query_cache.put_answer(question, doc_ids, tuple(state), answer, token)
+
+    def embed(self, texts):
+        """Embeddings of ``texts`` from the serving model, through its embedding cache"""
+        return self._current.embedder.embed(texts)
+
+    def search(self, question, top_k=1, user_id=None, scope="user", unique_documents=False):
+        """
+        Search for the passages most relevant to a question.
+
+        With ``scope="user"`` only the partition of ``user_id`` is searched; ``scope="global"``
+        searches every user's documents (served by the global partition when enabled).
+        With ``unique_documents`` the result holds the best passage of up to ``top_k`` distinct documents.
+
+        When hybrid search is on, the dense hits are fused with BM25 keyword hits by
+        reciprocal rank fusion, so exact terms ("who knows Kubernetes") rank well too.
+        """
+        current = self._current  # one version for the whole search, even if another is swapped in
+        if not len(current.store):
+            return []
+        model_name = current.embedder.model_name
+        query_embedding = self.query_cache.get_embedding(model_name, question)
+        if query_embedding is None:
+            query_embedding = current.embedder.embed([question])[0]
+            self.query_cache.put_embedding(model_name, question, query_embedding)
+        k = top_k * self.PASSAGE_OVERFETCH if unique_documents else top_k
+        if self.hybrid:
+            k = max(k, Config.RAG_HYBRID_CANDIDATES)
+        owner = None if scope == "global" else self._owner(user_id)
+        if owner is None:
+            D, I = current.index.search_global(query_embedding, k)
+        else:
+            D, I = current.index.search(query_embedding, k, owner=owner)
 
-    def query_similar_cvs(self, cv_text, top_k=3):
-        """Find CVs similar to the provided CV text"""
-        return self.search(cv_text, top_k=top_k)
+        if self.hybrid:
+            _, keyword_rows = current.keyword_index.search(question, k, current.store.alive,
+                                                           owners=current.store.owners, owner=owner)
+            I = reciprocal_rank_fusion([I.tolist(), keyword_rows.tolist()], k=Config.RAG_RRF_K)
+        return current.store.lookup(I, unique_documents=unique_documents)[:top_k]
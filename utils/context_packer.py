@@ -0,0 +1,138 @@
+import re
+import threading
+from utils.keyword_index import tokenize
+
+_PIECE_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+
+def estimate_tokens(text):
+    """
+    Local estimate of the BPE tokens an OpenAI model sees for ``text``: one per
+    punctuation mark and one per word plus one for every further 6 characters. It runs
+    without a tokenizer download and errs on the high side for long technical words.
+    """
+    return sum(1 + (len(piece) - 1) // 6 for piece in _PIECE_PATTERN.findall(text))
+
+
+def _truncate(text, max_tokens):
+    """Longest prefix of ``text`` (cut at a word boundary) estimated at no more than ``max_tokens``"""
+    used = 0
+    end = 0
+    for match in _PIECE_PATTERN.finditer(text):
+        used += 1 + (len(match.group()) - 1) // 6
+        if used > max_tokens:
+            break
+        end = match.end()
+    return text[:end]
+
+
+class PackedContext:
+    """Passages chosen for a prompt, in the order they are sent, with their token count"""
+
+    __slots__ = ("passages", "text", "tokens", "duplicates", "over_budget")
+
+    def __init__(self, passages, separator, duplicates, over_budget):
+        self.passages = passages
+        self.text = separator.join(passage["text"] for passage in passages)
+        self.tokens = estimate_tokens(self.text)
+        self.duplicates = duplicates
+        self.over_budget = over_budget
+
+    @property
+    def doc_ids(self):
+        return [passage["id"] for passage in self.passages]
+
+
+class ContextPacker:
+    """
+    Fit retrieved passages under a prompt token budget.
+
+    Passages are scored by retrieval rank plus the share of the question's terms they
+    contain. Exact and near duplicates are dropped: overlapping chunk windows, or the
+    same CV uploaded twice. The best passages are then packed greedily until the
+    budget is spent. The top passage is truncated rather than dropped when it alone
+    exceeds the budget.
+    """
+
+    SEPARATOR = "\n\n"
+
+    def __init__(self, token_budget=1500, duplicate_similarity=0.8, rank_weight=1.0, overlap_weight=1.0):
+        self.token_budget = token_budget
+        self.duplicate_similarity = duplicate_similarity
+        self.rank_weight = rank_weight
+        self.overlap_weight = overlap_weight
+
+    def _score(self, rank, terms, question_terms):
+        overlap = len(terms & question_terms) / len(question_terms) if question_terms else 0.0
+        return self.rank_weight / (rank + 1) + self.overlap_weight * overlap
+
+    def _is_duplicate(self, terms, kept_terms):
+        for other in kept_terms:
+            union = len(terms | other)
+            if union and len(terms & other) / union >= self.duplicate_similarity:
+                return True
+        return False
+
+    def pack(self, question, passages):
+        """Return a PackedContext of ``passages`` (ranked ``{"id", "text"}`` dicts) for ``question``"""
+        question_terms = set(tokenize(question))
+        candidates = []
+        for rank, passage in enumerate(passages):
+            terms = set(tokenize(passage["text"]))
+            candidates.append((self._score(rank, terms, question_terms), rank, terms, passage))
+        candidates.sort(key=lambda candidate: (-candidate[0], candidate[1]))
+
+        chosen, kept_terms = [], []
+        duplicates = over_budget = 0
+        remaining = self.token_budget
+        separator_tokens = estimate_tokens(self.SEPARATOR)
+        for _, _, terms, passage in candidates:
+            if self._is_duplicate(terms, kept_terms):
+                duplicates += 1
+                continue
+            cost = estimate_tokens(passage["text"]) + (separator_tokens if chosen else 0)
+            if cost > remaining:
+                if chosen:
+                    over_budget += 1
+                    continue
+                passage = {**passage, "text": _truncate(passage["text"], remaining)}
+                cost = remaining
+            chosen.append(passage)
+            kept_terms.append(terms)
+            remaining -= cost
+        return PackedContext(chosen, self.SEPARATOR, duplicates, over_budget)
+
+
+class PromptMetrics:
+    """Running totals of the prompts sent to the LLM, for latency per token"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.prompts = 0
+        self.context_tokens = 0
+        self.prompt_tokens = 0
+        self.duplicates_dropped = 0
+        self.over_budget_dropped = 0
+        self.llm_seconds = 0.0
+
+    def record(self, context, prompt_tokens, seconds):
+        with self._lock:
+            self.prompts += 1
+            self.context_tokens += context.tokens
+            self.prompt_tokens += prompt_tokens
+            self.duplicates_dropped += context.duplicates
+            self.over_budget_dropped += context.over_budget
+            self.llm_seconds += seconds
+
+    def stats(self):
+        with self._lock:
+            return {
+                "prompts": self.prompts,
+                "context_tokens": self.context_tokens,
+                "prompt_tokens": self.prompt_tokens,
+                "avg_prompt_tokens": self.prompt_tokens / self.prompts if self.prompts else 0.0,
+                "duplicates_dropped": self.duplicates_dropped,
+                "over_budget_dropped": self.over_budget_dropped,
+                "llm_seconds": round(self.llm_seconds, 3),
+                "ms_per_1k_prompt_tokens": 1e6 * self.llm_seconds / self.prompt_tokens if self.prompt_tokens else 0.0,
+            }
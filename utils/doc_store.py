@@ -0,0 +1,309 @@
+import json
+import mmap
+import os
+import numpy as np
+import xxhash
+
+
+def content_hash(text):
+    """64-bit xxhash of the text after collapsing whitespace and case"""
+    normalized = " ".join(text.split()).lower()
+    return xxhash.xxh3_64_intdigest(normalized.encode("utf-8"))
+
+
+class DocumentStore:
+    """
+    Array-backed document store for the RAG index.
+
+    Every passage of a document occupies one row (a short document is a single
+    passage). The row number doubles as the FAISS id, so mapping search hits back to
+    documents is a plain array lookup. Texts live in a single UTF-8 blob addressed by
+    an int64 (start, end) offset table, and deletes only flip the rows' ``alive``
+    flags (``compact_texts`` later drops their texts from the blob). Each row also
+    keeps its owner (user id, or -1 when unowned) and the ``content_hash`` of its
+    document, so duplicate content of the same owner can be found without
+    re-encoding it.
+
+    One writer at a time may add or remove while other threads call ``lookup`` and
+    ``text``: rows are only ever appended, grown arrays replace the old ones instead
+    of being resized, and the offset table and text blob are swapped together as a
+    single reference.
+    """
+
+    OFFSETS_FILE = "offsets.npy"
+    ALIVE_FILE = "alive.npy"
+    HASHES_FILE = "hashes.npy"
+    OWNERS_FILE = "owners.npy"
+    TEXTS_FILE = "texts.bin"
+    DOC_IDS_FILE = "doc_ids.json"
+
+    def __init__(self):
+        self._alive = np.zeros(0, dtype=bool)
+        self._hashes = np.zeros(0, dtype=np.uint64)
+        self._owners = np.zeros(0, dtype=np.int64)
+        self._size = 0  # rows in use (alive or dead)
+        self._doc_ids = []  # row -> doc_id
+        self._rows = {}  # live doc_id -> rows of its passages
+        self._by_hash = {}  # (owner, content hash) -> first live row of the document
+        # (offsets, persisted text blob (memory-mapped), texts appended since the last save)
+        self._texts = (np.zeros((0, 2), dtype=np.int64), b"", bytearray())
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __contains__(self, doc_id):
+        return doc_id in self._rows
+
+    @property
+    def total_rows(self):
+        """Number of rows ever allocated, including deleted ones"""
+        return self._size
+
+    @property
+    def live_rows(self):
+        """Number of live passages (= vectors expected in the index)"""
+        return int(np.count_nonzero(self._alive[:self._size]))
+
+    def _reserve(self, extra):
+        needed = self._size + extra
+        capacity = len(self._alive)
+        if needed <= capacity and self._alive.flags.writeable:
+            return
+        new_capacity = max(needed, capacity * 2, 1024)
+        old_offsets, base, tail = self._texts
+        offsets = np.zeros((new_capacity, 2), dtype=np.int64)
+        alive = np.zeros(new_capacity, dtype=bool)
+        hashes = np.zeros(new_capacity, dtype=np.uint64)
+        owners = np.zeros(new_capacity, dtype=np.int64)
+        offsets[:self._size] = old_offsets[:self._size]
+        alive[:self._size] = self._alive[:self._size]
+        hashes[:self._size] = self._hashes[:self._size]
+        owners[:self._size] = self._owners[:self._size]
+        self._alive, self._hashes, self._owners = alive, hashes, owners
+        self._texts = (offsets, base, tail)
+
+    def add_many(self, doc_ids, texts, hashes=None, owner=-1):
+        """
+        Append passages of one owner and return their rows (= FAISS ids) as an int64 array.
+
+        Entries sharing a doc_id are passages of the same document and should share its
+        hash; documents already in the store are replaced.
+        """
+        doc_ids = list(doc_ids)
+        texts = list(texts)
+        if hashes is None:
+            hashes = [content_hash(text) for text in texts]
+        for doc_id in dict.fromkeys(doc_ids):
+            self.remove(doc_id)
+        self._reserve(len(doc_ids))
+        rows = np.arange(self._size, self._size + len(doc_ids), dtype=np.int64)
+        offsets, base, tail = self._texts
+
+        for row, doc_id, text, text_hash in zip(rows.tolist(), doc_ids, texts, hashes):
+            encoded = text.encode("utf-8")
+            start = len(base) + len(tail)
+            tail.extend(encoded)
+            offsets[row] = (start, start + len(encoded))
+            self._alive[row] = True
+            self._hashes[row] = text_hash
+            self._owners[row] = owner
+            self._doc_ids.append(doc_id)
+            self._rows.setdefault(doc_id, []).append(row)
+            self._by_hash.setdefault((owner, int(text_hash)), self._rows[doc_id][0])
+
+        self._size += len(doc_ids)
+        return rows
+
+    def add(self, doc_id, text, owner=-1):
+        """Append a single document and return its row"""
+        return int(self.add_many([doc_id], [text], owner=owner)[0])
+
+    def remove(self, doc_id):
+        """Mark a document's passages as deleted; returns their rows or None"""
+        rows = self._rows.pop(doc_id, None)
+        if rows is None:
+            return None
+        if not self._alive.flags.writeable:
+            self._reserve(0)
+        self._alive[rows] = False
+        key = (int(self._owners[rows[0]]), int(self._hashes[rows[0]]))
+        if self._by_hash.get(key) == rows[0]:
+            del self._by_hash[key]
+        return rows
+
+    @property
+    def alive(self):
+        """Read-only view of the per-row alive flags"""
+        view = self._alive[:self._size].view()
+        view.flags.writeable = False
+        return view
+
+    @property
+    def owners(self):
+        """Read-only view of the per-row owners"""
+        view = self._owners[:self._size].view()
+        view.flags.writeable = False
+        return view
+
+    def rows_of(self, doc_id):
+        return self._rows.get(doc_id)
+
+    def doc_id(self, row):
+        return self._doc_ids[row]
+
+    def owner(self, row):
+        return int(self._owners[row])
+
+    def find_by_hash(self, text_hash, owner=-1):
+        """Return the owner's live doc_id whose text has ``text_hash``, or None"""
+        row = self._by_hash.get((owner, int(text_hash)))
+        return None if row is None or not self._alive[row] else self._doc_ids[row]
+
+    def document(self, doc_id):
+        """Return ``(owner, content hash, passage texts)`` of a live document, or None"""
+        rows = self._rows.get(doc_id)
+        if rows is None:
+            return None
+        return int(self._owners[rows[0]]), int(self._hashes[rows[0]]), [self.text(row) for row in rows]
+
+    def content_hash_of(self, doc_id):
+        rows = self._rows.get(doc_id)
+        return None if rows is None else int(self._hashes[rows[0]])
+
+    def doc_ids(self):
+        """Iterate over live document ids"""
+        return iter(self._rows)
+
+    def text(self, row):
+        offsets, base, tail = self._texts
+        start, end = offsets[row]
+        if start >= len(base):
+            return tail[start - len(base):end - len(base)].decode("utf-8")
+        return base[start:end].decode("utf-8")
+
+    def lookup(self, rows, unique_documents=False):
+        """
+        Resolve FAISS ids to ``{"id", "text"}`` passage dicts, skipping misses and deleted rows.
+
+        With ``unique_documents`` only the first (best ranked) passage of each document is kept.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        rows = rows[(rows >= 0) & (rows < self._size)]
+        rows = rows[self._alive[rows]]
+        results, seen = [], set()
+        for row in rows.tolist():
+            doc_id = self._doc_ids[row]
+            if unique_documents:
+                if doc_id in seen:
+                    continue
+                seen.add(doc_id)
+            results.append({"id": doc_id, "text": self.text(row)})
+        return results
+
+    def _map_texts(self, path):
+        """Serve every text from the memory-mapped blob at ``path`` (read on demand, shared page cache)"""
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            base = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        self._texts = (self._texts[0], base, bytearray())
+
+    @property
+    def resident_text_bytes(self):
+        """Text bytes held in process memory rather than in the mapped blob"""
+        return len(self._texts[2])
+
+    @property
+    def dead_text_bytes(self):
+        """Blob bytes still held by the texts of deleted rows"""
+        offsets = self._texts[0][:self._size]
+        return int((offsets[:, 1] - offsets[:, 0])[~self._alive[:self._size]].sum())
+
+    def compact_texts(self):
+        """
+        Rewrite the text blob without the texts of deleted rows; returns the bytes reclaimed.
+
+        Rows keep their numbers, since they are the FAISS ids of every partition; deleted
+        rows just end up with empty offsets. The compacted blob stays in memory until
+        the next ``save`` maps it.
+        """
+        offsets, base, tail = self._texts
+        reclaimed = self.dead_text_bytes
+        if not reclaimed:
+            return 0
+        compacted = np.zeros(offsets.shape, dtype=np.int64)
+        blob = bytearray()
+        for row in np.flatnonzero(self._alive[:self._size]).tolist():
+            start, end = offsets[row]
+            encoded = tail[start - len(base):end - len(base)] if start >= len(base) else base[start:end]
+            compacted[row] = (len(blob), len(blob) + len(encoded))
+            blob.extend(encoded)
+        self._texts = (compacted, b"", blob)
+        return reclaimed
+
+    def save(self, directory):
+        """
+        Write the store into ``directory`` using temp files and atomic renames.
+
+        Afterwards the freshly written text blob is memory-mapped, so texts added since
+        the last save stop occupying process memory.
+        """
+        os.makedirs(directory, exist_ok=True)
+        paths = {name: os.path.join(directory, name)
+                 for name in (self.OFFSETS_FILE, self.ALIVE_FILE, self.HASHES_FILE,
+                              self.OWNERS_FILE, self.TEXTS_FILE, self.DOC_IDS_FILE)}
+
+        offsets, base, tail = self._texts
+        with open(paths[self.OFFSETS_FILE] + ".tmp", "wb") as f:
+            np.save(f, offsets[:self._size])
+        with open(paths[self.ALIVE_FILE] + ".tmp", "wb") as f:
+            np.save(f, self._alive[:self._size])
+        with open(paths[self.HASHES_FILE] + ".tmp", "wb") as f:
+            np.save(f, self._hashes[:self._size])
+        with open(paths[self.OWNERS_FILE] + ".tmp", "wb") as f:
+            np.save(f, self._owners[:self._size])
+        with open(paths[self.TEXTS_FILE] + ".tmp", "wb") as f:
+            f.write(base[:len(base)])
+            f.write(tail)
+        with open(paths[self.DOC_IDS_FILE] + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(self._doc_ids, f)
+
+        for path in paths.values():
+            os.replace(path + ".tmp", path)
+        self._map_texts(paths[self.TEXTS_FILE])
+
+    @classmethod
+    def exists(cls, directory):
+        return all(os.path.exists(os.path.join(directory, name))
+                   for name in (cls.OFFSETS_FILE, cls.ALIVE_FILE, cls.OWNERS_FILE,
+                                cls.TEXTS_FILE, cls.DOC_IDS_FILE))
+
+    @classmethod
+    def load(cls, directory):
+        """Load a store with its arrays and text blob memory-mapped read-only"""
+        store = cls()
+        offsets = np.load(os.path.join(directory, cls.OFFSETS_FILE), mmap_mode="r")
+        store._alive = np.load(os.path.join(directory, cls.ALIVE_FILE), mmap_mode="r")
+        store._owners = np.load(os.path.join(directory, cls.OWNERS_FILE), mmap_mode="r")
+        with open(os.path.join(directory, cls.DOC_IDS_FILE), "r", encoding="utf-8") as f:
+            store._doc_ids = json.load(f)
+
+        store._size = len(store._doc_ids)
+        if not len(offsets) == len(store._alive) == len(store._owners) == store._size:
+            raise ValueError(f"Corrupt document store in {directory}")
+
+        store._texts = (offsets, b"", bytearray())
+        store._map_texts(os.path.join(directory, cls.TEXTS_FILE))
+
+        # Snapshots written before content hashing was added get their hashes rebuilt
+        hashes_path = os.path.join(directory, cls.HASHES_FILE)
+        if os.path.exists(hashes_path):
+            store._hashes = np.load(hashes_path, mmap_mode="r")
+        else:
+            store._hashes = np.array([content_hash(store.text(row)) for row in range(store._size)],
+                                     dtype=np.uint64)
+
+        for row in np.flatnonzero(store._alive).tolist():
+            rows = store._rows.setdefault(store._doc_ids[row], [])
+            rows.append(row)
+            store._by_hash.setdefault((int(store._owners[row]), int(store._hashes[row])), rows[0])
+        return store
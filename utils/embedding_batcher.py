@@ -0,0 +1,114 @@
+import queue
+import threading
+import time
+import numpy as np
+
+
+class _EncodeRequest:
+    __slots__ = ("texts", "done", "result", "error")
+
+    def __init__(self, texts):
+        self.texts = texts
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class EmbeddingBatcher:
+    """
+    Micro-batching front end for ``SentenceTransformer.encode``.
+
+    Callers on any thread submit texts and block until their vectors are ready. A
+    single worker thread takes the first pending request, keeps collecting more for
+    up to ``max_wait_ms`` or until ``max_batch_size`` texts are queued, runs one
+    batched ``encode`` and hands every caller its own rows. Requests that are already
+    a full batch skip the queue.
+    """
+
+    def __init__(self, model, max_batch_size=32, max_wait_ms=5):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self._requests = 0
+        self._texts = 0
+        self._batches = 0
+        self._encode_seconds = 0.0
+        self._started = time.perf_counter()
+        self._worker = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+        self._worker.start()
+
+    def _encode(self, texts):
+        start = time.perf_counter()
+        vectors = np.asarray(self.model.encode(texts, batch_size=self.max_batch_size), dtype=np.float32)
+        with self._stats_lock:
+            self._batches += 1
+            self._texts += len(texts)
+            self._encode_seconds += time.perf_counter() - start
+        return vectors
+
+    def encode(self, texts):
+        """Encode a list of texts; returns a float32 array with one row per text"""
+        texts = list(texts)
+        with self._stats_lock:
+            self._requests += 1
+        if len(texts) >= self.max_batch_size:
+            return self._encode(texts)
+
+        request = _EncodeRequest(texts)
+        self._queue.put(request)
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def encode_one(self, text):
+        return self.encode([text])[0]
+
+    def _collect(self):
+        """Block for one request, then gather more until the batch is full or the window closes"""
+        batch = [self._queue.get()]
+        size = len(batch[0].texts)
+        deadline = time.perf_counter() + self.max_wait
+        while size < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(request)
+            size += len(request.texts)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            texts = [text for request in batch for text in request.texts]
+            try:
+                vectors = self._encode(texts)
+                offset = 0
+                for request in batch:
+                    request.result = vectors[offset:offset + len(request.texts)]
+                    offset += len(request.texts)
+            except Exception as e:
+                for request in batch:
+                    request.error = e
+            for request in batch:
+                request.done.set()
+
+    def stats(self):
+        """Throughput counters since the batcher started"""
+        with self._stats_lock:
+            elapsed = time.perf_counter() - self._started
+            return {
+                "requests": self._requests,
+                "texts": self._texts,
+                "batches": self._batches,
+                "avg_batch_size": self._texts / self._batches if self._batches else 0.0,
+                "encode_seconds": round(self._encode_seconds, 3),
+                "texts_per_encode_second": self._texts / self._encode_seconds if self._encode_seconds else 0.0,
+                "texts_per_second": self._texts / elapsed if elapsed else 0.0,
+            }
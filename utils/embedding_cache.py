@@ -0,0 +1,183 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+import xxhash
+
+
+class EmbeddingCache:
+    """
+    Two-level cache of text embeddings keyed by (model name, text hash).
+
+    An in-process LRU of float32 vectors sits in front of a SQLite file holding the
+    vectors packed as float16. The file is shared by every worker process and is
+    trimmed back to ``max_disk_bytes`` by evicting the least recently used rows.
+    """
+
+    DB_FILE = "embeddings.sqlite"
+    ROW_OVERHEAD = 64  # approximate per-row bytes on top of the vector (key, timestamps, b-tree)
+    EVICTION_CHECK_EVERY = 256  # puts between size checks
+    SQL_CHUNK = 500  # keys per IN (...) query, below SQLite's bound-variable limit
+
+    def __init__(self, directory, model_name, dim, memory_items=4096, max_disk_bytes=256 * 1024 * 1024):
+        self.directory = directory
+        self.model_name = model_name
+        self.dim = dim
+        self.memory_items = memory_items
+        self.max_rows = max(1, max_disk_bytes // (dim * 2 + self.ROW_OVERHEAD))
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._puts_since_check = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        os.makedirs(directory, exist_ok=True)
+        conn = self._conn()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key BLOB PRIMARY KEY,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings (last_used)")
+        conn.commit()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(os.path.join(self.directory, self.DB_FILE), timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def key(self, text):
+        return xxhash.xxh3_128_digest(f"{self.model_name}\0{text}".encode("utf-8"))
+
+    def _remember(self, key, vector):
+        with self._lock:
+            self._memory[key] = vector
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_items:
+                self._memory.popitem(last=False)
+
+    def get_many(self, texts):
+        """Return (vectors, missing) where vectors[i] is None for every index in missing"""
+        keys = [self.key(text) for text in texts]
+        vectors = [None] * len(texts)
+        pending = []
+
+        with self._lock:
+            for i, key in enumerate(keys):
+                vector = self._memory.get(key)
+                if vector is None:
+                    pending.append(i)
+                else:
+                    self._memory.move_to_end(key)
+                    vectors[i] = vector
+            self.memory_hits += len(texts) - len(pending)
+
+        if pending:
+            conn = self._conn()
+            unique_keys = list({keys[i] for i in pending})
+            rows = {}
+            now = time.time()
+            for start in range(0, len(unique_keys), self.SQL_CHUNK):
+                chunk = unique_keys[start:start + self.SQL_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                found = conn.execute(f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                                     chunk).fetchall()
+                if found:
+                    conn.execute(f"UPDATE embeddings SET last_used = ? WHERE key IN ({','.join('?' * len(found))})",
+                                 [now, *(key for key, _ in found)])
+                rows.update(found)
+            conn.commit()
+
+            missing = []
+            for i in pending:
+                blob = rows.get(keys[i])
+                if blob is None:
+                    missing.append(i)
+                    continue
+                vector = np.frombuffer(blob, dtype=np.float16).astype(np.float32)
+                vectors[i] = vector
+                self._remember(keys[i], vector)
+            with self._lock:
+                self.disk_hits += len(pending) - len(missing)
+                self.misses += len(missing)
+        else:
+            missing = []
+
+        return vectors, missing
+
+    def put_many(self, texts, vectors):
+        """Store vectors; returns them rounded through float16, exactly as later hits will see them"""
+        keys = [self.key(text) for text in texts]
+        packed = np.asarray(vectors, dtype=np.float32).astype(np.float16)
+        now = time.time()
+        conn = self._conn()
+        conn.executemany(
+            "INSERT OR REPLACE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)",
+            [(key, vector.tobytes(), now) for key, vector in zip(keys, packed)]
+        )
+        conn.commit()
+        rounded = packed.astype(np.float32)
+        for key, vector in zip(keys, rounded):
+            self._remember(key, vector)
+
+        with self._lock:
+            self._puts_since_check += len(keys)
+            check = self._puts_since_check >= self.EVICTION_CHECK_EVERY
+            if check:
+                self._puts_since_check = 0
+        if check:
+            self.evict()
+        return rounded
+
+    def evict(self):
+        """Drop least recently used rows until the file is back under its size budget"""
+        conn = self._conn()
+        count = conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        excess = count - self.max_rows
+        if excess <= 0:
+            return 0
+        conn.execute("""
+            DELETE FROM embeddings WHERE key IN (
+                SELECT key FROM embeddings ORDER BY last_used LIMIT ?
+            )
+        """, (excess,))
+        conn.commit()
+        with self._lock:
+            self.evictions += excess
+        return excess
+
+    def encode(self, texts, encode_fn):
+        """Return float32 embeddings for ``texts``, calling ``encode_fn`` only for cache misses"""
+        texts = list(texts)
+        vectors, missing = self.get_many(texts)
+        if missing:
+            unique_texts = list(dict.fromkeys(texts[i] for i in missing))
+            encoded = dict(zip(unique_texts, self.put_many(unique_texts, encode_fn(unique_texts))))
+            for i in missing:
+                vectors[i] = encoded[texts[i]]
+        if not texts:
+            return np.empty((0, self.dim), dtype=np.float32)
+        return np.vstack(vectors)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "memory_items": len(self._memory),
+            }
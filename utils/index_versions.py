@@ -0,0 +1,170 @@
+import fcntl
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+
+class RootLock:
+    """
+    Exclusive lock on an index root, shared by every process that writes to it.
+
+    It is an ``flock`` on a lock file, taken once per process and re-entrant within it,
+    so one thread can save while already holding it for a write. Threads of one
+    process queue on an inner lock, since ``flock`` does not tell them apart.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._file = None
+
+    def __enter__(self):
+        self._thread_lock.acquire()
+        if self._depth == 0:
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                self._file = open(self.path, "a")
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+            except BaseException:
+                if self._file is not None:
+                    self._file.close()
+                    self._file = None
+                self._thread_lock.release()
+                raise
+        self._depth += 1
+        return self
+
+    def __exit__(self, *exc_info):
+        self._depth -= 1
+        if self._depth == 0:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
+        self._thread_lock.release()
+
+
+class IndexVersions:
+    """
+    Versioned RAG index snapshots under one root directory.
+
+    Every version is a directory ``versions/<id>/`` holding the FAISS partitions, the
+    document store (texts and the row -> doc id map), the BM25 index and a
+    ``manifest.json`` with the embedding model, its dimension and summary counts. The
+    ``ACTIVE`` file names the version being served and is replaced with an atomic
+    rename, so switching to a new build or back to an old one never leaves a
+    half-written index in service.
+
+    A version's files are written by several processes (one per web worker), so
+    writers and loaders hold ``lock`` while they touch them.
+    """
+
+    VERSIONS_DIR = "versions"
+    ACTIVE_FILE = "ACTIVE"
+    LOCK_FILE = "WRITE_LOCK"
+    MANIFEST_FILE = "manifest.json"
+    LEGACY_ENTRIES = ("partitions", "offsets.npy", "alive.npy", "hashes.npy", "owners.npy",
+                      "texts.bin", "doc_ids.json", "bm25.npz")
+
+    def __init__(self, root):
+        self.root = root
+        self.lock = RootLock(os.path.join(root, self.LOCK_FILE))
+
+    def path(self, version):
+        return os.path.join(self.root, self.VERSIONS_DIR, version)
+
+    def create(self):
+        """Allocate a new, empty version directory and return its id (sortable by creation time)"""
+        version = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        os.makedirs(self.path(version))
+        return version
+
+    def manifest(self, version):
+        try:
+            with open(os.path.join(self.path(version), self.MANIFEST_FILE), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def write_manifest(self, version, **fields):
+        """Create or update a version's manifest atomically"""
+        manifest = self.manifest(version) or {
+            "version": version,
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        }
+        manifest.update(fields)
+        path = os.path.join(self.path(version), self.MANIFEST_FILE)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(path + ".tmp", path)
+        return manifest
+
+    def active(self):
+        """Id of the version being served, or None"""
+        try:
+            with open(os.path.join(self.root, self.ACTIVE_FILE), "r", encoding="utf-8") as f:
+                version = f.read().strip()
+        except OSError:
+            return None
+        return version if version and os.path.isdir(self.path(version)) else None
+
+    def activate(self, version):
+        """Point ACTIVE at a ready version"""
+        manifest = self.manifest(version)
+        if manifest is None or manifest.get("status") != "ready":
+            raise ValueError(f"Index version {version} is missing or not ready")
+        path = os.path.join(self.root, self.ACTIVE_FILE)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            f.write(version)
+        os.replace(path + ".tmp", path)
+
+    def list(self):
+        """Manifests of every version, oldest first, each with an ``active`` flag"""
+        versions_dir = os.path.join(self.root, self.VERSIONS_DIR)
+        if not os.path.isdir(versions_dir):
+            return []
+        active = self.active()
+        manifests = []
+        for version in sorted(os.listdir(versions_dir)):
+            manifest = self.manifest(version) or {"version": version, "status": "incomplete"}
+            manifest["active"] = version == active
+            manifests.append(manifest)
+        return manifests
+
+    def prune(self, keep=3, protect=()):
+        """
+        Delete all but the ``keep`` newest ready versions, plus failed or incomplete ones.
+        The active version, versions still building and ``protect`` are never deleted.
+        Returns the removed ids.
+        """
+        protected = {self.active(), *protect}
+        ready = [m["version"] for m in self.list() if m.get("status") == "ready"]
+        kept = set(ready[-keep:]) if keep > 0 else set()
+        removed = []
+        for manifest in self.list():
+            version = manifest["version"]
+            if version in protected or version in kept or manifest.get("status") == "building":
+                continue
+            shutil.rmtree(self.path(version), ignore_errors=True)
+            removed.append(version)
+        return removed
+
+    def adopt_legacy(self, **fields):
+        """
+        Move a pre-versioning snapshot stored directly in the root into a new version
+        and activate it. Returns the version id, or None when there is nothing to adopt.
+        """
+        if not os.path.isdir(os.path.join(self.root, "partitions")):
+            return None
+        version = self.create()
+        for name in self.LEGACY_ENTRIES:
+            source = os.path.join(self.root, name)
+            if os.path.exists(source):
+                os.replace(source, os.path.join(self.path(version), name))
+        self.write_manifest(version, status="ready", **fields)
+        self.activate(version)
+        return version
@@ -0,0 +1,133 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+import xxhash
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_job_description(text):
+    """Fold Unicode forms, case and whitespace, so re-pasted copies of one posting hash alike"""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", text)).strip().casefold()
+
+
+class JobAnalysisCache:
+    """
+    Persistent cache of job-description analyses (industry, domain keywords and the
+    extracted requirement lists), shared by every user and worker process.
+
+    Entries are keyed by the hash of the normalized posting text and tagged with the
+    ``schema_version`` of the prompts that produced them. Rows from other versions are
+    never returned and are purged when the cache opens. Entries expire ``ttl`` seconds
+    after they were written. Beyond ``max_entries`` the least recently used rows are
+    dropped.
+    """
+
+    EVICTION_CHECK_EVERY = 64  # puts between size checks
+
+    def __init__(self, path, schema_version, ttl=30 * 24 * 3600, max_entries=50000):
+        self.path = path
+        self.schema_version = schema_version
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._puts_since_check = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._conn()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS job_analyses (
+                key BLOB PRIMARY KEY,
+                schema_version INTEGER NOT NULL,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_job_analyses_last_used ON job_analyses (last_used)")
+        stale = conn.execute("DELETE FROM job_analyses WHERE schema_version != ?", (schema_version,)).rowcount
+        conn.commit()
+        if stale:
+            print(f"[JD Cache] Dropped {stale} analyses from older prompt versions")
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def key(self, job_desc):
+        return xxhash.xxh3_128_digest(f"{self.schema_version}\0{normalize_job_description(job_desc)}".encode("utf-8"))
+
+    def get(self, job_desc):
+        """Return the cached analysis dict for ``job_desc``, or None"""
+        key = self.key(job_desc)
+        conn = self._conn()
+        now = time.time()
+        row = conn.execute(
+            "SELECT value FROM job_analyses WHERE key = ? AND schema_version = ? AND created_at > ?",
+            (key, self.schema_version, now - self.ttl)
+        ).fetchone()
+        if row is None:
+            with self._lock:
+                self.misses += 1
+            return None
+        conn.execute("UPDATE job_analyses SET last_used = ? WHERE key = ?", (now, key))
+        conn.commit()
+        with self._lock:
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, job_desc, analysis):
+        conn = self._conn()
+        now = time.time()
+        conn.execute(
+            "INSERT OR REPLACE INTO job_analyses (key, schema_version, value, created_at, last_used) VALUES (?, ?, ?, ?, ?)",
+            (self.key(job_desc), self.schema_version, json.dumps(analysis), now, now)
+        )
+        conn.commit()
+
+        with self._lock:
+            self._puts_since_check += 1
+            check = self._puts_since_check >= self.EVICTION_CHECK_EVERY
+            if check:
+                self._puts_since_check = 0
+        if check:
+            self.evict()
+
+    def evict(self):
+        """Drop expired rows, then least recently used rows beyond ``max_entries``"""
+        conn = self._conn()
+        evicted = conn.execute("DELETE FROM job_analyses WHERE created_at <= ?", (time.time() - self.ttl,)).rowcount
+        excess = conn.execute("SELECT COUNT(*) FROM job_analyses").fetchone()[0] - self.max_entries
+        if excess > 0:
+            evicted += conn.execute(
+                "DELETE FROM job_analyses WHERE key IN (SELECT key FROM job_analyses ORDER BY last_used LIMIT ?)",
+                (excess,)
+            ).rowcount
+        conn.commit()
+        with self._lock:
+            self.evictions += evicted
+        return evicted
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "schema_version": self.schema_version,
+            }
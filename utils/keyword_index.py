@@ -0,0 +1,245 @@
+import json
+import math
+import os
+import re
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#]*(?:[.\-][a-z0-9+#]+)*")
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have i in is it its of on or that the this to was were will with
+who what which whom whose when where why how do does did can could should would know knows
+""".split())
+
+
+def tokenize(text):
+    """Lowercase terms, keeping technical tokens such as c++, c#, node.js and ci-cd intact"""
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+def reciprocal_rank_fusion(rankings, k=60, top_k=None):
+    """
+    Fuse ranked id lists: each id scores sum(1 / (k + rank)) over the lists it appears in.
+
+    Ids of -1 (FAISS padding) are ignored. Returns ids ordered by fused score.
+    """
+    scores = {}
+    for ranking in rankings:
+        for rank, doc in enumerate(ranking):
+            if doc < 0:
+                continue
+            scores[doc] = scores.get(doc, 0.0) + 1.0 / (k + rank + 1)
+    fused = sorted(scores, key=scores.get, reverse=True)
+    return fused if top_k is None else fused[:top_k]
+
+
+def _grow(array, size, needed):
+    """Return ``array`` if it can hold ``needed`` items, else a larger copy of its first ``size``"""
+    if needed <= len(array):
+        return array
+    grown = np.empty(max(needed, 2 * len(array), 4), dtype=array.dtype)
+    grown[:size] = array[:size]
+    return grown
+
+
+class _Postings:
+    """Append-only (row, term frequency) list; readers take ``view()`` while one writer appends"""
+
+    __slots__ = ("rows", "tfs", "size")
+
+    def __init__(self, rows=None, tfs=None):
+        self.rows = np.empty(4, dtype=np.int64) if rows is None else rows
+        self.tfs = np.empty(4, dtype=np.uint16) if tfs is None else tfs
+        self.size = 0 if rows is None else len(rows)
+
+    def append(self, row, tf):
+        # Grown arrays are published before the new entry and the size, so a reader
+        # holding any (size, rows, tfs) combination sees ``size`` valid entries
+        self.rows = _grow(self.rows, self.size, self.size + 1)
+        self.tfs = _grow(self.tfs, self.size, self.size + 1)
+        self.rows[self.size] = row
+        self.tfs[self.size] = tf
+        self.size += 1
+
+    def view(self):
+        size = self.size
+        return self.rows[:size], self.tfs[:size]
+
+
+class BM25Index:
+    """
+    Incrementally maintained BM25 inverted index over document store rows.
+
+    Postings are append-only (row, term frequency) arrays, so adding a passage only
+    touches the postings of its own terms. Removing a passage updates the document
+    frequencies and corpus length right away; its postings stay behind, skipped at
+    query time through the store's ``alive`` flags, until ``compact`` drops them.
+    Searches may run on any thread while a single writer adds and removes.
+    """
+
+    FILE = "bm25.npz"
+
+    def __init__(self, k1=1.2, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings = {}  # term -> _Postings
+        self._df = {}  # term -> live passages containing it
+        self._lengths = np.zeros(0, dtype=np.uint32)  # row -> passage length in terms
+        self._rows = 0  # rows covered by _lengths
+        self._live = 0
+        self._total_length = 0
+
+    def __len__(self):
+        return self._live
+
+    @property
+    def total_rows(self):
+        return self._rows
+
+    def add(self, rows, texts):
+        for row, text in zip(rows, texts):
+            terms = tokenize(text)
+            # The length is in place before any posting can lead a reader to this row
+            self._lengths = _grow(self._lengths, self._rows, row + 1)
+            self._lengths[self._rows:row] = 0
+            self._lengths[row] = len(terms)
+            self._rows = max(self._rows, row + 1)
+            counts = {}
+            for term in terms:
+                counts[term] = counts.get(term, 0) + 1
+            for term, tf in counts.items():
+                postings = self._postings.get(term)
+                if postings is None:
+                    postings = _Postings()
+                    self._postings[term] = postings
+                postings.append(row, min(tf, 65535))
+                self._df[term] = self._df.get(term, 0) + 1
+            self._live += 1
+            self._total_length += len(terms)
+
+    def remove(self, rows, texts):
+        """Forget passages; ``texts`` must be the texts they were added with"""
+        for row, text in zip(rows, texts):
+            for term in set(tokenize(text)):
+                df = self._df.get(term, 0) - 1
+                if df > 0:
+                    self._df[term] = df
+                else:
+                    self._df.pop(term, None)
+            self._live -= 1
+            self._total_length -= int(self._lengths[row])
+
+    def compact(self, alive):
+        """
+        Drop the postings of rows that ``alive`` (the store's flags) marks deleted; returns how many.
+
+        The term map is rebuilt and swapped in as a whole, so a concurrent search reads
+        either the old or the new postings.
+        """
+        postings, dropped = {}, 0
+        for term, entry in self._postings.items():
+            rows, tfs = entry.view()
+            keep = np.ones(len(rows), dtype=bool)
+            known = rows < len(alive)
+            keep[known] = alive[rows[known]]
+            dropped += len(rows) - int(np.count_nonzero(keep))
+            if keep.any():
+                postings[term] = _Postings(rows[keep], tfs[keep])
+        if dropped:
+            self._postings = postings
+        return dropped
+
+    def search(self, query, top_k, alive, owners=None, owner=None):
+        """
+        Return (scores, rows) of the ``top_k`` best live passages for ``query``.
+
+        ``alive`` is the store's per-row flag array; when ``owner`` is given only rows
+        whose entry in ``owners`` matches are scored. Rows beyond ``alive`` (added after
+        it was taken) are ignored.
+        """
+        terms = set(tokenize(query))
+        live = self._live
+        if not terms or not live:
+            return np.empty(0, dtype=np.float32), np.empty(0, dtype=np.int64)
+
+        matches = []
+        for term in terms:
+            postings = self._postings.get(term)
+            df = self._df.get(term, 0)
+            if postings is None or not df:
+                continue
+            rows, tfs = postings.view()
+            keep = rows < len(alive)
+            keep[keep] = alive[rows[keep]]
+            if owner is not None:
+                keep[keep] = owners[rows[keep]] == owner
+            if keep.any():
+                matches.append((rows[keep], tfs[keep].astype(np.float32), df))
+
+        lengths = self._lengths  # read after the postings, so it covers every matched row
+        avg_length = max(self._total_length / live, 1.0)
+        all_rows, all_scores = [], []
+        for rows, tfs, df in matches:
+            idf = math.log(1.0 + max(live - df + 0.5, 0.0) / (df + 0.5))
+            norm = self.k1 * (1.0 - self.b + self.b * lengths[rows] / avg_length)
+            all_rows.append(rows)
+            all_scores.append(idf * tfs * (self.k1 + 1.0) / (tfs + norm))
+
+        if not all_rows:
+            return np.empty(0, dtype=np.float32), np.empty(0, dtype=np.int64)
+        rows, inverse = np.unique(np.concatenate(all_rows), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(all_scores)).astype(np.float32)
+        if len(rows) > top_k:
+            best = np.argpartition(-scores, top_k - 1)[:top_k]
+        else:
+            best = np.arange(len(rows))
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return scores[best], rows[best]
+
+    def save(self, directory):
+        """Write the postings, frequencies and lengths atomically"""
+        os.makedirs(directory, exist_ok=True)
+        terms = list(self._postings)
+        views = [self._postings[term].view() for term in terms]
+        path = os.path.join(directory, self.FILE)
+        with open(path + ".tmp", "wb") as f:
+            np.savez(
+                f,
+                terms=np.frombuffer(json.dumps(terms).encode("utf-8"), dtype=np.uint8),
+                counts=np.array([len(rows) for rows, _ in views], dtype=np.int64),
+                rows=np.concatenate([rows for rows, _ in views]) if views else np.empty(0, dtype=np.int64),
+                tfs=np.concatenate([tfs for _, tfs in views]) if views else np.empty(0, dtype=np.uint16),
+                df=np.array([self._df.get(t, 0) for t in terms], dtype=np.int64),
+                lengths=self._lengths[:self._rows],
+                totals=np.array([self._live, self._total_length], dtype=np.int64),
+            )
+        os.replace(path + ".tmp", path)
+
+    @classmethod
+    def exists(cls, directory):
+        return os.path.exists(os.path.join(directory, cls.FILE))
+
+    @classmethod
+    def load(cls, directory, k1=1.2, b=0.75):
+        index = cls(k1=k1, b=b)
+        with np.load(os.path.join(directory, cls.FILE)) as data:
+            terms = json.loads(data["terms"].tobytes().decode("utf-8"))
+            ends = np.cumsum(data["counts"])
+            rows, tfs, df = data["rows"], data["tfs"], data["df"]
+            start = 0
+            for term, end, term_df in zip(terms, ends.tolist(), df.tolist()):
+                index._postings[term] = _Postings(rows[start:end].copy(), tfs[start:end].copy())
+                if term_df:
+                    index._df[term] = term_df
+                start = end
+            index._lengths = data["lengths"].copy()
+            index._rows = len(index._lengths)
+            index._live, index._total_length = (int(x) for x in data["totals"])
+        return index
+
+    @classmethod
+    def build(cls, store, k1=1.2, b=0.75):
+        """Index every live row of a DocumentStore"""
+        index = cls(k1=k1, b=b)
+        rows = [row for doc_id in store.doc_ids() for row in store.rows_of(doc_id)]
+        index.add(sorted(rows), (store.text(row) for row in sorted(rows)))
+        return index
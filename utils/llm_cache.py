@@ -0,0 +1,158 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import xxhash
+import zstandard
+from langchain_core.messages import message_to_dict, messages_from_dict
+
+
+class LLMResponseCache:
+    """
+    Content-addressed cache of LLM responses keyed by (model, temperature, prompt).
+
+    Responses are stored as zstd-compressed LangChain message dicts in a SQLite file
+    shared by every worker process. Entries expire ``ttl`` seconds after they were
+    written. The file is trimmed back to ``max_bytes`` of compressed values by evicting
+    the least recently used rows.
+    """
+
+    DB_FILE = "llm_responses.sqlite"
+    EVICTION_CHECK_EVERY = 64  # puts between size checks
+
+    def __init__(self, directory, ttl=7 * 24 * 3600, max_bytes=128 * 1024 * 1024, level=3):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.level = level
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._puts_since_check = 0
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self.bypassed = 0
+        self.rejected = 0
+
+        os.makedirs(directory, exist_ok=True)
+        conn = self._conn()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key BLOB PRIMARY KEY,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses (last_used)")
+        conn.commit()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(os.path.join(self.directory, self.DB_FILE), timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            # zstd contexts are not thread-safe, so each thread keeps its own
+            self._local.compressor = zstandard.ZstdCompressor(level=self.level)
+            self._local.decompressor = zstandard.ZstdDecompressor()
+        return conn
+
+    @staticmethod
+    def key(model, temperature, prompt):
+        return xxhash.xxh3_128_digest(f"{model}\0{temperature}\0{prompt}".encode("utf-8"))
+
+    def get(self, key):
+        """Return the cached message for ``key``, or None when missing or expired"""
+        conn = self._conn()
+        row = conn.execute("SELECT value, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+        now = time.time()
+        if row is not None and row[1] + self.ttl <= now:
+            conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            conn.commit()
+            with self._lock:
+                self.expired += 1
+            row = None
+        if row is None:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+        conn.commit()
+        with self._lock:
+            self.hits += 1
+        data = json.loads(self._local.decompressor.decompress(row[0]))
+        return messages_from_dict([data])[0]
+
+    def put(self, key, message):
+        conn = self._conn()
+        value = self._local.compressor.compress(json.dumps(message_to_dict(message)).encode("utf-8"))
+        now = time.time()
+        conn.execute(
+            "INSERT OR REPLACE INTO responses (key, value, size, created_at, last_used) VALUES (?, ?, ?, ?, ?)",
+            (key, value, len(value), now, now)
+        )
+        conn.commit()
+
+        with self._lock:
+            self._puts_since_check += 1
+            check = self._puts_since_check >= self.EVICTION_CHECK_EVERY
+            if check:
+                self._puts_since_check = 0
+        if check:
+            self.evict()
+
+    def delete(self, key):
+        conn = self._conn()
+        conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+        conn.commit()
+
+    def evict(self):
+        """Drop expired rows, then least recently used rows until the values fit in ``max_bytes``"""
+        conn = self._conn()
+        expired = conn.execute("DELETE FROM responses WHERE created_at <= ?", (time.time() - self.ttl,)).rowcount
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        evicted = 0
+        if total > self.max_bytes:
+            excess = total - self.max_bytes
+            freed = 0
+            victims = []
+            for key, size in conn.execute("SELECT key, size FROM responses ORDER BY last_used"):
+                victims.append((key,))
+                freed += size
+                if freed >= excess:
+                    break
+            conn.executemany("DELETE FROM responses WHERE key = ?", victims)
+            evicted = len(victims)
+        conn.commit()
+        with self._lock:
+            self.expired += expired
+            self.evictions += evicted
+        return expired + evicted
+
+    def record_bypass(self):
+        with self._lock:
+            self.bypassed += 1
+
+    def record_rejection(self):
+        """A response the caller's validator refused, so it was not stored"""
+        with self._lock:
+            self.rejected += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "bypassed": self.bypassed,
+                "rejected": self.rejected,
+                "expired": self.expired,
+                "evictions": self.evictions,
+            }
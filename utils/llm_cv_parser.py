@@ -2,9 +2,10 @@ import json
 from services.llm_service import LLMService
 
 class LLMCVParser:
-    def __init__(self, cv_text, extra_links=None):
+    def __init__(self, cv_text, extra_links=None, priority=LLMService.INTERACTIVE):
         self.cv_text = cv_text
         self.extra_links = extra_links or []
+        self.priority = priority
 
     def parse(self):
         prompt = f"""
@@ -23,6 +24,7 @@ Return a JSON object with this format:
   "summary": "",
   "skills": ["", "", ...],
   "technologies": ["", "", ...],
+  "soft_skills": ["", "", ...],
   "work_experience": [
     {{"title": "", "company": "", "start_date": "", "end_date": "", "achievements": []}},
     ...
@@ -39,6 +41,7 @@ Return a JSON object with this format:
   "languages": []
 }}
 
+Put interpersonal and transferable skills (e.g. leadership, communication) in "soft_skills", not in "skills".
 If a field is missing, return it as an empty string or empty list.
 
 CV Text:
@@ -48,7 +51,7 @@ Additional hyperlinks found in the CV (match these to LinkedIn, GitHub, website,
 {', '.join(self.extra_links)}
 """
         try:
-            response = LLMService.invoke(prompt)
+            response = LLMService.invoke(prompt, priority=self.priority, validate=LLMService.json_response)
             parsed_data = json.loads(response.content)
 
             # ✅ Extract actual links from hyperlinks and override LLM guess
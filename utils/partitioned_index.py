@@ -0,0 +1,580 @@
+import math
+import os
+import threading
+import time
+from collections import deque
+import faiss
+import numpy as np
+
+UNOWNED = -1
+GLOBAL = "global"
+
+INDEX_FLAT = "flat"
+INDEX_HNSW = "hnsw"
+INDEX_IVFPQ = "ivfpq"
+INDEX_TYPES = (INDEX_FLAT, INDEX_HNSW, INDEX_IVFPQ)  # in increasing order of scale
+
+# Per-component encodings for the Flat and HNSW vector storage
+VECTOR_STORAGE = {
+    "float32": None,
+    "float16": faiss.ScalarQuantizer.QT_fp16,
+    "int8": faiss.ScalarQuantizer.QT_8bit,
+}
+
+
+class IndexPolicy:
+    """
+    Size-based choice and construction of the FAISS index type for a partition.
+
+    ``index_type="auto"`` picks Flat below ``hnsw_min_vectors``, HNSW below
+    ``ivfpq_min_vectors`` and IVF-PQ (with a codebook trained on the partition's
+    own vectors) above that. Any other value forces that type once it can be built.
+
+    ``vector_storage`` selects how Flat and HNSW indexes keep vectors: ``float32``,
+    or scalar-quantized ``float16`` / ``int8`` (2x / 4x smaller). The int8 ranges are
+    trained on the partition's own vectors, so a partition built from fewer than
+    ``sq_min_train`` of them (every fresh one) stores float16 until a rebuild can train int8.
+
+    Deletes only tombstone vectors; a partition is compacted (rebuilt from its live
+    vectors) once at least ``compact_min_dead`` of its vectors and ``compact_dead_ratio``
+    of the partition are dead.
+    """
+
+    def __init__(self, index_type="auto", hnsw_min_vectors=20_000, ivfpq_min_vectors=500_000,
+                 hnsw_m=32, hnsw_ef_construction=80, hnsw_ef_search=64,
+                 pq_m=48, pq_nbits=8, ivf_nprobe=16, vector_storage="float32", sq_min_train=1000,
+                 compact_dead_ratio=0.2, compact_min_dead=64):
+        if index_type != "auto" and index_type not in INDEX_TYPES:
+            raise ValueError(f"Unknown index type: {index_type}")
+        if vector_storage not in VECTOR_STORAGE:
+            raise ValueError(f"Unknown vector storage: {vector_storage}")
+        self.index_type = index_type
+        self.vector_storage = vector_storage
+        self.sq_min_train = sq_min_train
+        self.hnsw_min_vectors = hnsw_min_vectors
+        self.ivfpq_min_vectors = ivfpq_min_vectors
+        self.hnsw_m = hnsw_m
+        self.hnsw_ef_construction = hnsw_ef_construction
+        self.hnsw_ef_search = hnsw_ef_search
+        self.pq_m = pq_m
+        self.pq_nbits = pq_nbits
+        self.ivf_nprobe = ivf_nprobe
+        self.compact_dead_ratio = compact_dead_ratio
+        self.compact_min_dead = compact_min_dead
+
+    @staticmethod
+    def ivf_nlist(ntotal):
+        return int(min(65536, max(16, 4 * math.sqrt(ntotal))))
+
+    def can_build(self, kind, ntotal):
+        """IVF-PQ needs enough vectors to train both the coarse quantizer and the codebooks"""
+        if kind != INDEX_IVFPQ:
+            return True
+        return ntotal >= 39 * max(self.ivf_nlist(ntotal), 2 ** self.pq_nbits)
+
+    def kind_for(self, ntotal):
+        if self.index_type != "auto":
+            kind = self.index_type
+        elif ntotal >= self.ivfpq_min_vectors:
+            kind = INDEX_IVFPQ
+        elif ntotal >= self.hnsw_min_vectors:
+            kind = INDEX_HNSW
+        else:
+            kind = INDEX_FLAT
+        return kind if self.can_build(kind, ntotal) else INDEX_FLAT
+
+    def storage_for(self, ntrain):
+        """Vector storage of an index built from ``ntrain`` vectors: too few to train int8 ranges keep float16"""
+        if self.vector_storage == "int8" and ntrain < self.sq_min_train:
+            return "float16"
+        return self.vector_storage
+
+    def needs_requantize(self, index, ntotal):
+        """True for a float16 stand-in for int8 storage that now has enough vectors to train int8"""
+        return (self.vector_storage == "int8" and ntotal >= self.sq_min_train
+                and index_kind(index) != INDEX_IVFPQ and vector_storage(index) == "float16")
+
+    @staticmethod
+    def _train_sq(index, train_vectors):
+        if not index.is_trained:
+            index.train(np.ascontiguousarray(train_vectors, dtype=np.float32))
+
+    def build(self, kind, dim, train_vectors=None):
+        """Create an empty index of ``kind``; IVF-PQ and int8 storage are trained on ``train_vectors``"""
+        qtype = VECTOR_STORAGE[self.storage_for(0 if train_vectors is None else len(train_vectors))]
+        if kind == INDEX_FLAT:
+            if qtype is None:
+                return faiss.IndexIDMap(faiss.IndexFlatL2(dim))
+            flat = faiss.IndexScalarQuantizer(dim, qtype, faiss.METRIC_L2)
+            self._train_sq(flat, train_vectors)
+            return faiss.IndexIDMap(flat)
+        if kind == INDEX_HNSW:
+            if qtype is None:
+                hnsw = faiss.IndexHNSWFlat(dim, self.hnsw_m)
+            else:
+                hnsw = faiss.IndexHNSWSQ(dim, qtype, self.hnsw_m)
+                self._train_sq(hnsw, train_vectors)
+            hnsw.hnsw.efConstruction = self.hnsw_ef_construction
+            hnsw.hnsw.efSearch = self.hnsw_ef_search
+            return faiss.IndexIDMap(hnsw)
+        if kind == INDEX_IVFPQ:
+            # IVF indexes store external ids natively; wrapping them in IndexIDMap breaks remove_ids
+            quantizer = faiss.IndexFlatL2(dim)
+            ivf = faiss.IndexIVFPQ(quantizer, dim, self.ivf_nlist(len(train_vectors)), self.pq_m, self.pq_nbits)
+            ivf.train(np.ascontiguousarray(train_vectors, dtype=np.float32))
+            ivf.nprobe = self.ivf_nprobe
+            return ivf
+        raise ValueError(f"Unknown index type: {kind}")
+
+    def needs_compaction(self, size, dead):
+        return dead >= self.compact_min_dead and dead >= self.compact_dead_ratio * size
+
+    def tune(self, index):
+        """Apply the search-time parameters to an index loaded from disk"""
+        kind = index_kind(index)
+        if kind == INDEX_HNSW:
+            faiss.downcast_index(index.index).hnsw.efSearch = self.hnsw_ef_search
+        elif kind == INDEX_IVFPQ:
+            faiss.downcast_index(index).nprobe = self.ivf_nprobe
+
+
+def index_kind(index):
+    """Return INDEX_FLAT, INDEX_HNSW or INDEX_IVFPQ for an index built by IndexPolicy"""
+    index = faiss.downcast_index(index)
+    if isinstance(index, faiss.IndexIVFPQ):
+        return INDEX_IVFPQ
+    if isinstance(faiss.downcast_index(index.index), faiss.IndexHNSW):
+        return INDEX_HNSW
+    return INDEX_FLAT
+
+
+def vector_storage(index):
+    """Return the ``VECTOR_STORAGE`` name of a Flat or HNSW index built by IndexPolicy"""
+    inner = faiss.downcast_index(index.index)
+    if index_kind(index) == INDEX_HNSW:
+        inner = faiss.downcast_index(inner.storage)
+    qtype = inner.sq.qtype if isinstance(inner, faiss.IndexScalarQuantizer) else None
+    return next(name for name, storage in VECTOR_STORAGE.items() if storage == qtype)
+
+
+def vector_bytes(index):
+    """Approximate bytes one vector occupies in an index built by IndexPolicy (code, id and graph links)"""
+    kind = index_kind(index)
+    if kind == INDEX_IVFPQ:
+        return faiss.downcast_index(index).code_size + 8
+    inner = faiss.downcast_index(index.index)
+    if kind == INDEX_HNSW:
+        return inner.storage.sa_code_size() + 8 + 2 * inner.hnsw.nb_neighbors(0) * 4
+    return inner.sa_code_size() + 8
+
+
+def export_vectors(index):
+    """Return (vectors, ids) stored in an index; IVF-PQ and quantized vectors are decoded approximations"""
+    kind = index_kind(index)
+    if kind != INDEX_IVFPQ:
+        ids = faiss.vector_to_array(index.id_map).astype(np.int64)
+        return index.index.reconstruct_n(0, index.ntotal), ids
+
+    ivf = faiss.downcast_index(index)
+    invlists = ivf.invlists
+    vectors, ids = [], []
+    for list_no in range(ivf.nlist):
+        size = invlists.list_size(list_no)
+        if not size:
+            continue
+        ids.append(faiss.rev_swig_ptr(invlists.get_ids(list_no), size).copy())
+        codes = faiss.rev_swig_ptr(invlists.get_codes(list_no), size * invlists.code_size).copy()
+        decoded = ivf.pq.decode(codes.reshape(size, invlists.code_size))
+        if ivf.by_residual:
+            decoded += ivf.quantizer.reconstruct(list_no)
+        vectors.append(decoded)
+    if not ids:
+        return np.empty((0, ivf.d), dtype=np.float32), np.empty(0, dtype=np.int64)
+    return np.concatenate(vectors), np.concatenate(ids).astype(np.int64)
+
+
+class _Partition:
+    """
+    Immutable view of one partition: a base index, an optional small Flat delta index
+    holding recent adds, and the ids deleted since the base was built. Writers never
+    modify a published view; they publish a new one. A ``mapped`` base only views
+    the file it was loaded from and cannot be added to, even after ``clone_index``.
+    """
+
+    __slots__ = ("index", "kind", "delta", "tombstones", "mapped")
+
+    def __init__(self, index, delta=None, tombstones=frozenset(), mapped=False):
+        self.index = index
+        self.kind = index_kind(index)
+        self.delta = delta if delta is not None and delta.ntotal else None
+        self.tombstones = frozenset(tombstones)
+        self.mapped = mapped
+
+    @property
+    def size(self):
+        return self.index.ntotal + (self.delta.ntotal if self.delta is not None else 0)
+
+    @property
+    def live(self):
+        return self.size - len(self.tombstones)
+
+    @property
+    def dead(self):
+        return len(self.tombstones)
+
+
+def _new_delta(dim, vectors=None, ids=None):
+    delta = faiss.IndexIDMap(faiss.IndexFlatL2(dim))
+    if vectors is not None and len(vectors):
+        delta.add_with_ids(vectors, ids)
+    return delta
+
+
+class PartitionedIndex:
+    """
+    FAISS vectors partitioned by owner (user id).
+
+    Each owner gets its own index so a query only scans the caller's vectors.
+    Documents without an owner share the ``UNOWNED`` partition. An optional global
+    partition holds a second copy of every vector for cross-user similarity; without
+    it, global searches fan out over all partitions and merge the results.
+
+    Searches take no lock: they run against the ``partitions`` mapping published by
+    the last write, whose entries are immutable ``_Partition`` views. Writes are
+    serialized and copy-on-write. Adds to a partition of up to ``COPY_ON_WRITE_MAX``
+    vectors clone and extend its index; larger ones (and partitions being rebuilt)
+    clone and extend a small delta index instead. Deletes of every index type only
+    add tombstones, which searches filter out, so a delete never shifts the index.
+
+    A background merge rebuilds a partition from its live vectors when the delta
+    reaches ``DELTA_MAX`` vectors, the partition outgrows its index type (or the float16
+    storage standing in for int8 while it was small), or its dead ratio passes the
+    ``IndexPolicy`` compaction threshold; writes made meanwhile are carried over before
+    the swap. Each compaction is recorded in ``compactions``.
+    """
+
+    PARTITIONS_DIR = "partitions"
+    COPY_ON_WRITE_MAX = 10_000
+    DELTA_MAX = 4096
+
+    def __init__(self, dim, with_global=False, policy=None):
+        self.dim = dim
+        self.with_global = with_global
+        self.policy = policy or IndexPolicy()
+        self.partitions = {}  # owner (or GLOBAL) -> _Partition; replaced, never mutated, by writers
+        if with_global:
+            self.partitions[GLOBAL] = _Partition(self.policy.build(INDEX_FLAT, dim))
+        self._dirty = set()  # partition keys changed since the last save
+        self._lock = threading.RLock()  # serializes writers
+        self._merges = {}  # key -> background thread
+        self._merge_threads = []  # every started rebuild; it outlives its _merges entry while on_migrated runs
+        self.compactions = deque(maxlen=100)  # reports of the most recent compactions
+        self._compaction_totals = {"compactions": 0, "reclaimed_vectors": 0, "reclaimed_bytes": 0, "seconds": 0.0}
+        self.on_migrated = None  # optional callback(compacted), e.g. to persist the swapped-in index
+
+    @staticmethod
+    def _file_key(key):
+        return "unowned" if key == UNOWNED else str(key)
+
+    @staticmethod
+    def _parse_file_key(file_key):
+        if file_key == GLOBAL:
+            return GLOBAL
+        return UNOWNED if file_key == "unowned" else int(file_key)
+
+    @property
+    def ntotal(self):
+        """Number of live vectors across the owner partitions (the global copy is not counted)"""
+        return sum(part.live for key, part in self.partitions.items() if key != GLOBAL)
+
+    def kinds(self):
+        """Index type currently serving each partition"""
+        return {key: part.kind for key, part in self.partitions.items()}
+
+    def _publish(self, key, part):
+        """Swap in a new view of one partition (None drops it)"""
+        partitions = dict(self.partitions)
+        if part is None:
+            partitions.pop(key, None)
+        else:
+            partitions[key] = part
+        self.partitions = partitions
+        self._dirty.add(key)
+
+    def _copy_on_write(self, key, part):
+        return key not in self._merges and part.size <= self.COPY_ON_WRITE_MAX
+
+    def _add_to(self, key, vectors, rows):
+        part = self.partitions.get(key)
+        if part is None:
+            part = _Partition(self.policy.build(INDEX_FLAT, self.dim))
+        if self._copy_on_write(key, part):
+            # A mapped base is copied through serialization, which gives an index owning its codes
+            index = faiss.deserialize_index(faiss.serialize_index(part.index)) if part.mapped \
+                else faiss.clone_index(part.index)
+            index.add_with_ids(vectors, rows)
+            part = _Partition(index, part.delta, part.tombstones)
+        else:
+            delta = faiss.clone_index(part.delta) if part.delta is not None else _new_delta(self.dim)
+            delta.add_with_ids(vectors, rows)
+            part = _Partition(part.index, delta, part.tombstones, part.mapped)
+        self._publish(key, part)
+        self._maybe_merge(key)
+
+    def _remove_from(self, key, rows):
+        part = self.partitions.get(key)
+        if part is None:
+            return
+        part = _Partition(part.index, part.delta, part.tombstones | set(rows.tolist()), part.mapped)
+        if part.live == 0 and key not in self._merges and key != GLOBAL:
+            self._publish(key, None)
+            return
+        self._publish(key, part)
+        self._maybe_merge(key)
+
+    def add(self, vectors, rows, owner=UNOWNED):
+        """Add vectors under FAISS ids ``rows`` to the owner's partition"""
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        rows = np.asarray(rows, dtype=np.int64)
+        with self._lock:
+            self._add_to(owner, vectors, rows)
+            if self.with_global:
+                self._add_to(GLOBAL, vectors, rows)
+
+    def remove(self, rows, owner=UNOWNED):
+        """Remove FAISS ids ``rows`` from the owner's partition"""
+        rows = np.asarray(rows, dtype=np.int64)
+        with self._lock:
+            self._remove_from(owner, rows)
+            if self.with_global:
+                self._remove_from(GLOBAL, rows)
+
+    @staticmethod
+    def _search(part, vector, top_k):
+        if part is None or part.live <= 0:
+            return np.empty(0, dtype=np.float32), np.empty(0, dtype=np.int64)
+        query = np.asarray([vector], dtype=np.float32)
+        # Over-fetch by the number of tombstones so deleted hits can be dropped
+        k = top_k + len(part.tombstones)
+        hits = [index.search(query, min(k, index.ntotal))
+                for index in (part.index, part.delta) if index is not None and index.ntotal]
+        D = np.concatenate([D[0] for D, _ in hits])
+        I = np.concatenate([I[0] for _, I in hits])
+        keep = I >= 0
+        if part.tombstones:
+            keep &= ~np.isin(I, np.fromiter(part.tombstones, dtype=np.int64))
+        D, I = D[keep], I[keep]
+        if len(hits) > 1:
+            order = np.argsort(D, kind="stable")
+            D, I = D[order], I[order]
+        return D[:top_k], I[:top_k]
+
+    def search(self, vector, top_k, owner=UNOWNED):
+        """Search only the owner's partition; returns (distances, ids)"""
+        return self._search(self.partitions.get(owner), vector, top_k)
+
+    def search_global(self, vector, top_k):
+        """Search every owner's vectors; returns (distances, ids)"""
+        partitions = self.partitions
+        if self.with_global:
+            return self._search(partitions.get(GLOBAL), vector, top_k)
+
+        hits = [self._search(part, vector, top_k) for part in partitions.values()]
+        if not hits:
+            return self._search(None, vector, top_k)
+        distances = np.concatenate([D for D, _ in hits])
+        ids = np.concatenate([I for _, I in hits])
+        order = np.argsort(distances, kind="stable")[:top_k]
+        return distances[order], ids[order]
+
+    @staticmethod
+    def _export_live(part):
+        vectors, ids = export_vectors(part.index)
+        if part.delta is not None:
+            delta_vectors, delta_ids = export_vectors(part.delta)
+            vectors, ids = np.concatenate([vectors, delta_vectors]), np.concatenate([ids, delta_ids])
+        if part.tombstones:
+            keep = ~np.isin(ids, np.fromiter(part.tombstones, dtype=np.int64))
+            vectors, ids = vectors[keep], ids[keep]
+        return vectors, ids
+
+    def _maybe_merge(self, key):
+        """
+        Start a background rebuild when the partition has outgrown its index type, its
+        delta is full, too many of its vectors are dead or it can train int8 storage
+        """
+        part = self.partitions[key]
+        if key in self._merges:
+            return
+        target = self.policy.kind_for(part.live)
+        if INDEX_TYPES.index(target) <= INDEX_TYPES.index(part.kind):
+            target = part.kind  # only migrate up; shrinking partitions keep their index type
+            delta_full = part.delta is not None and part.delta.ntotal >= self.DELTA_MAX
+            if not delta_full and not self.policy.needs_compaction(part.size, part.dead) \
+                    and not self.policy.needs_requantize(part.index, part.live):
+                return
+
+        thread = threading.Thread(target=self._merge, args=(key, part, target), name=f"rag-merge-{key}")
+        self._merges[key] = thread
+        self._merge_threads.append(thread)
+        thread.start()
+
+    def _merge(self, key, part, target):
+        started = time.perf_counter()
+        try:
+            # ``part`` is immutable, so it is read here without holding the lock
+            vectors, ids = self._export_live(part)
+            new_index = self.policy.build(target, self.dim, train_vectors=vectors)
+            new_index.add_with_ids(vectors, ids)
+        except Exception as e:
+            print(f"[RAG] Rebuild of partition {key} as {target} failed: {e}")
+            with self._lock:
+                self._merges.pop(key, None)
+            return
+
+        with self._lock:
+            self._merges.pop(key, None)
+            current = self.partitions.get(key)
+            swapped = current is not None
+            if swapped:
+                # While merging, writes only added to the delta and tombstones: carry over what came after ``part``
+                delta = None
+                if current.delta is not None:
+                    delta_vectors, delta_ids = export_vectors(current.delta)
+                    if part.delta is not None:
+                        new = ~np.isin(delta_ids, faiss.vector_to_array(part.delta.id_map))
+                        delta_vectors, delta_ids = delta_vectors[new], delta_ids[new]
+                    delta = _new_delta(self.dim, delta_vectors, delta_ids)
+                replacement = _Partition(new_index, delta, current.tombstones - part.tombstones)
+                self._publish(key, replacement)
+                if target != part.kind:
+                    print(f"[RAG] Partition {key} migrated from {part.kind} to {target} ({replacement.live} vectors)")
+                elif self.policy.needs_requantize(part.index, part.live):
+                    print(f"[RAG] Partition {key} requantized from float16 to int8 ({replacement.live} vectors)")
+                if part.dead:
+                    self._report_compaction(key, part, new_index, time.perf_counter() - started)
+                self._maybe_merge(key)
+
+        if swapped and self.on_migrated is not None:
+            self.on_migrated(part.dead > 0)
+
+    def _report_compaction(self, key, part, new_index, seconds):
+        reclaimed_bytes = part.index.ntotal * vector_bytes(part.index) - new_index.ntotal * vector_bytes(new_index)
+        if part.delta is not None:
+            reclaimed_bytes += part.delta.ntotal * vector_bytes(part.delta)
+        report = {
+            "partition": key,
+            "vectors_before": part.size,
+            "vectors_after": new_index.ntotal,
+            "reclaimed_vectors": part.dead,
+            "reclaimed_bytes": max(0, reclaimed_bytes),
+            "seconds": round(seconds, 4),
+        }
+        self.compactions.append(report)
+        totals = self._compaction_totals
+        totals["compactions"] += 1
+        totals["reclaimed_vectors"] += report["reclaimed_vectors"]
+        totals["reclaimed_bytes"] += report["reclaimed_bytes"]
+        totals["seconds"] += seconds
+        print(f"[RAG] Compacted partition {key}: reclaimed {part.dead} dead vectors "
+              f"(~{report['reclaimed_bytes'] / 2 ** 20:.1f} MB), {part.size} -> {new_index.ntotal} in {seconds:.2f}s")
+
+    def compaction_stats(self):
+        """Totals over all compactions so far, the last report and the dead vectors per partition"""
+        with self._lock:
+            stats = dict(self._compaction_totals)
+            stats["seconds"] = round(stats["seconds"], 4)
+            stats["last"] = self.compactions[-1] if self.compactions else None
+        stats["dead_vectors"] = {key: part.dead for key, part in self.partitions.items() if part.dead}
+        return stats
+
+    def wait_for_migrations(self, timeout=None):
+        """Block until background rebuilds and their ``on_migrated`` callbacks finish (benchmarks, shutdown)"""
+        while True:
+            with self._lock:
+                self._merge_threads = [thread for thread in self._merge_threads if thread.is_alive()]
+                threads = list(self._merge_threads)
+            if not threads:
+                return
+            for thread in threads:
+                thread.join(timeout)
+            if timeout is not None:
+                return
+
+    def _path(self, directory, key):
+        return os.path.join(directory, self.PARTITIONS_DIR, f"{self._file_key(key)}.faiss")
+
+    def save(self, directory):
+        """Write the partitions changed since the last save; empty partitions are deleted"""
+        os.makedirs(os.path.join(directory, self.PARTITIONS_DIR), exist_ok=True)
+        with self._lock:
+            for key in self._dirty:
+                path = self._path(directory, key)
+                delta_path = path[:-len(".faiss")] + ".delta.faiss"
+                tombstones_path = path[:-len(".faiss")] + ".tombstones.npy"
+                part = self.partitions.get(key)
+                if part is None:
+                    for stale in (path, delta_path, tombstones_path):
+                        if os.path.exists(stale):
+                            os.remove(stale)
+                    continue
+
+                faiss.write_index(part.index, path + ".tmp")
+                os.replace(path + ".tmp", path)
+                if part.delta is not None:
+                    faiss.write_index(part.delta, delta_path + ".tmp")
+                    os.replace(delta_path + ".tmp", delta_path)
+                elif os.path.exists(delta_path):
+                    os.remove(delta_path)
+                if part.tombstones:
+                    with open(tombstones_path + ".tmp", "wb") as f:
+                        np.save(f, np.fromiter(part.tombstones, dtype=np.int64))
+                    os.replace(tombstones_path + ".tmp", tombstones_path)
+                elif os.path.exists(tombstones_path):
+                    os.remove(tombstones_path)
+            self._dirty.clear()
+
+    @classmethod
+    def exists(cls, directory):
+        return os.path.isdir(os.path.join(directory, cls.PARTITIONS_DIR))
+
+    @classmethod
+    def load(cls, directory, dim, with_global=False, policy=None):
+        """
+        Load every partition. Base indexes are memory-mapped read-only (IO_FLAG_MMAP_IFC), so
+        the codes of every index type stay in the shared page cache instead of each worker's
+        private memory.
+        """
+        partitioned = cls(dim, with_global=False, policy=policy)
+        partitions_dir = os.path.join(directory, cls.PARTITIONS_DIR)
+        partitions = {}
+        for filename in os.listdir(partitions_dir):
+            if not filename.endswith(".faiss") or filename.endswith(".delta.faiss"):
+                continue
+            stem = filename[:-len(".faiss")]
+            index = faiss.read_index(os.path.join(partitions_dir, filename),
+                                     faiss.IO_FLAG_MMAP_IFC | faiss.IO_FLAG_READ_ONLY)
+            partitioned.policy.tune(index)
+            delta_path = os.path.join(partitions_dir, stem + ".delta.faiss")
+            delta = faiss.read_index(delta_path) if os.path.exists(delta_path) else None
+            tombstones_path = os.path.join(partitions_dir, stem + ".tombstones.npy")
+            tombstones = np.load(tombstones_path).tolist() if os.path.exists(tombstones_path) else ()
+            partitions[cls._parse_file_key(stem)] = _Partition(index, delta, tombstones, mapped=True)
+        partitioned.partitions = partitions
+
+        global_part = partitions.get(GLOBAL)
+        if with_global:
+            partitioned.with_global = True
+            if global_part is None or global_part.live != partitioned.ntotal:
+                # Global partition was just enabled (or is stale): rebuild it from the owners
+                index = partitioned.policy.build(INDEX_FLAT, dim)
+                for key, part in partitions.items():
+                    if key != GLOBAL:
+                        index.add_with_ids(*partitioned._export_live(part))
+                partitioned._publish(GLOBAL, _Partition(index))
+        elif global_part is not None:
+            partitioned._publish(GLOBAL, None)  # disabled: drop the stale file on next save
+
+        for key in list(partitioned.partitions):
+            partitioned._maybe_merge(key)
+        return partitioned
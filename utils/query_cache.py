@@ -0,0 +1,141 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+import xxhash
+
+_TRAILING_PUNCTUATION = re.compile(r"[\s?!.]+$")
+
+
+def normalize_question(question):
+    """Collapse case, whitespace and trailing punctuation, so "Who knows SQL?" == "who knows sql" """
+    return _TRAILING_PUNCTUATION.sub("", " ".join(question.split()).lower())
+
+
+def question_hash(question):
+    return xxhash.xxh3_64_intdigest(normalize_question(question).encode("utf-8"))
+
+
+class _TTLCache:
+    """Bounded LRU whose entries expire ``ttl`` seconds after they were stored; callers hold the lock"""
+
+    def __init__(self, ttl, max_items, on_drop=None):
+        self.ttl = ttl
+        self.max_items = max_items
+        self.on_drop = on_drop  # called with the key of every expired or evicted entry
+        self.items = OrderedDict()  # key -> (expires_at, value)
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+
+    def get(self, key, now):
+        entry = self.items.get(key)
+        if entry is not None and entry[0] <= now:
+            del self.items[key]
+            self.expired += 1
+            if self.on_drop is not None:
+                self.on_drop(key)
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self.items.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key, value, now):
+        self.items[key] = (now + self.ttl, value)
+        self.items.move_to_end(key)
+        while len(self.items) > self.max_items:
+            evicted, _ = self.items.popitem(last=False)
+            if self.on_drop is not None:
+                self.on_drop(evicted)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "expired": self.expired,
+            "items": len(self.items),
+            "ttl_seconds": self.ttl,
+        }
+
+
+class QueryCache:
+    """
+    Two-level cache in front of ``RAGService.query``.
+
+    Query embeddings are keyed by (model, normalized question), so repeats skip the
+    encoder. Answers are keyed by (normalized question hash, retrieved doc ids, index
+    version and generation): a repeat still runs the (cheap) retrieval, and reuses the LLM
+    answer only when it found the same documents in the same index state. Changing or deleting a
+    document drops every answer built from it.
+    """
+
+    def __init__(self, embedding_ttl=3600, answer_ttl=600, max_embeddings=10000, max_answers=2000):
+        self._lock = threading.Lock()
+        self._embeddings = _TTLCache(embedding_ttl, max_embeddings)
+        self._answers = _TTLCache(answer_ttl, max_answers, on_drop=self._unindex_answer)
+        self._answers_by_doc = {}  # doc id -> answer keys built from it
+        self._generation = 0  # bumped by every invalidation
+        self._changed_at = {}  # doc id -> generation of its last invalidation
+        self.invalidated_answers = 0
+
+    def _unindex_answer(self, key):
+        for doc_id in key[1]:
+            keys = self._answers_by_doc.get(doc_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._answers_by_doc[doc_id]
+
+    def get_embedding(self, model_name, question):
+        with self._lock:
+            return self._embeddings.get((model_name, normalize_question(question)), time.monotonic())
+
+    def put_embedding(self, model_name, question, vector):
+        with self._lock:
+            self._embeddings.put((model_name, normalize_question(question)), vector, time.monotonic())
+
+    @staticmethod
+    def answer_key(question, doc_ids, version):
+        return question_hash(question), tuple(doc_ids), version
+
+    def get_answer(self, question, doc_ids, version):
+        """
+        Return ``(answer or None, token)``. Pass the token back to ``put_answer``, which
+        skips storing when one of the documents changed in between.
+        """
+        with self._lock:
+            answer = self._answers.get(self.answer_key(question, doc_ids, version), time.monotonic())
+            return answer, self._generation
+
+    def put_answer(self, question, doc_ids, version, answer, token):
+        key = self.answer_key(question, doc_ids, version)
+        with self._lock:
+            if any(self._changed_at.get(doc_id, -1) > token for doc_id in doc_ids):
+                return False
+            self._answers.put(key, answer, time.monotonic())
+            for doc_id in doc_ids:
+                self._answers_by_doc.setdefault(doc_id, set()).add(key)
+            return True
+
+    def invalidate_documents(self, doc_ids):
+        """Forget every cached answer built from any of ``doc_ids``"""
+        with self._lock:
+            self._generation += 1
+            for doc_id in doc_ids:
+                self._changed_at[doc_id] = self._generation
+                for key in list(self._answers_by_doc.get(doc_id, ())):
+                    del self._answers.items[key]
+                    self._unindex_answer(key)
+                    self.invalidated_answers += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "embeddings": self._embeddings.stats(),
+                "answers": {**self._answers.stats(), "invalidated": self.invalidated_answers},
+            }
@@ -0,0 +1,151 @@
+import heapq
+import itertools
+import os
+import sqlite3
+import threading
+import time
+
+INTERACTIVE = 0  # a user is waiting on the response
+BACKGROUND = 1  # batch work that can yield to interactive requests
+
+
+class _LocalBuckets:
+    """Token buckets held in this process"""
+
+    def __init__(self, capacities):
+        now = time.monotonic()
+        self.capacities = capacities
+        self.levels = dict(capacities)  # buckets start full
+        self.updated = {name: now for name in capacities}
+
+    def take(self, amounts):
+        """Take every amount if all buckets hold enough; otherwise return the seconds until they would"""
+        now = time.monotonic()
+        wait = 0.0
+        for name, amount in amounts.items():
+            capacity = self.capacities[name]
+            level = min(capacity, self.levels[name] + (now - self.updated[name]) * capacity / 60.0)
+            self.levels[name], self.updated[name] = level, now
+            # A request larger than the whole bucket waits for a full bucket instead of forever
+            needed = min(amount, capacity)
+            if level < needed:
+                wait = max(wait, (needed - level) * 60.0 / capacity)
+        if wait:
+            return wait
+        for name, amount in amounts.items():
+            self.levels[name] -= amount
+        return 0.0
+
+    def adjust(self, name, amount):
+        self.levels[name] -= amount
+
+
+class _SharedBuckets:
+    """Token buckets in a SQLite file, shared by every process that opens it"""
+
+    def __init__(self, path, capacities):
+        self.path = path
+        self.capacities = capacities
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._conn()
+        conn.execute("CREATE TABLE IF NOT EXISTS buckets (name TEXT PRIMARY KEY, level REAL NOT NULL, updated REAL NOT NULL)")
+        now = time.time()
+        conn.executemany("INSERT OR IGNORE INTO buckets (name, level, updated) VALUES (?, ?, ?)",
+                         [(name, capacity, now) for name, capacity in capacities.items()])
+        conn.commit()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def take(self, amounts):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")  # one process at a time reads, refills and takes
+        try:
+            now = time.time()
+            levels = {}
+            wait = 0.0
+            for name, amount in amounts.items():
+                capacity = self.capacities[name]
+                level, updated = conn.execute("SELECT level, updated FROM buckets WHERE name = ?", (name,)).fetchone()
+                level = min(capacity, level + max(0.0, now - updated) * capacity / 60.0)
+                levels[name] = level
+                needed = min(amount, capacity)
+                if level < needed:
+                    wait = max(wait, (needed - level) * 60.0 / capacity)
+            for name, level in levels.items():
+                conn.execute("UPDATE buckets SET level = ?, updated = ? WHERE name = ?",
+                             (level if wait else level - amounts[name], now, name))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return wait
+
+    def adjust(self, name, amount):
+        self._conn().execute("UPDATE buckets SET level = level - ? WHERE name = ?", (amount, name))
+
+
+class RateLimiter:
+    """
+    Token-bucket limiter for requests per minute and LLM tokens per minute.
+
+    ``acquire`` blocks until both buckets hold enough, taking one request and the
+    estimated tokens. Waiters are served strictly by (priority, arrival), so an
+    INTERACTIVE call never queues behind BACKGROUND work in this process. Once the
+    real token usage is known, ``settle`` charges or refunds the difference. With
+    ``shared_path`` the buckets live in a SQLite file, so all worker processes share
+    one budget; priorities then apply within each process.
+    """
+
+    def __init__(self, requests_per_minute, tokens_per_minute, shared_path=None):
+        capacities = {"requests": float(requests_per_minute), "tokens": float(tokens_per_minute)}
+        self._buckets = _SharedBuckets(shared_path, capacities) if shared_path else _LocalBuckets(capacities)
+        self._cond = threading.Condition()
+        self._waiting = []  # heap of (priority, sequence) tickets
+        self._sequence = itertools.count()
+        self.acquired = 0
+        self.waited_seconds = 0.0
+
+    def acquire(self, tokens, priority=INTERACTIVE):
+        """Block until one request and ``tokens`` tokens are available, then take them"""
+        started = time.monotonic()
+        ticket = (priority, next(self._sequence))
+        with self._cond:
+            heapq.heappush(self._waiting, ticket)
+            try:
+                while True:
+                    timeout = None
+                    if self._waiting[0] == ticket:
+                        timeout = self._buckets.take({"requests": 1, "tokens": tokens})
+                        if not timeout:
+                            heapq.heappop(self._waiting)
+                            break
+                    self._cond.wait(timeout)
+            except BaseException:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+                raise
+            finally:
+                self._cond.notify_all()
+            self.acquired += 1
+            self.waited_seconds += time.monotonic() - started
+
+    def settle(self, estimated_tokens, actual_tokens):
+        """Charge (or refund) the difference between the estimated and the actual token usage"""
+        with self._cond:
+            self._buckets.adjust("tokens", actual_tokens - estimated_tokens)
+            self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            return {
+                "acquired": self.acquired,
+                "waiting": len(self._waiting),
+                "waited_seconds": round(self.waited_seconds, 3),
+            }
@@ -0,0 +1,95 @@
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+
+class SkillMatch:
+    """A CV skill paired with the job skill it satisfies"""
+
+    __slots__ = ("cv_skill", "job_skill", "score", "source")
+
+    def __init__(self, cv_skill, job_skill, score, source="embedding"):
+        self.cv_skill = cv_skill
+        self.job_skill = job_skill
+        self.score = score
+        self.source = source  # "embedding" or "llm" (confirmed by the tie-breaker)
+
+    def to_dict(self):
+        return {"cv_skill": self.cv_skill, "job_skill": self.job_skill, "score": round(self.score, 4),
+                "source": self.source}
+
+
+class SkillMatcher:
+    """
+    Pairs CV skills with job skills that mean the same thing ("k8s" / "kubernetes").
+
+    Both skill lists are embedded in one call through ``embed``, which should go through
+    the shared embedding cache. The cosine similarity matrix is then built in NumPy. A
+    one-to-one assignment maximizes total similarity: Hungarian (``linear_sum_assignment``)
+    or greedy highest-first. Assigned pairs at or above ``threshold`` are matches. Pairs
+    falling within ``tie_break_band`` below the threshold are "borderline". Both come from
+    Config (SKILL_MATCH_THRESHOLD, SKILL_MATCH_TIE_BREAK_BAND); benchmarks/skill_matching.py
+    sweeps the threshold against labelled pairs. When a
+    ``tie_breaker`` is given, those pairs are passed to it, and it returns the ones it
+    confirms.
+    """
+
+    def __init__(self, embed, threshold, tie_break_band, assignment="hungarian", tie_breaker=None):
+        if assignment not in ("hungarian", "greedy"):
+            raise ValueError(f"Unknown assignment: {assignment}")
+        self.embed = embed
+        self.threshold = threshold
+        self.assignment = assignment
+        self.tie_break_band = tie_break_band
+        self.tie_breaker = tie_breaker  # callable([(cv_skill, job_skill), ...]) -> confirmed pairs
+
+    def similarity(self, cv_skills, job_skills):
+        """Cosine similarity matrix, one row per CV skill and one column per job skill"""
+        vectors = np.asarray(self.embed(list(cv_skills) + list(job_skills)), dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms == 0, 1.0, norms)
+        return vectors[:len(cv_skills)] @ vectors[len(cv_skills):].T
+
+    def _assign(self, similarity):
+        """Row/column index arrays of a one-to-one assignment maximizing similarity"""
+        if self.assignment == "hungarian":
+            return linear_sum_assignment(similarity, maximize=True)
+        order = np.argsort(similarity, axis=None)[::-1]
+        rows, cols = np.unravel_index(order, similarity.shape)
+        used_rows, used_cols = set(), set()
+        chosen_rows, chosen_cols = [], []
+        for row, col in zip(rows.tolist(), cols.tolist()):
+            if row in used_rows or col in used_cols:
+                continue
+            used_rows.add(row)
+            used_cols.add(col)
+            chosen_rows.append(row)
+            chosen_cols.append(col)
+            if len(chosen_rows) == min(similarity.shape):
+                break
+        return np.array(chosen_rows, dtype=np.intp), np.array(chosen_cols, dtype=np.intp)
+
+    def match(self, cv_skills, job_skills):
+        """Return ``(matches, borderline)``: SkillMatch lists, best matches first"""
+        if not cv_skills or not job_skills:
+            return [], []
+        similarity = self.similarity(cv_skills, job_skills)
+        rows, cols = self._assign(similarity)
+
+        matches, borderline = [], []
+        for row, col in zip(rows.tolist(), cols.tolist()):
+            pair = SkillMatch(cv_skills[row], job_skills[col], float(similarity[row, col]))
+            if pair.score >= self.threshold:
+                matches.append(pair)
+            elif pair.score >= self.threshold - self.tie_break_band:
+                borderline.append(pair)
+
+        if borderline and self.tie_breaker is not None:
+            confirmed = set(self.tie_breaker([(pair.cv_skill, pair.job_skill) for pair in borderline]))
+            for pair in borderline:
+                if (pair.cv_skill, pair.job_skill) in confirmed:
+                    pair.source = "llm"
+                    matches.append(pair)
+            borderline = [pair for pair in borderline if pair.source != "llm"]
+
+        matches.sort(key=lambda pair: -pair.score)
+        return matches, borderline
@@ -0,0 +1,192 @@
+import re
+from bisect import bisect_right
+from collections import deque
+from functools import lru_cache
+
+# Words keep inner dots and trailing +/# ("node.js", "asp.net", ".net", "c++", "c#");
+# hyphens and slashes separate words, so "hard-working" matches "hard working".
+_TOKEN_PATTERN = re.compile(r"\.?\w[\w+#]*(?:\.\w[\w+#]*)*")
+
+# Heading line (normalized) -> canonical section name
+SECTION_HEADINGS = {
+    "personal information": "Personal Information",
+    "contact": "Personal Information",
+    "contact information": "Personal Information",
+    "summary": "Summary",
+    "profile": "Summary",
+    "professional summary": "Summary",
+    "work experience": "Work Experience",
+    "experience": "Work Experience",
+    "professional experience": "Work Experience",
+    "employment history": "Work Experience",
+    "education": "Education",
+    "skills": "Skills",
+    "technical skills": "Skills",
+    "certifications": "Certifications",
+    "projects": "Projects",
+}
+PREAMBLE = "Other"  # text before the first recognised heading
+
+# A line holding only a heading (optionally followed by a colon), found in one C-level pass
+_HEADING_PATTERN = re.compile(
+    r"^[^\S\n]*(" + "|".join(sorted((r"[\s\-/]+".join(map(re.escape, heading.split())) for heading in SECTION_HEADINGS),
+                                    key=len, reverse=True)) + r")[^\S\n]*:?[^\S\n]*$",
+    re.MULTILINE | re.IGNORECASE
+)
+
+
+def tokenize(text):
+    """Lower-cased words of ``text`` with their (start, end) character offsets"""
+    return [(match.group().lower(), match.start(), match.end()) for match in _TOKEN_PATTERN.finditer(text)]
+
+
+def _phrase_tokens(phrase):
+    return tuple(_TOKEN_PATTERN.findall(phrase.lower()))
+
+
+class TextDocument:
+    """
+    A text tokenized and split into sections once, shared by every keyword scan.
+
+    The words come from one ``findall`` over the lower-cased text. Their character
+    offsets are only worked out when a scan reports positions.
+    """
+
+    __slots__ = ("text", "tokens", "_starts", "_section_starts", "_section_names")
+
+    def __init__(self, text):
+        self.text = text
+        lowered = text.lower()
+        if len(lowered) != len(text):  # a few characters change length when lower-cased
+            words = tokenize(text)
+            self.tokens = [token for token, _, _ in words]
+            self._starts = [start for _, start, _ in words]
+        else:
+            self.tokens = _TOKEN_PATTERN.findall(lowered)
+            self._starts = None
+        self._section_starts = []
+        self._section_names = []
+        for match in _HEADING_PATTERN.finditer(text):
+            self._section_starts.append(match.start(1))
+            self._section_names.append(SECTION_HEADINGS[" ".join(_phrase_tokens(match.group(1)))])
+
+    @property
+    def starts(self):
+        """Character offset of every word"""
+        if self._starts is None:
+            self._starts = [match.start() for match in _TOKEN_PATTERN.finditer(self.text)]
+        return self._starts
+
+    def span(self, first, last):
+        """Character offsets covering words ``first`` to ``last``"""
+        starts = self.starts
+        return starts[first], starts[last] + len(self.tokens[last])
+
+    @property
+    def sections(self):
+        """Canonical names of the headings found, in document order"""
+        return list(dict.fromkeys(self._section_names))
+
+    def section_at(self, offset):
+        """Section containing the character at ``offset``"""
+        index = bisect_right(self._section_starts, offset)
+        return self._section_names[index - 1] if index else PREAMBLE
+
+
+@lru_cache(maxsize=64)
+def document(text):
+    """The TextDocument of ``text``, reused while the same CV or job description is analyzed"""
+    return TextDocument(text)
+
+
+class KeywordHits:
+    """Occurrences of one phrase in a document"""
+
+    __slots__ = ("count", "positions", "sections")
+
+    def __init__(self):
+        self.count = 0
+        self.positions = []  # (start, end) character offsets
+        self.sections = {}  # section name -> occurrences in it
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton over words, matching many phrases in one pass over a document.
+
+    Phrases and documents go through the same tokenizer, and transitions are whole
+    words. A match therefore always starts and ends on word boundaries: "java" does not
+    match inside "javascript". Overlapping phrases are all reported, for example
+    "machine learning" and "learning".
+    """
+
+    def __init__(self, phrases):
+        self.phrases = list(dict.fromkeys(phrases))
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]  # state -> indexes of the phrases ending there
+        self._lengths = []  # phrase index -> words in the phrase
+        for index, phrase in enumerate(self.phrases):
+            words = _phrase_tokens(phrase)
+            self._lengths.append(len(words))
+            if not words:
+                continue
+            state = 0
+            for word in words:
+                following = self._goto[state].get(word)
+                if following is None:
+                    following = len(self._goto)
+                    self._goto[state][word] = following
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                state = following
+            self._output[state].append(index)
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for word, following in self._goto[state].items():
+                queue.append(following)
+                fallback = self._fail[state]
+                while fallback and word not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[following] = self._goto[fallback].get(word, 0)
+                self._output[following] = self._output[following] + self._output[self._fail[following]]
+
+    def find(self, doc):
+        """Yield ``(phrase index, first word, last word)`` for every occurrence in ``doc``"""
+        goto, fail, output, lengths = self._goto, self._fail, self._output, self._lengths
+        state = 0
+        for position, word in enumerate(doc.tokens):
+            while state and word not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(word, 0)
+            for index in output[state]:
+                yield index, position - lengths[index] + 1, position
+
+    def scan(self, doc):
+        """Counts, character positions and section membership of every phrase in ``doc``"""
+        hits = {phrase: KeywordHits() for phrase in self.phrases}
+        for index, first, last in self.find(doc):
+            entry = hits[self.phrases[index]]
+            start, end = doc.span(first, last)
+            entry.count += 1
+            entry.positions.append((start, end))
+            section = doc.section_at(start)
+            entry.sections[section] = entry.sections.get(section, 0) + 1
+        return hits
+
+    def present(self, doc):
+        """The set of phrases occurring at least once in ``doc``"""
+        return {self.phrases[index] for index, _, _ in self.find(doc)}
+
+
+@lru_cache(maxsize=256)
+def _automaton(phrases):
+    return KeywordAutomaton(phrases)
+
+
+def keyword_automaton(phrases):
+    """The automaton for a phrase set, built once and cached while the set is in use"""
+    return _automaton(tuple(sorted(set(phrases))))
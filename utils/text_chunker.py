@@ -0,0 +1,82 @@
+COMMON_SECTIONS = ("SUMMARY", "EXPERIENCE", "EDUCATION", "SKILLS", "PROJECTS", "CERTIFICATIONS")
+
+
+def _is_caps_header(line):
+    """Short all-caps line, the same rule CVService uses to find section headers"""
+    line = line.strip()
+    return (line.upper() == line and len(line) > 3 and len(line.split()) <= 4
+            and any(c.isalpha() for c in line) and not line.startswith(('-', '=')))
+
+
+def _common_section(line):
+    """Name of a common section mentioned on a short line, or None"""
+    if len(line.strip()) >= 30:
+        return None
+    upper = line.upper()
+    return next((section for section in COMMON_SECTIONS if section in upper), None)
+
+
+def split_sections(text):
+    """
+    Split a CV into ``(section name, body)`` pairs.
+
+    Headers are short all-caps lines; when there are none, short lines naming a common
+    section (Summary, Experience, ...) are used instead. Text before the first header
+    (name, contact details) is kept under an empty name.
+    """
+    lines = text.split('\n')
+    markers = [(i, line.strip()) for i, line in enumerate(lines) if _is_caps_header(line)]
+    if not markers:
+        markers = [(i, name) for i, name in ((i, _common_section(line)) for i, line in enumerate(lines)) if name]
+
+    sections = []
+    starts = [i for i, _ in markers] + [len(lines)]
+    preamble = '\n'.join(lines[:starts[0]]).strip()
+    if preamble:
+        sections.append(("", preamble))
+    for (start, name), end in zip(markers, starts[1:]):
+        body = '\n'.join(lines[start + 1:end]).strip()
+        if body:
+            sections.append((name, body))
+    return sections
+
+
+def _windows(words, max_words, overlap_words):
+    step = max(1, max_words - overlap_words)
+    for start in range(0, max(1, len(words) - overlap_words), step):
+        yield words[start:start + max_words]
+
+
+def chunk_text(text, max_words=160, overlap_words=32):
+    """
+    Split a document into section-sized passages for embedding.
+
+    Each passage stays under ``max_words`` so the embedding model (all-MiniLM-L6-v2
+    reads at most 256 word pieces) sees all of it. Lines of a section are packed
+    together; a section that is still too long is cut into overlapping windows. Every
+    passage starts with its section name so the section is part of the embedding.
+    Short documents come back as a single passage.
+    """
+    if len(text.split()) <= max_words:
+        return [text.strip()] if text.strip() else []
+
+    passages = []
+    for name, body in split_sections(text):
+        budget = max_words - len(name.split())
+        chunks, current, size = [], [], 0
+        for line in body.split('\n'):
+            words = line.split()
+            if not words:
+                continue
+            if current and size + len(words) > budget:
+                chunks.append('\n'.join(current))
+                current, size = [], 0
+            if len(words) > budget:
+                chunks.extend(' '.join(window) for window in _windows(words, budget, overlap_words))
+            else:
+                current.append(line.strip())
+                size += len(words)
+        if current:
+            chunks.append('\n'.join(current))
+        passages.extend(f"{name}\n{chunk}" if name else chunk for chunk in chunks)
+    return passages
@@ -1,12 +1,24 @@
-from langgraph.graph import StateGraph, END
-from typing import TypedDict, List, Dict, Any, Optional
+from langgraph.graph import StateGraph, START, END
+from typing import Annotated, TypedDict, List, Dict, Any, Optional
 import re
 import json
+import operator
+from config.config import Config
 from services.llm_service import LLMService
+from services.job_service import JobService
+from services.rag_service import RAGService
+from utils.skill_matcher import SkillMatcher
+from utils.text_analysis import document, keyword_automaton
+
+def merge_dicts(current: Dict[str, Any], update: Dict[str, Any]) -> Dict[str, Any]:
+    """State reducer: parallel branches each contribute their own keys"""
+    return {**(current or {}), **(update or {})}
 
 class MatchingState(TypedDict):
     cv_text: str
     job_desc: str
+    pre_parsed_technical_skills: List[str]  # stored split of a saved CV; skips the CV skills prompt
+    pre_parsed_soft_skills: List[str]
     industry: Optional[str]
     domain_keywords: List[str]
     cv_technical_skills: List[str]
@@ -18,8 +30,11 @@ class MatchingState(TypedDict):
     job_education_reqs: List[str]
     job_industry_knowledge: List[str]
     job_skills: List[str]
+    job_analysis_cached: bool
+    job_analysis_failed: Annotated[bool, operator.or_]  # set by either job-description node on a parse error
     direct_matches: List[str]
     semantic_matches: List[str]
+    semantic_match_pairs: List[Dict[str, Any]]  # {"cv_skill", "job_skill", "score", "source"}
     matches: List[str]
     match_percentage: float
     tech_match_percentage: float
@@ -27,10 +42,25 @@ class MatchingState(TypedDict):
     weighted_match_percentage: float
     optimized_cv: str
     cover_letter: str
-    analysis_results: Dict[str, Any]
+    analysis_results: Annotated[Dict[str, Any], merge_dicts]
+
+# Every node returns only the keys it produces, so nodes on parallel branches never
+# write the same key (analysis_results is merged by its reducer).
+
+# Bump when the identify_industry or extract_job_requirements prompts change, so
+# cached job-description analyses from the old prompts are no longer used.
+JOB_ANALYSIS_SCHEMA_VERSION = 1
+JOB_ANALYSIS_FIELDS = ("industry", "domain_keywords", "job_technical_skills", "job_soft_skills",
+                       "job_experience_reqs", "job_education_reqs", "job_industry_knowledge", "job_skills")
 
 def identify_industry(state: MatchingState) -> MatchingState:
     job_desc = state["job_desc"]
+    # A stored analysis of the same posting also supplies the requirements, so
+    # extract_job_requirements skips its LLM call too
+    analysis = JobService.cached_job_analysis(job_desc)
+    if analysis is not None:
+        print("[JD Cache] Using cached job description analysis")
+        return {**analysis, "job_analysis_cached": True}
     prompt = f"""
     Analyze the following job description and identify the industry/sector it belongs to.
     Also identify any specialized domain knowledge that might be required.
@@ -41,29 +71,22 @@ def identify_industry(state: MatchingState) -> MatchingState:
     - "industry": The primary industry (e.g., "Technology", "Healthcare")
     - "domain_keywords": List of 5-10 specialized domain-specific keywords
     """
-    response = LLMService.invoke(prompt)
+    response = LLMService.invoke(prompt, validate=LLMService.json_response)
     try:
         result = json.loads(response.content)
-        state["industry"] = result.get("industry", "General")
-        state["domain_keywords"] = result.get("domain_keywords", [])
+        return {"industry": result.get("industry", "General"), "domain_keywords": result.get("domain_keywords", [])}
     except Exception as e:
         print(f"Error parsing industry: {e}")
-        state["industry"] = "General"
-        state["domain_keywords"] = []
-    return state
+        return {"industry": "General", "domain_keywords": [], "job_analysis_failed": True}
 
 def extract_cv_skills(state: MatchingState) -> MatchingState:
-    # Check if pre-parsed skills exist in the state
-    if "pre_parsed_skills" in state and state["pre_parsed_skills"]:
+    # Saved CVs carry the technical/soft split extracted at upload
+    if "pre_parsed_technical_skills" in state:
         print("Using pre-parsed CV skills")
-        # Try to categorize pre-parsed skills into technical vs soft skills
-        pre_parsed_skills = state["pre_parsed_skills"]
-        
-        # Default to putting all skills in technical_skills if we can't categorize
-        state["cv_technical_skills"] = pre_parsed_skills
-        state["cv_soft_skills"] = []
-        state["cv_skills"] = pre_parsed_skills
-        return state
+        technical_skills = state["pre_parsed_technical_skills"]
+        soft_skills = state.get("pre_parsed_soft_skills", [])
+        return {"cv_technical_skills": technical_skills, "cv_soft_skills": soft_skills,
+                "cv_skills": technical_skills + soft_skills}
     
     # If no pre-parsed skills, extract them using LLM
     cv_text = state["cv_text"]
@@ -80,22 +103,20 @@ def extract_cv_skills(state: MatchingState) -> MatchingState:
         "soft_skills": ["skill1", "skill2"]
     }}
     """
-    response = LLMService.invoke(prompt)
+    response = LLMService.invoke(prompt, validate=LLMService.json_response)
     try:
         skills_dict = json.loads(response.content)
         technical_skills = [skill.strip().lower() for skill in skills_dict.get("technical_skills", [])]
         soft_skills = [skill.strip().lower() for skill in skills_dict.get("soft_skills", [])]
-        state["cv_technical_skills"] = technical_skills
-        state["cv_soft_skills"] = soft_skills
-        state["cv_skills"] = technical_skills + soft_skills
+        return {"cv_technical_skills": technical_skills, "cv_soft_skills": soft_skills,
+                "cv_skills": technical_skills + soft_skills}
     except Exception as e:
         print(f"Error parsing CV skills: {e}")
-        state["cv_skills"] = []
-        state["cv_technical_skills"] = []
-        state["cv_soft_skills"] = []
-    return state
+        return {"cv_skills": [], "cv_technical_skills": [], "cv_soft_skills": []}
 
 def extract_job_requirements(state: MatchingState) -> MatchingState:
+    if state.get("job_analysis_cached"):
+        return {}
     job_desc = state["job_desc"]
     industry = state.get("industry", "General")
     prompt = f"""
@@ -112,7 +133,7 @@ def extract_job_requirements(state: MatchingState) -> MatchingState:
         "industry_knowledge": ["req1", "req2"]
     }}
     """
-    response = LLMService.invoke(prompt)
+    response = LLMService.invoke(prompt, validate=LLMService.json_response)
     try:
         req_dict = json.loads(response.content)
         technical_skills = [skill.strip().lower() for skill in req_dict.get("technical_skills", [])]
@@ -120,21 +141,66 @@ def extract_job_requirements(state: MatchingState) -> MatchingState:
         experience_reqs = [req.strip().lower() for req in req_dict.get("experience", [])]
         education_reqs = [req.strip().lower() for req in req_dict.get("education", [])]
         industry_knowledge = [req.strip().lower() for req in req_dict.get("industry_knowledge", [])]
-        state["job_technical_skills"] = technical_skills
-        state["job_soft_skills"] = soft_skills
-        state["job_experience_reqs"] = experience_reqs
-        state["job_education_reqs"] = education_reqs
-        state["job_industry_knowledge"] = industry_knowledge
-        state["job_skills"] = technical_skills + soft_skills + industry_knowledge
+        requirements = {
+            "job_technical_skills": technical_skills,
+            "job_soft_skills": soft_skills,
+            "job_experience_reqs": experience_reqs,
+            "job_education_reqs": education_reqs,
+            "job_industry_knowledge": industry_knowledge,
+            "job_skills": technical_skills + soft_skills + industry_knowledge,
+        }
+        if not state.get("job_analysis_failed"):
+            analysis = {**state, **requirements}
+            JobService.store_job_analysis(job_desc, {field: analysis[field] for field in JOB_ANALYSIS_FIELDS})
+        return requirements
     except Exception as e:
         print(f"Error parsing job requirements: {e}")
-        state["job_skills"] = []
-        state["job_technical_skills"] = []
-        state["job_soft_skills"] = []
-        state["job_experience_reqs"] = []
-        state["job_education_reqs"] = []
-        state["job_industry_knowledge"] = []
-    return state
+        return {
+            "job_skills": [],
+            "job_technical_skills": [],
+            "job_soft_skills": [],
+            "job_experience_reqs": [],
+            "job_education_reqs": [],
+            "job_industry_knowledge": [],
+            "job_analysis_failed": True,
+        }
+
+def llm_semantic_matches(cv_skills: List[str], job_skills: List[str]) -> List[Dict[str, Any]]:
+    """Semantic matches as judged by the LLM; the fallback when skills cannot be embedded."""
+    prompt = f"""
+    Identify semantic matches between CV skills: {cv_skills} and job skills: {job_skills}.
+    Return as JSON: [{{"cv_skill": "skill", "job_skill": "skill"}}]
+    """
+    response = LLMService.invoke(prompt, validate=LLMService.json_response)
+    try:
+        return [{"cv_skill": match["cv_skill"], "job_skill": match["job_skill"], "score": None, "source": "llm"}
+                for match in json.loads(response.content)]
+    except Exception as e:
+        print(f"Error parsing semantic matches: {e}")
+        return []
+
+def confirm_skill_pairs(pairs):
+    """LLM tie-breaker for borderline embedding matches; returns the (cv_skill, job_skill) pairs it confirms."""
+    prompt = f"""
+    For each pair below, decide whether a candidate with the CV skill meets the job's skill requirement.
+    Pairs (CV skill, job skill): {json.dumps(pairs)}
+    Return only the confirmed pairs as JSON: [{{"cv_skill": "skill", "job_skill": "skill"}}]
+    """
+    response = LLMService.invoke(prompt, validate=LLMService.json_response)
+    try:
+        return {(match["cv_skill"], match["job_skill"]) for match in json.loads(response.content)}
+    except Exception as e:
+        print(f"Error parsing skill tie-breaks: {e}")
+        return set()
+
+# Skills are embedded by the RAG model (in the daemon when one is running), through its embedding cache
+skill_matcher = SkillMatcher(
+    embed=lambda texts: RAGService.get_instance().embed(texts),
+    threshold=Config.SKILL_MATCH_THRESHOLD,
+    assignment=Config.SKILL_MATCH_ASSIGNMENT,
+    tie_break_band=Config.SKILL_MATCH_TIE_BREAK_BAND,
+    tie_breaker=confirm_skill_pairs if Config.SKILL_MATCH_LLM_TIE_BREAK else None
+)
 
 def match_skills(state: MatchingState) -> MatchingState:
     cv_skills = state["cv_skills"]
@@ -143,17 +209,16 @@ def match_skills(state: MatchingState) -> MatchingState:
     remaining_cv_skills = [skill for skill in cv_skills if skill not in direct_matches]
     remaining_job_skills = [skill for skill in job_skills if skill not in direct_matches]
     
-    semantic_matches = []
+    semantic_match_pairs = []
     if remaining_cv_skills and remaining_job_skills:
-        prompt = f"""
-        Identify semantic matches between CV skills: {remaining_cv_skills} and job skills: {remaining_job_skills}.
-        Return as JSON: [{{"cv_skill": "skill", "job_skill": "skill"}}]
-        """
-        response = LLMService.invoke(prompt)
-        try:
-            semantic_matches = [match["cv_skill"] for match in json.loads(response.content)]
-        except Exception as e:
-            print(f"Error parsing semantic matches: {e}")
+        pairs = None
+        if Config.SKILL_MATCH_METHOD == "embedding":
+            try:
+                pairs = [pair.to_dict() for pair in skill_matcher.match(remaining_cv_skills, remaining_job_skills)[0]]
+            except Exception as e:
+                print(f"[Skills] Embedding match failed ({e}); asking the LLM")
+        semantic_match_pairs = pairs if pairs is not None else llm_semantic_matches(remaining_cv_skills, remaining_job_skills)
+    semantic_matches = [pair["cv_skill"] for pair in semantic_match_pairs]
     
     matches = direct_matches + semantic_matches
     match_percentage = (len(matches) / len(job_skills)) * 100 if job_skills else 0
@@ -164,48 +229,56 @@ def match_skills(state: MatchingState) -> MatchingState:
     soft_percentage = (soft_matches / len(state["job_soft_skills"])) * 100 if state["job_soft_skills"] else 0
     weighted_match = (tech_percentage * 0.7) + (soft_percentage * 0.3)
     
-    state["direct_matches"] = direct_matches
-    state["semantic_matches"] = semantic_matches
-    state["matches"] = matches
-    state["match_percentage"] = match_percentage
-    state["tech_match_percentage"] = tech_percentage
-    state["soft_match_percentage"] = soft_percentage
-    state["weighted_match_percentage"] = weighted_match
-    return state
+    return {
+        "direct_matches": direct_matches,
+        "semantic_matches": semantic_matches,
+        "semantic_match_pairs": semantic_match_pairs,
+        "matches": matches,
+        "match_percentage": match_percentage,
+        "tech_match_percentage": tech_percentage,
+        "soft_match_percentage": soft_percentage,
+        "weighted_match_percentage": weighted_match,
+    }
+
+EXPECTED_SECTIONS = ["Personal Information", "Education", "Work Experience", "Skills", "Certifications", "Projects"]
+ATS_REQUIRED_ITEMS = ["email", "phone", "address", "product manager"]
+CLICHES = ["hard-working", "team player", "self-motivated"]
+DATE_PATTERN = re.compile(r"\b\d{2}/\d{4}\b|\b(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+\d{4}\b")
+MEASURABLE_PATTERN = re.compile(r"\b(\d+%|\d+\s*(?:points|users|clients))\b")
+YEARS_PATTERN = re.compile(r"\b(\d+)\s*(?:years?|yrs?)\b")
 
 def keyword_analysis(state: MatchingState) -> MatchingState:
-    cv_text = state["cv_text"]
-    job_desc = state["job_desc"]
     cv_skills = state["cv_skills"]
     job_skills = state["job_skills"]
     present_keywords = [skill for skill in cv_skills if skill in job_skills]
     missing_keywords = [skill for skill in job_skills if skill not in cv_skills]
     
-    # We still do the frequency count for ATS analysis
-    # This operation is relatively inexpensive and gives important ATS information
-    cv_skill_freq = {skill: cv_text.lower().count(skill.lower()) for skill in job_skills}
-    job_skill_freq = {skill: job_desc.lower().count(skill.lower()) for skill in job_skills}
+    # Whole-word occurrences of every job skill, found in one pass over each text
+    automaton = keyword_automaton(job_skills)
+    cv_hits = automaton.scan(document(state["cv_text"]))
+    job_hits = automaton.scan(document(state["job_desc"]))
+    cv_skill_freq = {skill: cv_hits[skill].count for skill in job_skills}
+    job_skill_freq = {skill: job_hits[skill].count for skill in job_skills}
+    cv_skill_sections = {skill: cv_hits[skill].sections for skill in job_skills if cv_hits[skill].count}
     
     return {
         "keyword_analysis": {
             "present_keywords": present_keywords,
             "missing_keywords": missing_keywords,
             "cv_skill_freq": cv_skill_freq,
-            "job_skill_freq": job_skill_freq
+            "job_skill_freq": job_skill_freq,
+            "cv_skill_sections": cv_skill_sections
         }
     }
 
 def section_analysis(state: MatchingState) -> MatchingState:
     cv_text = state["cv_text"]
-    expected_sections = ["Personal Information", "Education", "Work Experience", "Skills", "Certifications", "Projects"]
-    present_sections = [section for section in expected_sections if section.lower() in cv_text.lower()]
-    missing_sections = [section for section in expected_sections if section not in present_sections]
-    ats_issues = []
-    for item in ["email", "phone", "address", "product manager"]:
-        if item not in cv_text.lower():
-            ats_issues.append(f"Missing {item}")
-    date_pattern = r"\b\d{2}/\d{4}\b|\b(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+\d{4}\b"
-    if not re.findall(date_pattern, cv_text):
+    cv = document(cv_text)
+    found = keyword_automaton(EXPECTED_SECTIONS + ATS_REQUIRED_ITEMS).present(cv)
+    present_sections = [section for section in EXPECTED_SECTIONS if section in found]
+    missing_sections = [section for section in EXPECTED_SECTIONS if section not in present_sections]
+    ats_issues = [f"Missing {item}" for item in ATS_REQUIRED_ITEMS if item not in found]
+    if not DATE_PATTERN.search(cv_text):
         ats_issues.append("Incorrect date format (use MM/YYYY or Month YYYY)")
     return {
         "section_analysis": {
@@ -217,14 +290,11 @@ def section_analysis(state: MatchingState) -> MatchingState:
 
 def achievement_analysis(state: MatchingState) -> MatchingState:
     cv_text = state["cv_text"]
-    measurable_pattern = r"\b(\d+%|\d+\s*(?:points|users|clients))\b"
-    achievements = re.findall(measurable_pattern, cv_text)
+    achievements = MEASURABLE_PATTERN.findall(cv_text)
     achievement_score = min(len(achievements) * 20, 100)
-    years_pattern = r"\b(\d+)\s*(?:years?|yrs?)\b"
-    years = re.findall(years_pattern, cv_text)
-    experience_warning = "No specific years of experience mentioned" if not years else None
-    cliches = ["hard-working", "team player", "self-motivated"]
-    tone_issues = [cliche for cliche in cliches if cliche in cv_text.lower()]
+    experience_warning = "No specific years of experience mentioned" if not YEARS_PATTERN.search(cv_text) else None
+    found = keyword_automaton(CLICHES).present(document(cv_text))
+    tone_issues = [cliche for cliche in CLICHES if cliche in found]
     tone_warning = "Avoid clichés like: " + ", ".join(tone_issues) if tone_issues else None
     return {
         "achievement_analysis": {
@@ -236,20 +306,14 @@ def achievement_analysis(state: MatchingState) -> MatchingState:
         }
     }
 
-def analyze_cv_detailed(state: MatchingState) -> MatchingState:
-    """Analyze the CV in detail with enhanced ATS and competitive analysis."""
+def ats_analysis(state: MatchingState) -> MatchingState:
+    """ATS analysis of the CV; runs in parallel with the competitive and rule-based analyses."""
     cv_text = state["cv_text"]
     job_desc = state["job_desc"]
     industry = state.get("industry", "General")
     matches = state["matches"]
-    job_skills = state["job_skills"]
-    cv_technical_skills = state["cv_technical_skills"]
-    cv_soft_skills = state["cv_soft_skills"]
     job_technical_skills = state["job_technical_skills"]
     job_soft_skills = state["job_soft_skills"]
-    job_experience_reqs = state["job_experience_reqs"]
-    job_education_reqs = state["job_education_reqs"]
-    job_industry_knowledge = state["job_industry_knowledge"]
 
     # Enhanced ATS Analysis Prompt
     ats_prompt = f"""
@@ -278,7 +342,7 @@ def analyze_cv_detailed(state: MatchingState) -> MatchingState:
         "metrics_analysis": {{"score": 0-100, "examples": ["example1"], "recommendations": ["rec1"]}}
     }}
     """
-    ats_response = LLMService.invoke(ats_prompt)
+    ats_response = LLMService.invoke(ats_prompt, validate=LLMService.json_response)
     try:
         ats_analysis = json.loads(ats_response.content)
     except Exception as e:
@@ -292,6 +356,22 @@ def analyze_cv_detailed(state: MatchingState) -> MatchingState:
             "metrics_analysis": {"score": 50, "examples": [], "recommendations": ["Add measurable results"]}
         }
 
+    return {"analysis_results": {"ats_analysis": ats_analysis, "ats_score": ats_analysis["ats_score"]}}
+
+def competitive_analysis(state: MatchingState) -> MatchingState:
+    """Competitive standing of the CV for the role."""
+    cv_text = state["cv_text"]
+    job_desc = state["job_desc"]
+    industry = state.get("industry", "General")
+    matches = state["matches"]
+    cv_technical_skills = state["cv_technical_skills"]
+    cv_soft_skills = state["cv_soft_skills"]
+    job_technical_skills = state["job_technical_skills"]
+    job_soft_skills = state["job_soft_skills"]
+    job_experience_reqs = state["job_experience_reqs"]
+    job_education_reqs = state["job_education_reqs"]
+    job_industry_knowledge = state["job_industry_knowledge"]
+
     # Enhanced Competitive Analysis Prompt
     competitive_prompt = f"""
     Analyze how this CV positions the candidate competitively for a role in the {industry} industry.
@@ -326,7 +406,7 @@ def analyze_cv_detailed(state: MatchingState) -> MatchingState:
         "overall_recommendations": ["rec1"]
     }}
     """
-    competitive_response = LLMService.invoke(competitive_prompt)
+    competitive_response = LLMService.invoke(competitive_prompt, validate=LLMService.json_response)
     try:
         competitive_analysis = json.loads(competitive_response.content)
     except Exception as e:
@@ -341,19 +421,18 @@ def analyze_cv_detailed(state: MatchingState) -> MatchingState:
             "overall_recommendations": ["Highlight unique achievements"]
         }
 
-    # Combine all analyses
-    analysis_results = {
-        "ats_analysis": ats_analysis,
+    return {"analysis_results": {
         "competitive_analysis": competitive_analysis,
-        "ats_score": ats_analysis["ats_score"],
         "competitive_score": competitive_analysis["competitive_score"]
-    }
+    }}
+
+def rule_based_analysis(state: MatchingState) -> MatchingState:
+    """Keyword, section and achievement checks that need no LLM call."""
+    analysis_results = {}
     analysis_results.update(keyword_analysis(state))
     analysis_results.update(section_analysis(state))
     analysis_results.update(achievement_analysis(state))
-
-    state["analysis_results"] = analysis_results
-    return state
+    return {"analysis_results": analysis_results}
 
 def optimize_cv(state: MatchingState) -> MatchingState:
     cv_text = state["cv_text"]
@@ -365,8 +444,7 @@ def optimize_cv(state: MatchingState) -> MatchingState:
     Return as markdown.
     """
     response = LLMService.invoke(prompt)
-    state["optimized_cv"] = response.content
-    return state
+    return {"optimized_cv": response.content}
 
 def generate_cover_letter(state: MatchingState) -> MatchingState:
     cv_text = state["cv_text"]
@@ -377,24 +455,36 @@ def generate_cover_letter(state: MatchingState) -> MatchingState:
     Job Description: {job_desc}
     """
     response = LLMService.invoke(prompt)
-    state["cover_letter"] = response.content
-    return state
+    return {"cover_letter": response.content}
 
-# Build the workflow
+# Build the workflow as parallel branches; each node starts once its inputs exist:
+#   START -> identify_industry -> {extract_cv_skills, extract_job_requirements} -> match_skills
+#         -> {ats_analysis, competitive_analysis, rule_based_analysis} -> END
+#   (on a cached job description, identify_industry returns the stored analysis and
+#   extract_job_requirements does nothing)
+#   START -> optimize_cv -> END and START -> generate_cover_letter -> END (they need only the raw texts)
 workflow = StateGraph(MatchingState)
 workflow.add_node("identify_industry", identify_industry)
 workflow.add_node("extract_cv_skills", extract_cv_skills)
 workflow.add_node("extract_job_requirements", extract_job_requirements)
 workflow.add_node("match_skills", match_skills)
-workflow.add_node("analyze_cv_detailed", analyze_cv_detailed)
+workflow.add_node("ats_analysis", ats_analysis)
+workflow.add_node("competitive_analysis", competitive_analysis)
+workflow.add_node("rule_based_analysis", rule_based_analysis)
 workflow.add_node("optimize_cv", optimize_cv)
 workflow.add_node("generate_cover_letter", generate_cover_letter)
+workflow.add_edge(START, "identify_industry")
+workflow.add_edge(START, "optimize_cv")
+workflow.add_edge(START, "generate_cover_letter")
 workflow.add_edge("identify_industry", "extract_cv_skills")
-workflow.add_edge("extract_cv_skills", "extract_job_requirements")
-workflow.add_edge("extract_job_requirements", "match_skills")
-workflow.add_edge("match_skills", "analyze_cv_detailed")
-workflow.add_edge("analyze_cv_detailed", "optimize_cv")
-workflow.add_edge("optimize_cv", "generate_cover_letter")
+workflow.add_edge("identify_industry", "extract_job_requirements")
+workflow.add_edge(["extract_cv_skills", "extract_job_requirements"], "match_skills")
+workflow.add_edge("match_skills", "ats_analysis")
+workflow.add_edge("match_skills", "competitive_analysis")
+workflow.add_edge("match_skills", "rule_based_analysis")
+workflow.add_edge("ats_analysis", END)
+workflow.add_edge("competitive_analysis", END)
+workflow.add_edge("rule_based_analysis", END)
+workflow.add_edge("optimize_cv", END)
 workflow.add_edge("generate_cover_letter", END)
-workflow.set_entry_point("identify_industry")
-matching_workflow = workflow.compile()
\ No newline at end of file
+matching_workflow = workflow.compile()